@@ -0,0 +1,214 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+import boto3
+import botocore.session
+from botocore.credentials import CredentialProvider, RefreshableCredentials
+import clients
+import config
+import logger
+import regions
+
+# Assumed-role sessions, cached per role ARN for the life of the process
+_role_sessions = {}
+_role_lock = threading.Lock()
+# Every thread pool size in config (region fan-out included), capped per account by sweep_account()
+_pool_settings = [name for name in vars(config)
+                  if name.endswith('_workers') and name not in ('account_workers', 'account_max_workers')]
+# Shared state files as configured, before sweep_account() suffixes them per account
+_state_files = {setting: getattr(config, setting) for setting in ('s3_pending_deletions_file', 's3_region_cache_file')}
+
+def load_role_arns(path=None):
+    """Role ARNs to sweep: one per line in config.accounts_file, '#' starts a comment."""
+    path = path or config.accounts_file
+    role_arns = []
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                role_arns.append(line)
+    return role_arns
+
+def account_id(role_arn):
+    """arn:aws:iam::<account>:role/<name> -> <account>"""
+    return role_arn.split(':')[4]
+
+def assume_role_session(role_arn):
+    """Return a boto3 session whose credentials come from assuming role_arn.
+
+    The temporary credentials are refreshed through STS shortly before they expire, so
+    long sweeps keep working. Point config.sts_endpoint_url at a local STS stand-in to test.
+    """
+    with _role_lock:
+        session = _role_sessions.get(role_arn)
+        if session is None:
+            botocore_session = botocore.session.Session()
+            # Ahead of the environment, shared files and instance metadata in the credential chain
+            botocore_session.get_component('credential_provider').insert_before('env', AssumedRoleProvider(role_arn))
+            region = clients.get_session().region_name
+            if region:
+                botocore_session.set_config_variable('region', region)
+            session = boto3.session.Session(botocore_session=botocore_session)
+            # Assume the role now, so a denied role fails here rather than halfway through a sweep
+            session.get_credentials()
+            _role_sessions[role_arn] = session
+        return session
+
+class AssumedRoleProvider(CredentialProvider):
+    """Credential provider for one role ARN, assumed through STS and refreshed before expiry."""
+    METHOD = 'excalisweep-assume-role'
+    CANONICAL_NAME = 'ExcaliSweepAssumeRole'
+
+    def __init__(self, role_arn):
+        super().__init__()
+        self.role_arn = role_arn
+
+    def load(self):
+        return RefreshableCredentials.create_from_metadata(
+            metadata=_assume_role(self.role_arn),
+            refresh_using=partial(_assume_role, self.role_arn),
+            method=self.METHOD,
+        )
+
+def _assume_role(role_arn):
+    sts_client = boto3.client('sts', endpoint_url=config.sts_endpoint_url, config=clients.client_config)
+    response = sts_client.assume_role(
+        RoleArn=role_arn,
+        RoleSessionName=config.assume_role_session_name,
+        DurationSeconds=config.assume_role_duration,
+    )
+    credentials = response['Credentials']
+    expiration = credentials['Expiration']
+    if isinstance(expiration, str):
+        expiration = datetime.fromisoformat(expiration.replace('Z', '+00:00'))
+    elif expiration is None:
+        expiration = datetime.now(timezone.utc) + timedelta(seconds=config.assume_role_duration)
+    return {
+        'access_key': credentials['AccessKeyId'],
+        'secret_key': credentials['SecretAccessKey'],
+        'token': credentials['SessionToken'],
+        'expiry_time': expiration.isoformat(),
+    }
+
+def sweep_account(role_arn, delete=False, delete_for_real=False, sweep_all_regions=False):
+    """Inventory (and optionally delete) S3, EC2, Lambda and CloudFormation in one account.
+
+    Top-level so it can run in a worker process. Returns a report tagged with the account.
+    """
+    account = account_id(role_arn)
+    report = {'account': account, 'role_arn': role_arn, 'services': {}, 'error': None}
+
+    # Worker processes are reused between accounts: reset every per-account setting
+    config.delete_for_real = delete_for_real
+    config.sweep_all_regions = sweep_all_regions
+    for setting in _pool_settings:
+        setattr(config, setting, min(getattr(config, setting) or config.account_max_workers, config.account_max_workers))
+    for setting, path in _state_files.items():
+        setattr(config, setting, _account_file(path, account))
+    regions._enabled_regions = None
+    logger.account_tag = account
+
+    try:
+        clients.register_session(account, assume_role_session(role_arn))
+        clients.set_default_profile(account)
+    except Exception as e:
+        report['error'] = f"Could not assume {role_arn}: {e}"
+        logger.account_tag = None
+        return report
+
+    # Imported here so the wizards pick up the account's config in this process
+    from wizards import s3_wizard, ec2_wizard, lambda_wizard, cloud_formation_wizard
+    s3_wizard._region_cache = None
+
+    services = [
+        ('S3', lambda: {None: s3_wizard.list_s3_buckets()},
+         lambda inventory, selected: s3_wizard.process_bucket_deletions([name for _, name in selected], inventory[None])),
+        ('EC2', lambda: regions.fan_out(ec2_wizard.list_ec2_instances),
+         lambda inventory, selected: ec2_wizard.process_instance_terminations(selected, inventory)),
+        ('Lambda', lambda: regions.fan_out(lambda_wizard.list_lambda_functions),
+         lambda inventory, selected: lambda_wizard.process_function_deletions(selected)),
+        ('CloudFormation', lambda: regions.fan_out(partial(cloud_formation_wizard.list_cloudformation_stacks, show=False)),
+         lambda inventory, selected: cloud_formation_wizard.process_stack_deletions(selected, inventory)),
+    ]
+    try:
+        for service, list_resources, delete_resources in services:
+            try:
+                inventory = list_resources()
+                selected = [(region, key) for region, key, _ in regions.flatten(inventory)]
+                result = {'found': [regions.label(region, key) for region, key in selected]}
+                if delete and selected:
+                    delete_resources(inventory, selected)
+                    result['action'] = 'deleted' if delete_for_real else 'logged (testing)'
+                report['services'][service] = result
+            except Exception as e:
+                report['services'][service] = {'found': [], 'error': str(e)}
+    finally:
+        clients.set_default_profile(None)
+        logger.account_tag = None
+        # Worker processes may exit without running atexit handlers
+        logger.flush()
+    return report
+
+def _account_file(path, account):
+    """Per-account state file: s3_pending_deletions.json -> s3_pending_deletions.<account>.json"""
+    stem, dot, extension = path.rpartition('.')
+    if not dot:
+        return f"{path}.{account}"
+    return f"{stem}.{account}.{extension}"
+
+def sweep_accounts(role_arns, delete=False):
+    """Sweep every account in its own worker process. Returns the reports in role_arns order."""
+    worker = partial(sweep_account, delete=delete, delete_for_real=config.delete_for_real,
+                     sweep_all_regions=config.sweep_all_regions)
+    # Forked workers would write queued entries a second time
+    logger.flush()
+    with ProcessPoolExecutor(max_workers=min(config.account_workers, len(role_arns))) as executor:
+        return list(executor.map(worker, role_arns))
+
+def print_report(reports):
+    """One combined report, grouped by account."""
+    print("\n📋 Multi-account sweep report:")
+    for report in reports:
+        print(f"\n🏢 Account {report['account']} ({report['role_arn']})")
+        if report['error']:
+            print(f"  ❌ {report['error']}")
+            continue
+        for service, result in report['services'].items():
+            if result.get('error'):
+                print(f"  ❌ {service}: {result['error']}")
+                continue
+            action = f" - {result['action']}" if result.get('action') else ""
+            print(f"  {service}: {len(result['found'])} resource(s){action}")
+            for resource in result['found']:
+                print(f"    - {resource}")
+
+def run_multi_account_sweep():
+    """Menu entry: sweep every account listed in config.accounts_file."""
+    try:
+        role_arns = load_role_arns()
+    except IOError as e:
+        print(f"Could not read {config.accounts_file}: {e}")
+        return
+    if not role_arns:
+        print(f"No role ARNs found in {config.accounts_file}.")
+        return
+
+    print(f"\n{len(role_arns)} account(s) listed in {config.accounts_file}.")
+    choice = input("Press 'i' for inventory only or 'd' to also delete everything found: ").strip().lower()
+    if choice not in ("i", "d"):
+        print("Multi-account sweep canceled.")
+        return
+    delete = choice == "d"
+    if delete:
+        mode = "DELETED" if config.delete_for_real else "logged in testing mode"
+        for role_arn in role_arns:
+            print(f"  - {account_id(role_arn)} ({role_arn})")
+        confirm = input(f"\n⚠️ Every S3 bucket, EC2 instance, Lambda function and CloudFormation stack found in these "
+                        f"{len(role_arns)} account(s) will be {mode}. Type the number of accounts to continue: ").strip()
+        if confirm != str(len(role_arns)):
+            print("Multi-account sweep canceled.")
+            return
+
+    print(f"\nSweeping {len(role_arns)} account(s), up to {config.account_workers} at a time...")
+    print_report(sweep_accounts(role_arns, delete=delete))
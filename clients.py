@@ -0,0 +1,61 @@
+import threading
+import boto3
+from botocore.config import Config
+import config
+
+# Clients are cached per (service, region, profile) for the whole ExcaliSweep session,
+# so service models are parsed once and the urllib3 connection pools are reused.
+_clients = {}
+_sessions = {}
+_lock = threading.RLock()
+# Profile used when a caller does not name one (set per account during multi-account sweeps)
+_default_profile = None
+
+client_config = Config(
+    max_pool_connections=config.max_pool_connections,
+    retries={'max_attempts': config.max_retry_attempts, 'mode': 'adaptive'},
+    connect_timeout=config.connect_timeout,
+    read_timeout=config.read_timeout,
+)
+
+def get_session(profile_name=None):
+    """Return the boto3 session for a credentials profile, creating it once."""
+    with _lock:
+        if profile_name not in _sessions:
+            _sessions[profile_name] = boto3.session.Session(profile_name=profile_name) if profile_name else boto3.session.Session()
+        return _sessions[profile_name]
+
+def register_session(profile_name, session):
+    """Make a prebuilt session (e.g. assumed-role credentials) available under profile_name."""
+    with _lock:
+        _sessions[profile_name] = session
+
+def set_default_profile(profile_name):
+    """Route every get_client() call without an explicit profile to profile_name (None resets)."""
+    global _default_profile
+    _default_profile = profile_name
+
+def get_client(service_name, region_name=None, profile_name=None):
+    """Return a shared, tuned client for (service, region, profile)."""
+    profile_name = profile_name or _default_profile
+    key = (service_name, region_name, profile_name)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _create_client(service_name, region_name, profile_name)
+                _clients[key] = client
+    return client
+
+def _create_client(service_name, region_name, profile_name):
+    if profile_name is None:
+        # Default credentials chain: same as boto3.client(), but with the tuned config
+        return boto3.client(service_name, region_name=region_name, config=client_config)
+    return get_session(profile_name).client(service_name, region_name=region_name, config=client_config)
+
+def clear_client_cache():
+    """Drop every cached client and session (e.g. after credentials change)."""
+    with _lock:
+        _clients.clear()
+        _sessions.clear()
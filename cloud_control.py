@@ -0,0 +1,118 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from botocore.exceptions import BotoCoreError, ClientError
+from clients import get_client
+from logger import log_action
+import config
+
+# Cloud Control request statuses after which a request will not change any more
+FINISHED_STATUSES = ['SUCCESS', 'FAILED', 'CANCEL_COMPLETE']
+
+def iter_identifiers(type_name, region_name=None):
+    """Stream the primary identifier of every resource of a type (e.g. AWS::Logs::LogGroup)."""
+    paginator = get_client('cloudcontrol', region_name=region_name).get_paginator('list_resources')
+    for page in paginator.paginate(TypeName=type_name):
+        for resource in page.get('ResourceDescriptions', []):
+            yield resource['Identifier']
+
+def delete_resources(type_name, identifiers, region_name=None, on_result=None):
+    """Delete resources of one type through Cloud Control. Returns {identifier: (success, detail)}.
+
+    delete_resource only starts an asynchronous request: requests are submitted concurrently and
+    every outstanding token is then tracked by one RequestTracker. In testing mode nothing is
+    submitted and every identifier is only logged.
+    """
+    results = {}
+
+    def finish(identifier, success, detail):
+        results[identifier] = (success, detail)
+        log_action(type_name, identifier, success, mode="deletion")
+        if on_result:
+            on_result(identifier, success, detail)
+
+    if not config.delete_for_real:
+        for identifier in identifiers:
+            finish(identifier, True, "testing")
+        return results
+
+    client = get_client('cloudcontrol', region_name=region_name)
+    tracker = RequestTracker(client)
+    with ThreadPoolExecutor(max_workers=config.cloudcontrol_workers) as executor:
+        futures = {executor.submit(client.delete_resource, TypeName=type_name, Identifier=identifier): identifier
+                   for identifier in identifiers}
+        for future in as_completed(futures):
+            identifier = futures[future]
+            try:
+                event = future.result()['ProgressEvent']
+            except ClientError as e:
+                error = e.response.get('Error', {})
+                finish(identifier, False, f"{error.get('Code')}: {error.get('Message')}")
+                continue
+            except Exception as e:
+                finish(identifier, False, str(e))
+                continue
+            if event.get('OperationStatus') in FINISHED_STATUSES:
+                finish(identifier, event['OperationStatus'] == 'SUCCESS', event.get('StatusMessage') or event['OperationStatus'])
+            else:
+                tracker.add(event['RequestToken'], identifier)
+
+    deadline = time.monotonic() + config.cloudcontrol_max_wait
+    while tracker.pending:
+        for identifier, success, detail in tracker.wait_for_changes(deadline):
+            finish(identifier, success, detail)
+        if tracker.pending and time.monotonic() >= deadline:
+            for identifier in tracker.pending.values():
+                finish(identifier, False, f"still in progress after {config.cloudcontrol_max_wait}s")
+            break
+    return results
+
+class RequestTracker:
+    """Track every outstanding Cloud Control request with one list_resource_requests sweep per poll.
+
+    Waiting on each token with get_resource_request_status would cost one call per request per
+    poll. The interval starts at cloudcontrol_poll_min_interval, backs off towards
+    cloudcontrol_poll_max_interval while nothing finishes (or polling fails) and resets once
+    something does.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.pending = {}  # RequestToken -> identifier
+        self.interval = config.cloudcontrol_poll_min_interval
+
+    def add(self, request_token, identifier):
+        self.pending[request_token] = identifier
+
+    def wait_for_changes(self, deadline):
+        """Sleep and poll until at least one request finishes or the deadline (time.monotonic()) passes.
+
+        Returns [(identifier, success, detail)], empty once the deadline has passed.
+        """
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            time.sleep(min(self.interval, remaining))
+            finished = self.poll()
+            if finished:
+                self.interval = config.cloudcontrol_poll_min_interval
+                return finished
+            self.interval = min(self.interval * 1.5, config.cloudcontrol_poll_max_interval)
+
+    def poll(self):
+        finished = []
+        paginator = self.client.get_paginator('list_resource_requests')
+        try:
+            pages = paginator.paginate(ResourceRequestStatusFilter={'Operations': ['DELETE'], 'OperationStatuses': FINISHED_STATUSES})
+            for page in pages:
+                for event in page.get('ResourceRequestStatusSummaries', []):
+                    identifier = self.pending.pop(event.get('RequestToken'), None)
+                    if identifier is not None:
+                        success = event['OperationStatus'] == 'SUCCESS'
+                        finished.append((identifier, success, event.get('StatusMessage') or event['OperationStatus']))
+                if not self.pending:
+                    break
+        except (ClientError, BotoCoreError) as e:
+            # Throttled, timed out or briefly failing: whatever is still pending is polled again after a longer sleep
+            print(f"⚠️ Could not poll Cloud Control requests: {e}")
+        return finished
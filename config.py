@@ -1,2 +1,56 @@
 delete_for_real = True
 days_to_observe = 30
+# Run wizards inside the main process (True) or spawn `python -m wizards.<name>` for isolation (False)
+run_wizards_in_process = True
+# Shared boto3 client tuning (see clients.py)
+max_pool_connections = 50
+max_retry_attempts = 10
+connect_timeout = 5
+read_timeout = 60
+# S3 wizard
+s3_inventory_workers = 16
+s3_delete_workers = 8
+s3_bucket_workers = 4
+# Buckets with at least this many objects are emptied through a lifecycle rule instead of per-key deletes
+s3_lifecycle_threshold_objects = 10000000
+s3_pending_deletions_file = "s3_pending_deletions.json"
+s3_region_cache_file = "s3_bucket_regions.json"
+s3_region_cache_ttl = 86400  # seconds
+# CloudFormation wizard
+cloudformation_delete_workers = 10
+cloudformation_poll_min_interval = 5  # seconds
+cloudformation_poll_max_interval = 30
+cloudformation_max_wait = 3600  # seconds per stack; stacks still deleting after this are logged as failed
+# EC2 wizard
+ec2_page_size = 1000
+ec2_terminate_batch_size = 1000
+ec2_wait_for_termination = False
+ec2_orphan_workers = 10
+# Lambda wizard
+lambda_detail_workers = 16
+lambda_delete_workers = 8
+lambda_keep_versions = 3  # newest published versions kept per function and layer when pruning
+lambda_max_retries = 5  # on top of botocore's own retries, for throttled or busy functions
+# Run every wizard against all enabled regions instead of the session's default region (main menu option 9)
+sweep_all_regions = False
+region_workers = None  # regions listed at the same time in an all-region sweep; None for one thread per region
+# Multi-account sweep (main menu option 10)
+accounts_file = "accounts.txt"  # one role ARN per line, '#' starts a comment
+account_workers = 4  # accounts swept at the same time, one process each
+account_max_workers = 4  # per-account cap on the wizards' thread pools
+assume_role_session_name = "excalisweep"
+assume_role_duration = 3600  # seconds
+sts_endpoint_url = None  # e.g. "http://localhost:5000" for a local STS stand-in
+# Other Services wizard
+service_index_file = "service_index.json"  # rebuilt automatically when botocore is upgraded
+batch_workers = 8
+batch_requests_per_second = 10  # across all workers; 0 for no limit
+sweeper_workers = 8  # concurrent deletes when sweeping a service from its list/delete pairs
+# Cloud Control backend (Other Services wizard)
+cloudcontrol_workers = 10
+cloudcontrol_poll_min_interval = 5  # seconds
+cloudcontrol_poll_max_interval = 30
+cloudcontrol_max_wait = 1800  # give up tracking requests after this many seconds
+# Logging: entries are written by a background thread in batches
+log_batch_size = 500  # entries per write
+log_flush_interval = 1  # seconds an entry may wait before it is written
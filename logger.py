@@ -1,20 +1,28 @@
-import os
+import atexit
+import queue
+import threading
+import time
 from datetime import datetime, timezone
+import config
+
+LOG_FILE = "excalisweep.logs"
+
+# Set to the AWS account ID during multi-account sweeps so every entry names its account
+account_tag = None
+
+# Entries are formatted by the calling thread and written by one background writer thread,
+# which keeps the file open and writes them in batches (config.log_batch_size / log_flush_interval)
+_queue = queue.Queue()
+_writer = None
+_writer_lock = threading.Lock()
+# Queued by flush(): the writer writes what it has collected so far instead of waiting for more
+_FLUSH = object()
 
 def log_action(service_name, resource_name, success, mode="deletion", function_name=None, json_input=None, response_json=None):
-    log_file_path = "excalisweep.logs"
-    
-    # Ensure the file exists
-    if not os.path.exists(log_file_path):
-        with open(log_file_path, "w") as f:
-            pass
-    
     # Format timestamp
     timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S (UTC +0)")
-    
-    # Get delete_for_real from environment variable
-    delete_for_real = os.getenv('DELETE_FOR_REAL', 'False') == 'True'
-    
+    # Read the live mode: main.py and the wizards share config.delete_for_real
+    delete_for_real = config.delete_for_real
     # Determine status
     if mode in ["deletion", "request"]:
         if delete_for_real:
@@ -29,7 +37,60 @@ def log_action(service_name, resource_name, success, mode="deletion", function_n
         log_entry = f"{timestamp} | {service_name} | {resource_name} | {status}\n"
     else:
         log_entry = f"{timestamp} | {service_name} | {resource_name} | {function_name} | {json_input} | {response_json}\n"
-    
-    # Write log entry
-    with open(log_file_path, "a") as log_file:
-        log_file.write(log_entry)
+    if account_tag:
+        log_entry = log_entry.replace(f"{timestamp} | ", f"{timestamp} | {account_tag} | ", 1)
+    # Hand the entry to the writer thread
+    _start_writer()
+    _queue.put(log_entry)
+
+def flush():
+    """Block until every entry logged so far is written to the log file."""
+    if _writer is None or not _writer.is_alive():
+        if _queue.empty():
+            return
+        _start_writer()
+    _queue.put(_FLUSH)
+    _queue.join()
+
+def _start_writer():
+    global _writer
+    # is_alive() is also False in a forked worker process, which inherits the object but not the thread
+    if _writer is None or not _writer.is_alive():
+        with _writer_lock:
+            if _writer is None or not _writer.is_alive():
+                _writer = threading.Thread(target=_write_entries, name="excalisweep-logger", daemon=True)
+                _writer.start()
+
+def _write_entries():
+    log_file, log_file_path = None, None
+    while True:
+        batch = [_queue.get()]
+        deadline = time.monotonic() + config.log_flush_interval
+        # Collect more entries until the batch is full, the interval is up or a flush is requested
+        while batch[-1] is not _FLUSH and len(batch) < config.log_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            entries = [entry for entry in batch if entry is not _FLUSH]
+            if entries:
+                # Reopen only when LOG_FILE is pointed somewhere else
+                if log_file_path != LOG_FILE:
+                    if log_file:
+                        log_file.close()
+                    log_file_path = LOG_FILE
+                    log_file = open(log_file_path, "a", encoding="utf-8")
+                log_file.write("".join(entries))
+                log_file.flush()
+        except (IOError, OSError) as e:
+            print(f"⚠️ Could not write to {log_file_path}: {e}")
+            log_file, log_file_path = None, None
+        finally:
+            for _ in batch:
+                _queue.task_done()
+
+atexit.register(flush)
@@ -1,14 +1,16 @@
 import boto3
 import os
 import subprocess
+from importlib import import_module
 from datetime import datetime, timedelta
 from config import *
+import config
+from clients import get_client, get_session
+import logger
+from accounts import run_multi_account_sweep
 import requests
 import time
 
-# Initialize delete_for_real in the global scope
-delete_for_real = True  # Default to testing mode
-
 def show_intro():
     print("""
     ****************************************
@@ -16,7 +18,7 @@ def show_intro():
     *   Your AWS Cleanup Wizard Assistant  *
     ****************************************
     """)
-    print("Warning: The resources displayed are based on your current Availability Zone (AZ) and Region. If you're unable to find what you're looking for, try switching to a different AZ or Region.")
+    print("Warning: By default the resources displayed are based on your current Availability Zone (AZ) and Region. Use 'Toggle all-region sweep' to list and delete across every enabled region at once.")
 
     region = get_region()
     az = get_availability_zone()
@@ -25,7 +27,7 @@ def show_intro():
 
 def get_region():
     """Get current AWS region from boto3 session, or fallback to instance metadata."""
-    session = boto3.session.Session()
+    session = get_session()
     region = session.region_name
     if region:
         return region
@@ -50,25 +52,32 @@ def get_availability_zone():
 
 def set_status():
     """Set status to real deletion or testing."""
-    global delete_for_real
     while True:
         print()
         status = input("Choose a mode: press 'r' for real deletion of instances, or 't' for testing only: ").strip().lower()
         if status in ("r", "t"):
             if status == "r":
-                delete_for_real = True
+                config.delete_for_real = True
                 print("Real deletion mode activated.")
             else:
-                delete_for_real = False
+                config.delete_for_real = False
                 print("Testing mode activated.")
             break
         print("Invalid input. Please enter 'r' or 't'.")
         time.sleep(1)
 
+def toggle_region_sweep():
+    """Switch the wizards between the default region and every enabled region."""
+    config.sweep_all_regions = not config.sweep_all_regions
+    if config.sweep_all_regions:
+        print("All-region sweep activated: wizards will cover every enabled region.")
+    else:
+        print(f"All-region sweep deactivated: wizards will only cover {get_region()}.")
+
 def list_billed_services():
     """Retrieve AWS services that incurred costs in the last specified number of days on config.py."""
     try:
-        client = boto3.client('ce')  # Cost Explorer
+        client = get_client('ce')  # Cost Explorer
         end_date = datetime.utcnow().date()
         start_date = end_date - timedelta(days=days_to_observe)
 
@@ -100,12 +109,31 @@ def show_billed_services():
             print(f" {service}: ${cost:.2f}")
 
 def invoke_script(script_name):
-    """Execute a cleanup wizard script safely."""
+    """Execute a cleanup wizard, in-process by default or as a subprocess if configured."""
     print(f"\nRunning {script_name}...")
+    if config.run_wizards_in_process:
+        try:
+            wizard = import_module(f'wizards.{script_name}')
+        except ImportError as e:
+            print(f"Could not load {script_name} in-process ({e}), falling back to a subprocess.")
+        else:
+            run_wizard(wizard, script_name)
+            return
+    run_wizard_subprocess(script_name)
+
+def run_wizard(wizard, script_name):
+    """Run an already imported wizard module, sharing this process' session, clients and mode."""
+    try:
+        wizard.interactive_menu()
+    except Exception as e:
+        print(f"Unexpected error running {script_name}: {e}")
+
+def run_wizard_subprocess(script_name):
+    """Execute a cleanup wizard script safely in its own interpreter."""
     script_path = f'wizards.{script_name}'
     try:
         # Pass delete_for_real to the wizard module if needed
-        subprocess.run(['python', '-m', script_path], check=True, env={**os.environ, 'DELETE_FOR_REAL': str(delete_for_real)})
+        subprocess.run(['python', '-m', script_path], check=True, env={**os.environ, 'DELETE_FOR_REAL': str(config.delete_for_real)})
     except FileNotFoundError as e:
         print(f"Error: Script {script_name} not found: {e}")
     except subprocess.CalledProcessError:
@@ -115,7 +143,9 @@ def invoke_script(script_name):
 
 def show_logs():
     """Display logs if available."""
-    log_file = 'excalisweep.logs'
+    # Entries still queued by the background writer would be missing otherwise
+    logger.flush()
+    log_file = logger.LOG_FILE
     if os.path.exists(log_file):
         try:
             with open(log_file, 'r', encoding='utf-8') as file:
@@ -137,11 +167,14 @@ def main_menu():
         '6': lambda: invoke_script('lambda_wizard'),
         '7': show_logs,
         '8': set_status,
-        '9': lambda: print("Exiting ExcaliSweep. Goodbye!")
+        '9': toggle_region_sweep,
+        '10': run_multi_account_sweep,
+        '11': lambda: print("Exiting ExcaliSweep. Goodbye!")
     }
     
     while True:        
-        print("Currently, deletion mode is set to", delete_for_real)
+        print("Currently, deletion mode is set to", config.delete_for_real)
+        print("All-region sweep is set to", config.sweep_all_regions)
         print("If you'd like to change it, go to option Change Mode")
         print("\nOptions:")
         print("  1. Show billed AWS services")
@@ -152,12 +185,14 @@ def main_menu():
         print("  6. Run Lambda Cleanup Wizard")
         print("  7. View logs")
         print("  8. Change mode")
-        print("  9. Exit")
+        print("  9. Toggle all-region sweep")
+        print(" 10. Multi-account sweep")
+        print(" 11. Exit")
         choice = input("Select an option: ").strip()
         
         action = options.get(choice)
         if action:
-            if choice == '9':
+            if choice == '11':
                 action()
                 break
             else:
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+from clients import get_client
+import config
+
+# Regions enabled for the account, looked up once per session
+_enabled_regions = None
+
+def get_enabled_regions():
+    """Regions enabled for this account (opt-in regions only once opted in)."""
+    global _enabled_regions
+    if _enabled_regions is None:
+        response = get_client('ec2').describe_regions(
+            Filters=[{'Name': 'opt-in-status', 'Values': ['opt-in-not-required', 'opted-in']}]
+        )
+        _enabled_regions = sorted(region['RegionName'] for region in response.get('Regions', []))
+    return _enabled_regions
+
+def sweep_regions():
+    """Regions a wizard should cover: every enabled region, or [None] for the session's default region."""
+    if not config.sweep_all_regions:
+        return [None]
+    try:
+        return get_enabled_regions()
+    except Exception as e:
+        print(f"⚠️ Could not list enabled regions, using the default region only: {e}")
+        return [None]
+
+def fan_out(list_function, regions=None, max_workers=None):
+    """Run list_function(region_name=region) in every region concurrently.
+
+    Up to max_workers regions at a time (config.region_workers by default; one thread per
+    region when neither is set). Returns {region: result}. A region that fails is reported and left out, so one
+    disabled or denied region does not hide the others.
+    """
+    regions = regions if regions is not None else sweep_regions()
+    if len(regions) == 1:
+        return {regions[0]: list_function(region_name=regions[0])}
+
+    results = {}
+    max_workers = max_workers or config.region_workers or len(regions)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(regions))) as executor:
+        futures = {region: executor.submit(list_function, region_name=region) for region in regions}
+        for region, future in futures.items():
+            try:
+                results[region] = future.result()
+            except Exception as e:
+                print(f"⚠️ Skipping region {region}: {e}")
+    return results
+
+def flatten(results):
+    """Merge {region: {key: value}} into one region-tagged list of (region, key, value)."""
+    return [(region, key, value) for region, inventory in results.items() for key, value in (inventory or {}).items()]
+
+def label(region, key):
+    """Display name for a resource, tagged with its region when sweeping several regions."""
+    return f"{key} [{region}]" if region else key
+
+def group_by_region(items):
+    """Group (region, key) pairs into {region: [key, ...]} so deletions go to each resource's own region."""
+    grouped = {}
+    for region, key in items:
+        grouped.setdefault(region, []).append(key)
+    return grouped
@@ -0,0 +1,147 @@
+import difflib
+import json
+import re
+import threading
+import botocore
+import botocore.session
+from botocore import xform_name
+from botocore.exceptions import DataNotFoundError
+from botocore.validate import ParamValidator
+import config
+
+# Every service's operations, read straight from the botocore service models and kept on disk
+# (config.service_index_file) until the installed botocore version changes.
+_index = None
+_lock = threading.Lock()
+
+_TAGS = re.compile(r'<[^>]+>')
+# Full service models, loaded on demand (request validation, list/delete pairing)
+_service_models = {}
+
+def get_index():
+    """Return the operation index, loading it from disk or building it on first use."""
+    global _index
+    with _lock:
+        if _index is None:
+            _index = load_index()
+            if _index is None:
+                print("Building the AWS operation index (one-off, until botocore is upgraded)...")
+                _index = build_index()
+                save_index(_index)
+        return _index
+
+def load_index(path=None):
+    """The saved index, or None if it is missing, unreadable or built by another botocore version."""
+    path = path or config.service_index_file
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            index = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (IOError, ValueError) as e:
+        print(f"⚠️ Could not read {path}: {e}")
+        return None
+    if index.get('botocore_version') != botocore.__version__:
+        return None
+    return index
+
+def save_index(index, path=None):
+    path = path or config.service_index_file
+    try:
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(index, file)
+    except IOError as e:
+        print(f"⚠️ Could not write {path}: {e}")
+
+def build_index(service_names=None):
+    """Read every operation of every service from the botocore models (no clients, no API calls)."""
+    session = botocore.session.get_session()
+    loader = session.get_component('data_loader')
+    services = {}
+    for service_name in service_names or session.get_available_services():
+        service_model = session.get_service_model(service_name)
+        try:
+            paginators = loader.load_service_model(service_name, 'paginators-1').get('pagination', {})
+        except DataNotFoundError:
+            paginators = {}
+        services[service_name] = {
+            xform_name(operation_name): _describe_operation(service_model.operation_model(operation_name), paginators)
+            for operation_name in service_model.operation_names
+        }
+    return {'botocore_version': botocore.__version__, 'services': services}
+
+def _describe_operation(operation_model, paginators):
+    input_shape = operation_model.input_shape
+    output_shape = operation_model.output_shape
+    members = dict(input_shape.members) if input_shape is not None else {}
+    required = list(input_shape.required_members) if input_shape is not None else []
+    return {
+        'operation': operation_model.name,
+        'description': _first_sentence(operation_model.documentation),
+        'input_shape': input_shape.name if input_shape is not None else None,
+        'members': {name: shape.type_name for name, shape in members.items()},
+        'required': required,
+        'optional': [name for name in members if name not in required],
+        'output_members': list(output_shape.members) if output_shape is not None else [],
+        'paginator': paginators.get(operation_model.name),
+    }
+
+def _first_sentence(documentation):
+    text = ' '.join(_TAGS.sub(' ', documentation or '').split())
+    return text.split('. ')[0].rstrip('.') + '.' if text else ''
+
+def get_operations(service_name):
+    """{method_name: operation entry} for one service ({} if unknown)."""
+    return get_index()['services'].get(service_name, {})
+
+def get_operation(service_name, method_name):
+    return get_operations(service_name).get(method_name)
+
+def get_service_model(service_name):
+    """The full botocore service model (nested shapes included), loaded once per service."""
+    with _lock:
+        if service_name not in _service_models:
+            _service_models[service_name] = botocore.session.get_session().get_service_model(service_name)
+        return _service_models[service_name]
+
+def validate_params(service_name, method_name, params):
+    """Check params against the operation's input shape without calling AWS.
+
+    Returns None when they are valid, otherwise a readable description of every problem.
+    """
+    operation = get_operation(service_name, method_name)
+    if operation is None:
+        return f"Unknown method {service_name}.{method_name}"
+    if operation['input_shape'] is None:
+        return f"{service_name}.{method_name} takes no parameters" if params else None
+    input_shape = get_service_model(service_name).operation_model(operation['operation']).input_shape
+    report = ParamValidator().validate(params, input_shape)
+    return report.generate_report() if report.has_errors() else None
+
+def can_paginate(service_name, method_name):
+    operation = get_operation(service_name, method_name)
+    return bool(operation and operation['paginator'])
+
+def search_operations(query, limit=20):
+    """Fuzzy search over every service at once. Returns [(service, method, entry)], best first.
+
+    Every word of the query must appear in 'service method'; if nothing matches that way,
+    the closest method names are suggested instead (typos, word order).
+    """
+    words = [word for word in re.split(r'[\s._-]+', query.lower()) if word]
+    if not words:
+        return []
+    candidates = [(service, method, entry)
+                  for service, operations in get_index()['services'].items()
+                  for method, entry in operations.items()]
+
+    target = '_'.join(words)
+    matches = [candidate for candidate in candidates
+               if all(word in f"{candidate[0]} {candidate[1]}" for word in words)]
+    if not matches:
+        close = set(difflib.get_close_matches(target, {method for _, method, _ in candidates}, n=limit, cutoff=0.6))
+        matches = [candidate for candidate in candidates if candidate[1] in close]
+
+    def score(candidate):
+        return difflib.SequenceMatcher(None, target, candidate[1]).ratio()
+    return sorted(matches, key=lambda candidate: (-score(candidate), candidate[0], candidate[1]))[:limit]
@@ -0,0 +1,182 @@
+import re
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import jmespath
+from botocore import xform_name
+from clients import get_client
+from logger import log_action
+import service_index
+import config
+
+# A List*/Describe* operation whose items carry everything its Delete* counterpart needs.
+# Identifiers maps each required delete parameter to the item field holding it (None: the item itself).
+DeletePair = namedtuple('DeletePair', ['Service', 'ListMethod', 'DeleteMethod', 'ResultKey', 'Identifiers'])
+
+# Scalar list members named like these hold identifiers (QueueUrls, TableNames, clusterArns...)
+IDENTIFIER_SUFFIXES = ('Arns', 'Names', 'Ids', 'Urls')
+
+# List calls that also return other accounts' or AWS-owned resources unless scoped to the caller
+DEFAULT_LIST_PARAMS = {
+    ('ec2', 'describe_snapshots'): {'OwnerIds': ['self']},
+    ('ec2', 'describe_fpga_images'): {'Owners': ['self']},
+    ('ssm', 'list_documents'): {'Filters': [{'Key': 'Owner', 'Values': ['Self']}]},
+    ('appsync', 'list_graphql_apis'): {'owner': 'CURRENT_ACCOUNT'},
+    ('greengrassv2', 'list_components'): {'scope': 'PRIVATE'},
+    ('schemas', 'list_registries'): {'Scope': 'LOCAL'},
+    ('pinpoint-sms-voice-v2', 'describe_opt_out_lists'): {'Owner': 'SELF'},
+    ('pinpoint-sms-voice-v2', 'describe_pools'): {'Owner': 'SELF'},
+    ('pinpoint-sms-voice-v2', 'describe_rcs_agents'): {'Owner': 'SELF'},
+    ('bedrock-data-automation', 'list_blueprints'): {'resourceOwner': 'ACCOUNT'},
+    ('bedrock-data-automation', 'list_data_automation_projects'): {'resourceOwner': 'ACCOUNT'},
+}
+# List calls whose output mixes in AWS-managed resources that cannot be filtered out server-side (JMESPath per item)
+MANAGED_ITEMS = {
+    ('kms', 'list_aliases'): "starts_with(AliasName, 'alias/aws/')",
+    ('ec2', 'describe_managed_prefix_lists'): "OwnerId == 'AWS'",
+}
+# List input members that choose whose resources are returned (OwnerIds, ResourceOwner, Scope...)
+OWNER_MEMBERS = re.compile(r'^(resource)?(owners?|ownerids|owneraccount|owneraccountid|scope)$', re.IGNORECASE)
+
+def find_delete_pairs(service_name):
+    """Pair every Delete<Noun> of a service with a List/Describe call whose output identifies <Noun>s.
+
+    Only list calls without required parameters qualify, so a pair can be swept unattended.
+    List calls that can return other accounts' resources only qualify with a default scope in
+    DEFAULT_LIST_PARAMS.
+    """
+    service_model = service_index.get_service_model(service_name)
+    operation_names = set(service_model.operation_names)
+    pairs = []
+    for delete_name in sorted(operation_names):
+        if not delete_name.startswith('Delete'):
+            continue
+        delete_model = service_model.operation_model(delete_name)
+        if delete_model.input_shape is None or not delete_model.input_shape.required_members:
+            continue
+        for list_name in _list_candidates(delete_name[len('Delete'):]):
+            if list_name not in operation_names:
+                continue
+            list_model = service_model.operation_model(list_name)
+            pair = _match(service_name, list_model, delete_model)
+            if pair:
+                if _scoped_to_caller(pair, list_model):
+                    pairs.append(pair)
+                break
+    return pairs
+
+def _list_candidates(noun):
+    plurals = [f"{noun}s", f"{noun}es"] + ([f"{noun[:-1]}ies"] if noun.endswith('y') else [])
+    return [f"{verb}{name}" for verb in ('List', 'Describe') for name in plurals + [noun]]
+
+def _match(service_name, list_model, delete_model):
+    input_shape = list_model.input_shape
+    if input_shape is not None and input_shape.required_members:
+        return None
+    if list_model.output_shape is None:
+        return None
+    required = delete_model.input_shape.required_members
+
+    paginator = service_index.get_operation(service_name, xform_name(list_model.name)) or {}
+    result_keys = (paginator.get('paginator') or {}).get('result_key') or []
+    if isinstance(result_keys, str):
+        result_keys = [result_keys]
+    # The paginator's result keys first, then any other list in the response
+    members = list_model.output_shape.members
+    ordered = [key for key in result_keys if key in members] + [name for name in members if name not in result_keys]
+
+    for name in ordered:
+        shape = members[name]
+        if shape.type_name != 'list':
+            continue
+        item = shape.member
+        if item.type_name == 'structure':
+            if all(parameter in item.members for parameter in required):
+                identifiers = {parameter: parameter for parameter in required}
+                return DeletePair(service_name, xform_name(list_model.name), xform_name(delete_model.name), name, identifiers)
+        elif item.type_name == 'string' and len(required) == 1 and _names_identifier(name, required[0]):
+            return DeletePair(service_name, xform_name(list_model.name), xform_name(delete_model.name), name, {required[0]: None})
+    return None
+
+def _scoped_to_caller(pair, list_model):
+    if (pair.Service, pair.ListMethod) in DEFAULT_LIST_PARAMS or list_model.input_shape is None:
+        return True
+    return not any(OWNER_MEMBERS.match(name) for name in list_model.input_shape.members)
+
+def default_list_params(pair):
+    """The list call's parameters unless the operator gives others: the caller's own resources only."""
+    return dict(DEFAULT_LIST_PARAMS.get((pair.Service, pair.ListMethod), {}))
+
+def _names_identifier(list_member, parameter):
+    # TableNames -> TableName, QueueUrls -> QueueUrl, clusterArns -> cluster
+    if list_member[:-1] == parameter:
+        return True
+    return list_member.endswith(IDENTIFIER_SUFFIXES) and list_member.lower().startswith(parameter.lower())
+
+def iter_identifiers(pair, region_name=None, max_items=None, list_params=None):
+    """Stream the delete parameters of every listed resource, page by page.
+
+    list_params default to default_list_params(pair). Items missing an identifier and
+    AWS-managed items (MANAGED_ITEMS) are skipped.
+    """
+    params = default_list_params(pair) if list_params is None else list_params
+    managed = MANAGED_ITEMS.get((pair.Service, pair.ListMethod))
+    client = get_client(pair.Service, region_name=region_name)
+    if service_index.can_paginate(pair.Service, pair.ListMethod):
+        pages = client.get_paginator(pair.ListMethod).paginate(**params)
+    else:
+        pages = [getattr(client, pair.ListMethod)(**params)]
+
+    count = 0
+    for page in pages:
+        for item in jmespath.search(pair.ResultKey, page) or []:
+            if max_items and count >= max_items:
+                return
+            if managed and jmespath.search(managed, item):
+                continue
+            identifiers = {parameter: item if field is None else item.get(field) for parameter, field in pair.Identifiers.items()}
+            if any(value is None for value in identifiers.values()):
+                continue
+            yield identifiers
+            count += 1
+
+def sweep(pair, region_name=None, max_items=None, on_result=None, list_params=None):
+    """Delete everything the list call returns, deletes starting while later pages are still listed.
+
+    In testing mode every delete is only logged. Returns a count per status: deleted, failed or
+    logged, plus 'errors' when logging or reporting a result raised.
+    """
+    client = get_client(pair.Service, region_name=region_name)
+    delete = getattr(client, pair.DeleteMethod)
+    summary = {}
+    lock = threading.Lock()
+    # Bounded in-flight deletes keep memory flat however long the listing is
+    slots = threading.BoundedSemaphore(config.sweeper_workers * 2)
+
+    def delete_one(params):
+        resource = ', '.join(map(str, params.values()))
+        status, error = 'logged', None
+        try:
+            if config.delete_for_real:
+                try:
+                    delete(**params)
+                    status = 'deleted'
+                except Exception as e:
+                    status, error = 'failed', str(e)
+            log_action(pair.Service.title(), resource, status != 'failed', mode="deletion")
+            with lock:
+                summary[status] = summary.get(status, 0) + 1
+            if on_result:
+                on_result(params, status, error)
+        except Exception as e:
+            print(f"⚠️ Could not record the result for {resource}: {e}")
+            with lock:
+                summary['errors'] = summary.get('errors', 0) + 1
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=config.sweeper_workers) as executor:
+        for params in iter_identifiers(pair, region_name, max_items, list_params):
+            slots.acquire()
+            executor.submit(delete_one, params)
+    return summary
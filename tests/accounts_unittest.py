@@ -0,0 +1,123 @@
+import unittest
+from unittest.mock import patch, MagicMock, mock_open
+from datetime import datetime, timedelta, timezone
+import os
+import sys
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from tests.test_fixtures import BaseTestCase
+import accounts
+import clients
+import config
+import logger
+
+ROLE_ARN = 'arn:aws:iam::111111111111:role/ExcaliSweep'
+
+def sts_response(access_key, expires_in):
+    return {'Credentials': {
+        'AccessKeyId': access_key,
+        'SecretAccessKey': 'secret',
+        'SessionToken': 'token',
+        'Expiration': datetime.now(timezone.utc) + expires_in,
+    }}
+
+class TestAccounts(BaseTestCase):
+    patch_path = 'accounts.boto3.client'  # the STS stand-in
+
+    def setUp(self):
+        super().setUp()
+        # sweep_account() rewrites config as a worker process would; restore it after each test
+        saved = {name: value for name, value in vars(config).items() if not name.startswith('__')}
+        self.addCleanup(lambda: [setattr(config, name, value) for name, value in saved.items()])
+        accounts._role_sessions.clear()
+        self.addCleanup(accounts._role_sessions.clear)
+
+    def test_load_role_arns_skips_comments(self):
+        content = f"# sandboxes\n{ROLE_ARN}\n\narn:aws:iam::222222222222:role/ExcaliSweep  # team b\n"
+        with patch('builtins.open', mock_open(read_data=content)):
+            role_arns = accounts.load_role_arns('accounts.txt')
+
+        self.assertEqual(role_arns, [ROLE_ARN, 'arn:aws:iam::222222222222:role/ExcaliSweep'])
+        self.assertEqual(accounts.account_id(role_arns[1]), '222222222222')
+
+    def test_assume_role_session_caches_and_refreshes_credentials(self):
+        # The first credentials are about to expire, so reading them triggers a refresh
+        self.boto3_client.assume_role.side_effect = [
+            sts_response('AKIAFIRST', timedelta(minutes=1)),
+            sts_response('AKIASECOND', timedelta(hours=1)),
+        ]
+
+        with patch.object(config, 'sts_endpoint_url', 'http://localhost:5000'):
+            session = accounts.assume_role_session(ROLE_ARN)
+            self.assertIs(accounts.assume_role_session(ROLE_ARN), session)
+            frozen = session.get_credentials().get_frozen_credentials()
+
+        self.assertEqual(frozen.access_key, 'AKIASECOND')
+        self.assertEqual(session.get_credentials().method, accounts.AssumedRoleProvider.METHOD)
+        self.assertEqual(self.boto3_client.assume_role.call_count, 2)
+        self.boto3_client.assume_role.assert_called_with(
+            RoleArn=ROLE_ARN, RoleSessionName='excalisweep', DurationSeconds=3600)
+        self.assertEqual(self.mock_boto_client.call_args.kwargs['endpoint_url'], 'http://localhost:5000')
+
+    def test_sweep_account_tags_report_and_logs(self):
+        account_client = MagicMock()
+        account_client.list_buckets.return_value = {'Buckets': []}
+        functions = [{'Functions': [{'FunctionName': 'func1', 'Version': '$LATEST', 'LastModified': '2025-05-20T10:00:00'}]}]
+        account_client.get_paginator.side_effect = lambda operation: MagicMock(
+            paginate=MagicMock(return_value=functions if operation == 'list_functions' else []))
+        session = MagicMock()
+        session.client.return_value = account_client
+        tags = []
+
+        with patch('accounts.assume_role_session', return_value=session), \
+             patch('wizards.lambda_wizard.log_action', side_effect=lambda *args, **kwargs: tags.append(logger.account_tag)), \
+             patch('builtins.print'):
+            report = accounts.sweep_account(ROLE_ARN, delete=True, delete_for_real=False)
+
+        self.assertIsNone(report['error'])
+        self.assertEqual(report['account'], '111111111111')
+        self.assertEqual(report['services']['Lambda'], {'found': ['func1'], 'action': 'logged (testing)'})
+        self.assertEqual(report['services']['S3'], {'found': []})
+        self.assertEqual(tags, ['111111111111'])
+        self.assertIsNone(logger.account_tag)
+        self.assertIsNone(clients._default_profile)
+        self.assertEqual(config.s3_pending_deletions_file, 's3_pending_deletions.111111111111.json')
+        for setting in ('s3_bucket_workers', 'lambda_detail_workers', 'lambda_delete_workers', 'ec2_orphan_workers', 'region_workers'):
+            self.assertLessEqual(getattr(config, setting), config.account_max_workers)
+
+    def test_sweep_account_reports_assume_role_failure(self):
+        with patch('accounts.assume_role_session', side_effect=Exception("AccessDenied")):
+            report = accounts.sweep_account(ROLE_ARN)
+
+        self.assertIn("AccessDenied", report['error'])
+        self.assertEqual(report['services'], {})
+
+    def test_deleting_requires_the_account_count(self):
+        role_arns = [ROLE_ARN, 'arn:aws:iam::222222222222:role/ExcaliSweep']
+        with patch('accounts.load_role_arns', return_value=role_arns), \
+             patch('accounts.sweep_accounts', return_value=[]) as mock_sweep, \
+             patch('accounts.print_report'), \
+             patch('builtins.print'):
+            with patch('builtins.input', side_effect=['d', 'yes']):
+                accounts.run_multi_account_sweep()
+            mock_sweep.assert_not_called()
+
+            with patch('builtins.input', side_effect=['d', '2']):
+                accounts.run_multi_account_sweep()
+            mock_sweep.assert_called_once_with(role_arns, delete=True)
+
+    def test_log_entries_carry_account_tag(self):
+        with tempfile.TemporaryDirectory() as directory:
+            log_file = os.path.join(directory, 'excalisweep.logs')
+            with patch.object(logger, 'LOG_FILE', log_file), \
+                 patch.object(logger, 'account_tag', '111111111111'), \
+                 patch.object(config, 'delete_for_real', False):
+                logger.log_action("S3", "bucket1", True)
+                logger.flush()
+
+            with open(log_file, encoding='utf-8') as file:
+                entry = file.read()
+        self.assertTrue(entry.endswith(" | 111111111111 | S3 | bucket1 | TESTING\n"))
+
+if __name__ == '__main__':
+    unittest.main()
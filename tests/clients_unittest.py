@@ -0,0 +1,40 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import clients
+
+class TestClientFactory(unittest.TestCase):
+
+    def setUp(self):
+        clients.clear_client_cache()
+        self.addCleanup(clients.clear_client_cache)
+
+    @patch('clients.boto3.client')
+    def test_get_client_is_cached_per_service_and_region(self, mock_client):
+        mock_client.side_effect = lambda *args, **kwargs: object()
+
+        first = clients.get_client('s3')
+        second = clients.get_client('s3')
+        other_region = clients.get_client('s3', region_name='eu-west-1')
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other_region)
+        self.assertEqual(mock_client.call_count, 2)
+        mock_client.assert_any_call('s3', region_name=None, config=clients.client_config)
+
+    def test_client_config_uses_adaptive_retries(self):
+        self.assertEqual(clients.client_config.retries['mode'], 'adaptive')
+        self.assertGreaterEqual(clients.client_config.max_pool_connections, 10)
+
+    @patch('clients.boto3.session.Session')
+    def test_profile_clients_come_from_profile_session(self, mock_session):
+        clients.get_client('lambda', profile_name='sandbox')
+        clients.get_client('s3', profile_name='sandbox')
+
+        mock_session.assert_called_once_with(profile_name='sandbox')
+        self.assertEqual(mock_session.return_value.client.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
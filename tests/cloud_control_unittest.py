@@ -0,0 +1,96 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from botocore.exceptions import ClientError, ReadTimeoutError
+from tests.test_fixtures import BaseTestCase
+import cloud_control
+import config
+
+class TestCloudControl(BaseTestCase):
+    patch_path = 'cloud_control.get_client'
+
+    def test_iter_identifiers_pages_through_list_resources(self):
+        paginator = self.boto3_client.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {'ResourceDescriptions': [{'Identifier': 'group-1'}, {'Identifier': 'group-2'}]},
+            {'ResourceDescriptions': [{'Identifier': 'group-3'}]},
+        ]
+
+        identifiers = list(cloud_control.iter_identifiers('AWS::Logs::LogGroup'))
+
+        self.assertEqual(identifiers, ['group-1', 'group-2', 'group-3'])
+        paginator.paginate.assert_called_once_with(TypeName='AWS::Logs::LogGroup')
+
+    def test_delete_resources_tracks_tokens_with_one_batched_poll(self):
+        def delete_resource(TypeName, Identifier):
+            if Identifier == 'denied':
+                raise ClientError({'Error': {'Code': 'AccessDeniedException', 'Message': 'no'}}, 'DeleteResource')
+            return {'ProgressEvent': {'RequestToken': f"token-{Identifier}", 'OperationStatus': 'IN_PROGRESS'}}
+        self.boto3_client.delete_resource.side_effect = delete_resource
+        self.boto3_client.get_paginator.return_value.paginate.side_effect = [
+            [{'ResourceRequestStatusSummaries': [
+                {'RequestToken': 'token-a', 'OperationStatus': 'SUCCESS'},
+                {'RequestToken': 'token-from-someone-else', 'OperationStatus': 'SUCCESS'}]}],
+            [{'ResourceRequestStatusSummaries': [
+                {'RequestToken': 'token-b', 'OperationStatus': 'FAILED', 'StatusMessage': 'in use'}]}],
+        ]
+
+        with patch.object(config, 'delete_for_real', True), \
+             patch('cloud_control.time.sleep'), \
+             patch('cloud_control.log_action') as mock_log_action:
+            results = cloud_control.delete_resources('AWS::SNS::Topic', ['a', 'b', 'denied'])
+
+        self.assertEqual(results['a'], (True, 'SUCCESS'))
+        self.assertEqual(results['b'], (False, 'in use'))
+        self.assertFalse(results['denied'][0])
+        self.assertEqual(self.boto3_client.get_paginator.return_value.paginate.call_count, 2)
+        self.boto3_client.get_resource_request_status.assert_not_called()
+        mock_log_action.assert_any_call('AWS::SNS::Topic', 'a', True, mode="deletion")
+        mock_log_action.assert_any_call('AWS::SNS::Topic', 'b', False, mode="deletion")
+
+    def test_delete_resources_gives_up_at_max_wait_and_survives_poll_errors(self):
+        self.boto3_client.delete_resource.return_value = {'ProgressEvent': {'RequestToken': 'token-a', 'OperationStatus': 'IN_PROGRESS'}}
+        self.boto3_client.get_paginator.return_value.paginate.return_value.__iter__.side_effect = ClientError(
+            {'Error': {'Code': 'ThrottlingException', 'Message': 'slow down'}}, 'ListResourceRequests')
+        clock = iter(range(0, 1000, 10))
+
+        with patch.object(config, 'delete_for_real', True), \
+             patch.object(config, 'cloudcontrol_max_wait', 30), \
+             patch('cloud_control.time.monotonic', side_effect=lambda: next(clock)), \
+             patch('cloud_control.time.sleep'), \
+             patch('builtins.print'), \
+             patch('cloud_control.log_action') as mock_log_action:
+            results = cloud_control.delete_resources('AWS::SNS::Topic', ['a'])
+
+        self.assertEqual(results['a'], (False, 'still in progress after 30s'))
+        mock_log_action.assert_called_once_with('AWS::SNS::Topic', 'a', False, mode="deletion")
+
+    def test_delete_resources_retries_polls_that_time_out(self):
+        self.boto3_client.delete_resource.return_value = {'ProgressEvent': {'RequestToken': 'token-a', 'OperationStatus': 'IN_PROGRESS'}}
+        self.boto3_client.get_paginator.return_value.paginate.side_effect = [
+            ReadTimeoutError(endpoint_url='https://cloudcontrolapi.us-east-1.amazonaws.com'),
+            [{'ResourceRequestStatusSummaries': [{'RequestToken': 'token-a', 'OperationStatus': 'SUCCESS'}]}],
+        ]
+
+        with patch.object(config, 'delete_for_real', True), \
+             patch('cloud_control.time.sleep'), \
+             patch('builtins.print'), \
+             patch('cloud_control.log_action') as mock_log_action:
+            results = cloud_control.delete_resources('AWS::SNS::Topic', ['a'])
+
+        self.assertEqual(results['a'], (True, 'SUCCESS'))
+        mock_log_action.assert_called_once_with('AWS::SNS::Topic', 'a', True, mode="deletion")
+
+    def test_delete_resources_only_logs_in_testing_mode(self):
+        with patch.object(config, 'delete_for_real', False), \
+             patch('cloud_control.log_action') as mock_log_action:
+            results = cloud_control.delete_resources('AWS::SNS::Topic', ['a'])
+
+        self.assertEqual(results, {'a': (True, 'testing')})
+        self.boto3_client.delete_resource.assert_not_called()
+        mock_log_action.assert_called_once_with('AWS::SNS::Topic', 'a', True, mode="deletion")
+
+if __name__ == '__main__':
+    unittest.main()
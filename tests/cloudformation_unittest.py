@@ -3,6 +3,8 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from tests.test_fixtures import BaseTestCase
+from unittest.mock import MagicMock, patch
+from botocore.exceptions import ClientError
 import wizards.cloud_formation_wizard as explorer
 import config
 
@@ -21,29 +23,157 @@ class TestCloudFormationWizard(BaseTestCase):
             extra_fields={'Description': 'Test stack description'}
         )
 
-        # Configure mock client responses
-        self.boto3_client.list_stacks.return_value = {
-            'StackSummaries': [
+        # Configure mock client responses: a single describe_stacks sweep
+        paginator = self.boto3_client.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {'Stacks': [
                 {
                     'StackName': mock_stack['Name'],
                     'StackStatus': mock_stack['Status'],
-                    'StackId': mock_stack['ResourceId']
-                }
-            ]
-        }
-        self.boto3_client.describe_stacks.return_value = {
-            'Stacks': [{'Description': mock_stack['Description']}]
-        }
+                    'StackId': mock_stack['ResourceId'],
+                    'Description': mock_stack['Description']
+                },
+                {'StackName': 'old-stack', 'StackStatus': 'DELETE_COMPLETE', 'StackId': 'id2'}
+            ]}
+        ]
 
         stacks = explorer.list_cloudformation_stacks()
         self.assertIn('stack1', stacks)
+        self.assertNotIn('old-stack', stacks)
         self.assertEqual(stacks['stack1']['Description'], 'Test stack description')
+        self.boto3_client.get_paginator.assert_called_once_with('describe_stacks')
+        self.boto3_client.describe_stacks.assert_not_called()
 
     def test_list_cloudformation_stacks_client_error(self):
-        self.boto3_client.list_stacks.side_effect = Exception("AWS error")
+        self.boto3_client.get_paginator.side_effect = Exception("AWS error")
         stacks = explorer.list_cloudformation_stacks()
         self.assertEqual(stacks, {})
 
+    def _configure_paginators(self, imports, describe_pages):
+        paginators = {
+            'list_exports': MagicMock(**{'paginate.return_value': [
+                {'Exports': [{'ExportingStackId': 'arn:network', 'Name': 'VpcId'}]}]}),
+            'list_imports': MagicMock(**{'paginate.return_value': [{'Imports': imports}]}),
+            'describe_stacks': MagicMock(**{'paginate.side_effect': describe_pages})
+        }
+        self.boto3_client.get_paginator.side_effect = lambda name: paginators[name]
+
+    def test_delete_stacks_waits_for_importers_and_skips_nested(self):
+        stacks = {
+            'network': {'StackId': 'arn:network', 'StackStatus': 'CREATE_COMPLETE'},
+            'app': {'StackId': 'arn:app', 'StackStatus': 'CREATE_COMPLETE'},
+            'app-child': {'StackId': 'arn:app-child', 'StackStatus': 'CREATE_COMPLETE',
+                          'ParentId': 'arn:app', 'RootId': 'arn:app'},
+            'standalone': {'StackId': 'arn:standalone', 'StackStatus': 'CREATE_COMPLETE'}
+        }
+        # The nested child imports the export, so its root stack must go first.
+        # Sweeps: standalone gone; app unchanged; app gone; network gone.
+        in_progress = [{'Stacks': [{'StackId': 'arn:app', 'StackStatus': 'DELETE_IN_PROGRESS'}]}]
+        self._configure_paginators(['app-child'], [in_progress, in_progress, [{'Stacks': []}], [{'Stacks': []}]])
+
+        with patch('wizards.cloud_formation_wizard.time.sleep') as mock_sleep, \
+             patch('wizards.cloud_formation_wizard.log_action') as mock_log, \
+             patch('builtins.print'):
+            explorer.delete_stacks(['network', 'app', 'app-child', 'standalone'], stacks)
+
+        deleted = [c.kwargs['StackName'] for c in self.boto3_client.delete_stack.call_args_list]
+        self.assertEqual(deleted, ['app', 'standalone', 'network'])
+        self.assertEqual(mock_log.call_count, 3)
+        mock_log.assert_any_call("Cloud Formation", 'network', True, mode="deletion")
+        # Nothing changed in the second sweep, so the poller backed off before the third one
+        intervals = [c.args[0] for c in mock_sleep.call_args_list]
+        self.assertEqual(len(intervals), 4)
+        self.assertGreater(intervals[2], intervals[1])
+        self.assertEqual(intervals[3], intervals[0])
+        self.boto3_client.get_waiter.assert_not_called()
+
+    def test_delete_stacks_logs_nested_stack_without_its_root(self):
+        stacks = {
+            'app': {'StackId': 'arn:app', 'StackStatus': 'CREATE_COMPLETE'},
+            'app-child': {'StackId': 'arn:app-child', 'StackStatus': 'CREATE_COMPLETE',
+                          'ParentId': 'arn:app', 'RootId': 'arn:app'}
+        }
+        self._configure_paginators([], [])
+
+        with patch('wizards.cloud_formation_wizard.log_action') as mock_log, \
+             patch('builtins.print') as mock_print:
+            explorer.delete_stacks(['app-child'], stacks)
+
+        self.boto3_client.delete_stack.assert_not_called()
+        mock_log.assert_called_once_with("Cloud Formation", 'app-child', False, mode="deletion")
+        mock_print.assert_any_call("⚠️ Skipping nested stack app-child: select its root stack app to delete it.")
+
+    def test_delete_stacks_gives_up_at_max_wait_and_survives_poll_errors(self):
+        stacks = {
+            'network': {'StackId': 'arn:network', 'StackStatus': 'CREATE_COMPLETE'},
+            'app': {'StackId': 'arn:app', 'StackStatus': 'CREATE_COMPLETE'}
+        }
+        throttled = ClientError({'Error': {'Code': 'Throttling', 'Message': 'Rate exceeded'}}, 'DescribeStacks')
+        stuck = [{'Stacks': [{'StackId': 'arn:app', 'StackStatus': 'DELETE_IN_PROGRESS'}]}]
+        self._configure_paginators(['app'], [throttled] + [stuck] * 10)
+        clock = iter(range(0, 1000, 10))
+
+        with patch.object(config, 'cloudformation_max_wait', 30), \
+             patch('wizards.cloud_formation_wizard.time.monotonic', side_effect=lambda: next(clock)), \
+             patch('wizards.cloud_formation_wizard.time.sleep'), \
+             patch('wizards.cloud_formation_wizard.log_action') as mock_log, \
+             patch('builtins.print') as mock_print:
+            explorer.delete_stacks(['network', 'app'], stacks)
+
+        self.boto3_client.delete_stack.assert_called_once_with(StackName='app')
+        mock_print.assert_any_call("⚠️ Gave up waiting for app after 30s.")
+        mock_log.assert_any_call("Cloud Formation", 'app', False, mode="deletion")
+        mock_log.assert_any_call("Cloud Formation", 'network', False, mode="deletion")
+        self.assertEqual(mock_log.call_count, 2)
+
+    def test_delete_stacks_times_out_each_stack_on_its_own(self):
+        stacks = {
+            'network': {'StackId': 'arn:network', 'StackStatus': 'CREATE_COMPLETE'},
+            'app': {'StackId': 'arn:app', 'StackStatus': 'CREATE_COMPLETE'}
+        }
+        # Each stack takes about 20s, the chain about 80s: longer than the 30s cap, but every stack is within it
+        app_deleting = [{'Stacks': [{'StackId': 'arn:app', 'StackStatus': 'DELETE_IN_PROGRESS'}]}]
+        network_deleting = [{'Stacks': [{'StackId': 'arn:network', 'StackStatus': 'DELETE_IN_PROGRESS'}]}]
+        self._configure_paginators(['app'], [app_deleting, [{'Stacks': []}], network_deleting, [{'Stacks': []}]])
+        clock = iter(range(0, 1000, 10))
+
+        with patch.object(config, 'cloudformation_max_wait', 30), \
+             patch('wizards.cloud_formation_wizard.time.monotonic', side_effect=lambda: next(clock)), \
+             patch('wizards.cloud_formation_wizard.time.sleep'), \
+             patch('wizards.cloud_formation_wizard.log_action') as mock_log, \
+             patch('builtins.print'):
+            explorer.delete_stacks(['network', 'app'], stacks)
+
+        self.assertGreater(next(clock), 30)
+        mock_log.assert_any_call("Cloud Formation", 'app', True, mode="deletion")
+        mock_log.assert_any_call("Cloud Formation", 'network', True, mode="deletion")
+        self.assertEqual(mock_log.call_count, 2)
+
+    def test_delete_stacks_keeps_exporter_when_importer_fails(self):
+        stacks = {
+            'network': {'StackId': 'arn:network', 'StackStatus': 'CREATE_COMPLETE'},
+            'app': {'StackId': 'arn:app', 'StackStatus': 'CREATE_COMPLETE'}
+        }
+        self._configure_paginators(['app'], [
+            [{'Stacks': [{'StackId': 'arn:app', 'StackStatus': 'DELETE_FAILED'}]}]
+        ])
+        self.boto3_client.describe_stack_events.return_value = {'StackEvents': [
+            {'ResourceStatus': 'DELETE_FAILED', 'PhysicalResourceId': 'my-bucket',
+             'LogicalResourceId': 'Bucket', 'ResourceType': 'AWS::S3::Bucket',
+             'ResourceStatusReason': 'The bucket you tried to delete is not empty'}
+        ]}
+
+        with patch('wizards.cloud_formation_wizard.time.sleep'), \
+             patch('wizards.cloud_formation_wizard.log_action') as mock_log, \
+             patch('builtins.print') as mock_print:
+            explorer.delete_stacks(['network', 'app'], stacks)
+
+        self.boto3_client.delete_stack.assert_called_once_with(StackName='app')
+        self.boto3_client.describe_stack_events.assert_called_once_with(StackName='arn:app')
+        mock_print.assert_any_call("⚠️ Failed to delete app: Bucket (AWS::S3::Bucket): The bucket you tried to delete is not empty")
+        mock_log.assert_any_call("Cloud Formation", 'app', False, mode="deletion")
+        mock_log.assert_any_call("Cloud Formation", 'network', False, mode="deletion")
+
 """
     @patch('wizards.cloud_formation_wizard.list_cloudformation_stacks')
     @patch('wizards.cloud_formation_wizard.select_from_list')
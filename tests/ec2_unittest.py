@@ -1,9 +1,11 @@
 from tests.test_fixtures import BaseTestCase
 from unittest.mock import MagicMock, patch
+from botocore.exceptions import ClientError
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from wizards import ec2_wizard 
+import config
 
 class TestEC2Wizard(BaseTestCase):
     patch_path = 'wizards.ec2_wizard.boto3.client'
@@ -37,17 +39,231 @@ class TestEC2Wizard(BaseTestCase):
         )
 
         # Boto3 client mock already exists in self.boto3_client (patch created in BaseTestCase)
-        self.boto3_client.describe_instances.return_value = {
-            'Reservations': [{'Instances': [running_instance, terminated_instance]}]
-        }
+        paginator = self.boto3_client.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {'Reservations': [{'Instances': [running_instance, terminated_instance]}]}
+        ]
 
         result = ec2_wizard.list_ec2_instances()
 
         self.assertIsInstance(result, dict)
         self.assertIn('i-123', result)
         self.assertNotIn('i-456', result)
-        self.assertEqual(result['i-123']['Status'], 'running')
-        self.assertEqual(result['i-123']['Description'], 'TestInstance')
+        self.assertEqual(result['i-123'].Status, 'running')
+        self.assertEqual(result['i-123'].Description, 'TestInstance')
+        self.boto3_client.get_paginator.assert_called_once_with('describe_instances')
+        filters = paginator.paginate.call_args.kwargs['Filters']
+        self.assertEqual(filters[0]['Name'], 'instance-state-name')
+        self.assertNotIn('terminated', filters[0]['Values'])
+
+    def test_instance_pages_stream_and_name_tag_by_key(self):
+        tagged = {
+            'InstanceId': 'i-1', 'InstanceType': 't3.micro', 'LaunchTime': '2022-01-01T00:00:00Z',
+            'State': {'Name': 'stopped'},
+            'Tags': [{'Key': 'owner', 'Value': 'team-a'}, {'Key': 'Name', 'Value': 'web'}]
+        }
+        untagged = {'InstanceId': 'i-2', 'InstanceType': 't3.micro', 'LaunchTime': '2022-01-01T00:00:00Z',
+                    'State': {'Name': 'running'}}
+        self.boto3_client.get_paginator.return_value.paginate.return_value = [
+            {'Reservations': [{'Instances': [tagged]}]},
+            {'Reservations': [{'Instances': [untagged]}]}
+        ]
+
+        pages = list(ec2_wizard.iter_ec2_instance_pages())
+
+        self.assertEqual([[record.InstanceId for record in page] for page in pages], [['i-1'], ['i-2']])
+        self.assertEqual(pages[0][0].Description, 'web')
+        self.assertEqual(pages[1][0].Description, 'No Description')
+
+    def test_terminate_instances_batches_and_isolates_failures(self):
+        def terminate(InstanceIds, DryRun):
+            if 'i-protected' in InstanceIds:
+                raise ClientError({'Error': {'Code': 'OperationNotPermitted',
+                                             'Message': 'termination protection'}}, 'TerminateInstances')
+            return {'TerminatingInstances': [
+                {'InstanceId': i, 'CurrentState': {'Name': 'shutting-down'}} for i in InstanceIds]}
+        self.boto3_client.terminate_instances.side_effect = terminate
+
+        with patch.object(config, 'ec2_terminate_batch_size', 4):
+            results = ec2_wizard.terminate_instances(['i-1', 'i-2', 'i-protected', 'i-4', 'i-5'])
+
+        self.assertEqual(results['i-1'], (True, 'shutting-down'))
+        self.assertEqual(results['i-5'], (True, 'shutting-down'))
+        self.assertFalse(results['i-protected'][0])
+        self.assertIn('OperationNotPermitted', results['i-protected'][1])
+        # First call carries a whole batch instead of a single ID
+        self.assertEqual(self.boto3_client.terminate_instances.call_args_list[0].kwargs['InstanceIds'],
+                         ['i-1', 'i-2', 'i-protected', 'i-4'])
+
+    def test_terminate_instances_does_not_split_on_call_errors(self):
+        self.boto3_client.terminate_instances.side_effect = ClientError(
+            {'Error': {'Code': 'UnauthorizedOperation', 'Message': 'not allowed'}}, 'TerminateInstances')
+
+        with patch.object(config, 'ec2_terminate_batch_size', 4):
+            results = ec2_wizard.terminate_instances(['i-1', 'i-2', 'i-3', 'i-4', 'i-5'])
+
+        self.assertEqual(self.boto3_client.terminate_instances.call_count, 2)
+        self.assertEqual(results['i-3'], (False, 'UnauthorizedOperation: not allowed'))
+        self.assertEqual(len(results), 5)
+
+    def test_terminate_instances_dry_run(self):
+        self.boto3_client.terminate_instances.side_effect = ClientError(
+            {'Error': {'Code': 'DryRunOperation', 'Message': 'Request would have succeeded'}}, 'TerminateInstances')
+
+        results = ec2_wizard.terminate_instances(['i-1', 'i-2'], dry_run=True)
+
+        self.assertEqual(results, {'i-1': (True, 'dry run succeeded'), 'i-2': (True, 'dry run succeeded')})
+        self.boto3_client.terminate_instances.assert_called_once_with(InstanceIds=['i-1', 'i-2'], DryRun=True)
+
+    def test_find_orphaned_resources_joins_describe_sweeps(self):
+        pages = {
+            'describe_instances': [{'Reservations': [{'Instances': [{
+                'InstanceId': 'i-1', 'ImageId': 'ami-used',
+                'BlockDeviceMappings': [{'Ebs': {'VolumeId': 'vol-root'}}]}]}]}],
+            'describe_volumes': [{'Volumes': [{'VolumeId': 'vol-free', 'Size': 8, 'VolumeType': 'gp3'}]}],
+            'describe_images': [{'Images': [
+                {'ImageId': 'ami-used', 'BlockDeviceMappings': [{'Ebs': {'SnapshotId': 'snap-used'}}]},
+                {'ImageId': 'ami-old', 'Name': 'old', 'BlockDeviceMappings': [{'Ebs': {'SnapshotId': 'snap-ami'}}]},
+                {'ImageId': 'ami-template'}, {'ImageId': 'ami-pinned'}, {'ImageId': 'ami-config'}]}],
+            'describe_snapshots': [{'Snapshots': [
+                {'SnapshotId': 'snap-used', 'VolumeId': 'vol-gone'},
+                {'SnapshotId': 'snap-ami', 'VolumeId': 'vol-gone'},
+                {'SnapshotId': 'snap-backup', 'VolumeId': 'vol-root'},
+                {'SnapshotId': 'snap-stale', 'VolumeId': 'vol-gone'},
+                {'SnapshotId': 'snap-dlm', 'VolumeId': 'vol-gone', 'Tags': [{'Key': 'dlm:managed', 'Value': 'true'}]},
+                {'SnapshotId': 'snap-copy', 'VolumeId': 'vol-ffffffff'}]}],
+            'describe_network_interfaces': [{'NetworkInterfaces': [
+                {'NetworkInterfaceId': 'eni-live', 'Status': 'in-use', 'Groups': [{'GroupId': 'sg-live'}]},
+                {'NetworkInterfaceId': 'eni-left', 'Status': 'available', 'Groups': [{'GroupId': 'sg-left'}]},
+                {'NetworkInterfaceId': 'eni-lb', 'Status': 'available', 'RequesterManaged': True}]}],
+            'describe_security_groups': [{'SecurityGroups': [
+                {'GroupId': 'sg-default', 'GroupName': 'default'},
+                {'GroupId': 'sg-live', 'GroupName': 'web'},
+                {'GroupId': 'sg-left', 'GroupName': 'left'},
+                {'GroupId': 'sg-ref', 'GroupName': 'db'},
+                {'GroupId': 'sg-idle', 'GroupName': 'idle',
+                 'IpPermissions': [{'UserIdGroupPairs': [{'GroupId': 'sg-ref'}]}]},
+                {'GroupId': 'sg-template', 'GroupName': 'template'},
+                {'GroupId': 'sg-config', 'GroupName': 'config'}]}],
+            'describe_launch_template_versions': [{'LaunchTemplateVersions': [{'LaunchTemplateData': {
+                'ImageId': 'ami-template', 'NetworkInterfaces': [{'Groups': ['sg-template']}]}}]}],
+            'describe_auto_scaling_groups': [{'AutoScalingGroups': [
+                {'LaunchTemplate': {'LaunchTemplateId': 'lt-1', 'Version': '3'}}]}],
+            'describe_launch_configurations': [{'LaunchConfigurations': [
+                {'ImageId': 'ami-config', 'SecurityGroups': ['config']}]}],
+        }
+        self.boto3_client.get_paginator.side_effect = lambda operation: MagicMock(
+            paginate=MagicMock(return_value=pages[operation]))
+        self.boto3_client.describe_addresses.return_value = {'Addresses': [
+            {'AllocationId': 'eipalloc-free', 'PublicIp': '1.1.1.1'},
+            {'AllocationId': 'eipalloc-used', 'PublicIp': '2.2.2.2', 'AssociationId': 'eipassoc-1'}]}
+        self.boto3_client.describe_launch_template_versions.return_value = {'LaunchTemplateVersions': [
+            {'LaunchTemplateData': {'ImageId': 'ami-pinned'}}]}
+
+        orphans = ec2_wizard.find_orphaned_resources()
+
+        self.assertEqual(sorted(orphans), ['ami-old', 'eipalloc-free', 'eni-left', 'sg-idle', 'sg-left',
+                                           'snap-ami', 'snap-stale', 'vol-free'])
+        self.assertEqual(orphans['snap-ami'].DependsOn, ('ami-old',))
+        self.assertEqual(orphans['sg-left'].DependsOn, ('eni-left',))
+        self.assertEqual(self.boto3_client.get_paginator.call_count, 9)
+        # Only the version the Auto Scaling group pins is looked up on its own
+        self.boto3_client.describe_launch_template_versions.assert_called_once_with(LaunchTemplateId='lt-1', Versions=['3'])
+
+    def test_delete_orphaned_resources_runs_in_dependency_order(self):
+        calls = []
+        self.boto3_client.deregister_image.side_effect = lambda **kwargs: calls.append(kwargs['ImageId'])
+        self.boto3_client.delete_snapshot.side_effect = lambda **kwargs: calls.append(kwargs['SnapshotId'])
+        self.boto3_client.delete_network_interface.side_effect = ClientError(
+            {'Error': {'Code': 'InvalidNetworkInterface.InUse', 'Message': 'in use'}}, 'DeleteNetworkInterface')
+        orphans = [
+            ec2_wizard.Orphan('Snapshot', 'snap-1', '', ('ami-1',), None),
+            ec2_wizard.Orphan('AMI', 'ami-1', '', (), None),
+            ec2_wizard.Orphan('Network Interface', 'eni-1', '', (), None),
+            ec2_wizard.Orphan('Security Group', 'sg-1', '', ('eni-1',), None),
+            ec2_wizard.Orphan('Snapshot', 'snap-2', '', ('ami-unselected',), None),
+        ]
+
+        with patch.object(config, 'delete_for_real', True), \
+             patch('wizards.ec2_wizard.log_action') as mock_log_action, \
+             patch('builtins.print'):
+            results = ec2_wizard.delete_orphaned_resources(orphans)
+
+        self.assertEqual(calls, ['ami-1', 'snap-1'])
+        self.assertTrue(results['snap-1'][0])
+        self.assertFalse(results['eni-1'][0])
+        self.assertIn('eni-1', results['sg-1'][1])  # Still held by the ENI that failed
+        self.boto3_client.delete_security_group.assert_not_called()
+        self.assertIn('ami-unselected', results['snap-2'][1])
+        self.assertEqual(mock_log_action.call_count, 5)
+        self.boto3_client.deregister_image.assert_called_once_with(ImageId='ami-1', DryRun=False)
+
+    def test_release_instance_owners_drains_groups_and_spot_requests(self):
+        self.boto3_client.get_paginator.return_value.paginate.return_value = [{'AutoScalingInstances': [
+            {'InstanceId': 'i-1', 'AutoScalingGroupName': 'whole'},
+            {'InstanceId': 'i-2', 'AutoScalingGroupName': 'partial'}]}]
+        self.boto3_client.describe_auto_scaling_groups.side_effect = lambda AutoScalingGroupNames: {
+            'AutoScalingGroups': [{'Instances': [{'InstanceId': 'i-1'}]} if AutoScalingGroupNames == ['whole']
+                                  else {'Instances': [{'InstanceId': 'i-2'}, {'InstanceId': 'i-keep'}],
+                                        'MinSize': 2, 'DesiredCapacity': 2}]}
+        self.boto3_client.cancel_spot_instance_requests.return_value = {
+            'CancelledSpotInstanceRequests': [{'SpotInstanceRequestId': 'sir-1'}]}
+        records = {
+            'i-3': ec2_wizard.Instance('i-3', 't3.micro', 'running', None, 'spot', None, 'sir-1'),
+            'i-4': ec2_wizard.Instance('i-4', 't3.micro', 'running', None, 'on-demand', None, None),
+        }
+
+        with patch.object(config, 'delete_for_real', True), \
+             patch('wizards.ec2_wizard.log_action') as mock_log_action, \
+             patch('builtins.print'):
+            held = ec2_wizard.release_instance_owners(['i-1', 'i-2', 'i-3', 'i-4'], records)
+
+        self.assertEqual(held, set())
+        self.boto3_client.get_paginator.assert_called_once_with('describe_auto_scaling_instances')
+        self.boto3_client.update_auto_scaling_group.assert_any_call(
+            AutoScalingGroupName='whole', MinSize=0, MaxSize=0, DesiredCapacity=0)
+        # Detaching i-2 leaves 1 instance, below the group's MinSize of 2
+        self.boto3_client.update_auto_scaling_group.assert_any_call(AutoScalingGroupName='partial', MinSize=1)
+        self.boto3_client.detach_instances.assert_called_once_with(
+            AutoScalingGroupName='partial', InstanceIds=['i-2'], ShouldDecrementDesiredCapacity=True)
+        self.boto3_client.cancel_spot_instance_requests.assert_called_once_with(
+            SpotInstanceRequestIds=['sir-1'], DryRun=False)
+        mock_log_action.assert_any_call("EC2 Spot Request", 'sir-1', True, mode="deletion")
+
+    def test_instances_of_unreleased_groups_are_not_terminated(self):
+        self.boto3_client.get_paginator.return_value.paginate.return_value = [{'AutoScalingInstances': [
+            {'InstanceId': 'i-1', 'AutoScalingGroupName': 'partial'}]}]
+        self.boto3_client.describe_auto_scaling_groups.return_value = {'AutoScalingGroups': [
+            {'Instances': [{'InstanceId': 'i-1'}, {'InstanceId': 'i-keep'}], 'MinSize': 0, 'DesiredCapacity': 2}]}
+        self.boto3_client.detach_instances.side_effect = ClientError(
+            {'Error': {'Code': 'ValidationError', 'Message': 'denied'}}, 'DetachInstances')
+        self.boto3_client.terminate_instances.return_value = {'TerminatingInstances': [
+            {'InstanceId': 'i-2', 'CurrentState': {'Name': 'shutting-down'}}]}
+
+        with patch.object(config, 'delete_for_real', True), \
+             patch.object(config, 'ec2_wait_for_termination', False), \
+             patch('wizards.ec2_wizard.log_action') as mock_log_action, \
+             patch('builtins.print'):
+            ec2_wizard.terminate_in_region(['i-1', 'i-2'])
+
+        self.boto3_client.terminate_instances.assert_called_once_with(InstanceIds=['i-2'], DryRun=False)
+        mock_log_action.assert_any_call("EC2", 'i-1', False, mode="deletion")
+        mock_log_action.assert_any_call("EC2", 'i-2', True, mode="deletion")
+
+    def test_release_instance_owners_only_reports_in_testing_mode(self):
+        self.boto3_client.get_paginator.return_value.paginate.return_value = [{'AutoScalingInstances': [
+            {'InstanceId': 'i-1', 'AutoScalingGroupName': 'whole'}]}]
+        self.boto3_client.describe_auto_scaling_groups.return_value = {
+            'AutoScalingGroups': [{'Instances': [{'InstanceId': 'i-1'}]}]}
+
+        with patch.object(config, 'delete_for_real', False), \
+             patch('wizards.ec2_wizard.log_action') as mock_log_action, \
+             patch('builtins.print'):
+            ec2_wizard.release_instance_owners(['i-1'], {})
+
+        self.boto3_client.update_auto_scaling_group.assert_not_called()
+        mock_log_action.assert_called_once_with("Auto Scaling", 'whole', True, mode="deletion")
+
 """
     def test_terminate_real(self):
 
@@ -1,50 +1,184 @@
 import unittest
 from unittest.mock import patch, MagicMock, call
 from tests.test_fixtures import BaseTestCase
+from botocore.exceptions import ClientError
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from wizards import lambda_wizard
+import config
 
 class TestLambdaWizard(BaseTestCase):
     patch_path = 'wizards.lambda_wizard.boto3.client'  # inherited patch boto3.client 
 
     def test_list_lambda_functions_success(self):
-        self.boto3_client.list_functions.return_value = {
-            'Functions': [
-                {'FunctionName': 'func1', 'LastModified': '2025-05-20T10:00:00'}
-            ]
-        }
-        self.boto3_client.list_aliases.return_value = {'Aliases': [{'AliasName': 'alias1'}]}
-        self.boto3_client.list_versions_by_function.return_value = {'Versions': [{'Version': '1'}, {'Version': '$LATEST'}]}
+        paginator = self.boto3_client.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {'Functions': [
+                {'FunctionName': 'func1', 'Version': '$LATEST', 'LastModified': '2025-05-20T10:00:00'},
+                {'FunctionName': 'func1', 'Version': '10', 'LastModified': '2025-05-19T10:00:00'},
+            ]},
+            {'Functions': [
+                {'FunctionName': 'func1', 'Version': '9', 'LastModified': '2025-05-18T10:00:00'},
+                {'FunctionName': 'func2', 'Version': '$LATEST', 'LastModified': '2025-05-21T10:00:00'},
+            ]},
+        ]
 
         with patch('wizards.lambda_wizard.log_action') as mock_log_action:
             result = lambda_wizard.list_lambda_functions()
 
-        self.assertIn('func1', result)
         self.assertEqual(result['func1']['Created'], '2025-05-20T10:00:00')
-        self.assertEqual(result['func1']['Aliases'], ['alias1'])
-        self.assertEqual(result['func1']['Versions'], ['1', '$LATEST'])
+        self.assertEqual(result['func1']['Versions'], ['9', '10', '$LATEST'])
+        self.assertIsNone(result['func1']['Aliases'])  # Loaded only for the details view
+        self.assertEqual(result['func2']['Versions'], ['$LATEST'])
+        self.boto3_client.get_paginator.assert_called_once_with('list_functions')
+        paginator.paginate.assert_called_once_with(FunctionVersion='ALL')
+        self.boto3_client.list_aliases.assert_not_called()
+        self.boto3_client.list_versions_by_function.assert_not_called()
         mock_log_action.assert_not_called()
 
-    def test_list_lambda_functions_with_exception(self):
-        self.boto3_client.list_functions.return_value = {
-            'Functions': [{'FunctionName': 'func2', 'LastModified': '2025-05-20T10:00:00'}]
+    def test_fetch_function_aliases(self):
+        def paginate(FunctionName):
+            if FunctionName == 'func2':
+                raise Exception("API error")
+            return [{'Aliases': [{'AliasName': 'live'}]}, {'Aliases': [{'AliasName': 'beta'}]}]
+        self.boto3_client.get_paginator.return_value.paginate.side_effect = paginate
+        functions = {
+            'func1': {'Created': 'now', 'Aliases': None, 'Versions': ['$LATEST']},
+            'func2': {'Created': 'now', 'Aliases': None, 'Versions': ['$LATEST']},
         }
-        self.boto3_client.list_aliases.side_effect = Exception("API error")
 
-        with patch('wizards.lambda_wizard.log_action') as mock_log_action:
-            result = lambda_wizard.list_lambda_functions()
+        with patch('wizards.lambda_wizard.log_action') as mock_log_action, patch('builtins.print'):
+            lambda_wizard.fetch_function_aliases(functions)
 
-        self.assertEqual(result, {})
+        self.assertEqual(functions['func1']['Aliases'], ['live', 'beta'])
+        self.assertIsNone(functions['func2']['Aliases'])
         mock_log_action.assert_called_once_with("Lambda", 'func2', False, mode="deletion")
-        
+
     def test_interactive_menu_exit(self):
         with patch('wizards.lambda_wizard.input') as mock_input, patch('builtins.print') as mock_print:
 
-            mock_input.side_effect = ['3']
+            mock_input.side_effect = ['6']
             lambda_wizard.interactive_menu()
             mock_print.assert_any_call("\n🔚 Exiting Excalisweep Lambda Wizard. Have a great day!")
+
+    def test_delete_lambda_function_fast_path(self):
+        result = lambda_wizard.delete_lambda_function('func1', self.boto3_client)
+
+        self.assertTrue(result)
+        self.boto3_client.delete_function.assert_called_once_with(FunctionName='func1')
+        self.boto3_client.list_aliases.assert_not_called()
+        self.boto3_client.list_versions_by_function.assert_not_called()
+
+    def test_delete_lambda_function_retries_when_throttled(self):
+        throttled = ClientError({'Error': {'Code': 'TooManyRequestsException', 'Message': 'Rate exceeded'}}, 'DeleteFunction')
+        self.boto3_client.delete_function.side_effect = [throttled, throttled, None]
+
+        with patch('wizards.lambda_wizard.time.sleep') as mock_sleep:
+            result = lambda_wizard.delete_lambda_function('func1', self.boto3_client)
+
+        self.assertTrue(result)
+        self.assertEqual(self.boto3_client.delete_function.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test_process_function_deletions_in_parallel(self):
+        def delete_function(FunctionName):
+            if FunctionName == 'func2':
+                raise ClientError({'Error': {'Code': 'AccessDeniedException', 'Message': 'denied'}}, 'DeleteFunction')
+        self.boto3_client.delete_function.side_effect = delete_function
+
+        with patch.object(config, 'delete_for_real', True), \
+             patch('wizards.lambda_wizard.log_action') as mock_log_action, \
+             patch('builtins.print'):
+            lambda_wizard.process_function_deletions([(None, 'func1'), (None, 'func2'), (None, 'func3')])
+
+        self.assertEqual(self.boto3_client.delete_function.call_count, 3)  # Not retried: not a throttle
+        mock_log_action.assert_any_call("Lambda", 'func1', True, mode="deletion")
+        mock_log_action.assert_any_call("Lambda", 'func2', False, mode="deletion")
+        self.assertEqual(mock_log_action.call_count, 3)
+
+    def test_delete_function_versions_keeps_latest(self):
+        results = lambda_wizard.delete_function_versions('func1', ['1', '2', '$LATEST'], self.boto3_client, aliases=['old'])
+
+        self.assertEqual(results, {'old': (True, 'deleted'), '1': (True, 'deleted'), '2': (True, 'deleted')})
+        self.boto3_client.delete_alias.assert_called_once_with(FunctionName='func1', Name='old')
+        self.boto3_client.delete_function.assert_has_calls([
+            call(FunctionName='func1', Qualifier='1'), call(FunctionName='func1', Qualifier='2')])
+
+    def test_delete_function_versions_records_failed_aliases(self):
+        self.boto3_client.delete_alias.side_effect = [Exception("AccessDenied"), None]
+
+        results = lambda_wizard.delete_function_versions('func1', ['1'], self.boto3_client, aliases=['live', 'old'])
+
+        self.assertEqual(results, {'live': (False, 'AccessDenied'), 'old': (True, 'deleted'), '1': (True, 'deleted')})
+
+    def test_delete_selected_versions_keeps_the_function(self):
+        self.boto3_client.get_paginator.side_effect = lambda operation: MagicMock(paginate=MagicMock(return_value={
+            'list_functions': [{'Functions': [
+                {'FunctionName': 'func1', 'Version': '$LATEST', 'LastModified': 'now'},
+                {'FunctionName': 'func1', 'Version': '1'},
+                {'FunctionName': 'func1', 'Version': '2'}]}],
+            'list_aliases': [{'Aliases': [{'AliasName': 'old'}]}],
+        }[operation]))
+        self.boto3_client.delete_function.side_effect = [None, Exception("in use")]
+
+        with patch('wizards.lambda_wizard.input', side_effect=['1', 'all', 'yes']), \
+             patch.object(config, 'delete_for_real', True), \
+             patch('wizards.lambda_wizard.log_action') as mock_log_action, \
+             patch('builtins.print'):
+            lambda_wizard.delete_selected_versions()
+
+        self.boto3_client.delete_alias.assert_called_once_with(FunctionName='func1', Name='old')
+        self.boto3_client.delete_function.assert_has_calls([
+            call(FunctionName='func1', Qualifier='1'), call(FunctionName='func1', Qualifier='2')])
+        mock_log_action.assert_any_call("Lambda Alias", 'func1:old', True, mode="deletion")
+        mock_log_action.assert_any_call("Lambda Version", 'func1:2', False, mode="deletion")
+        self.assertEqual(mock_log_action.call_count, 3)
+
+    def test_plan_version_pruning_keeps_newest_aliased_and_used_layers(self):
+        layer_v1 = 'arn:aws:lambda:us-east-1:1:layer:deps:1'
+        pages = {
+            'list_functions': [{'Functions': [
+                {'FunctionName': 'func1', 'Version': '$LATEST', 'CodeSize': 10},
+                {'FunctionName': 'func1', 'Version': '1', 'CodeSize': 10, 'Layers': [{'Arn': layer_v1}]},
+                {'FunctionName': 'func1', 'Version': '2', 'CodeSize': 10},
+                {'FunctionName': 'func1', 'Version': '3', 'CodeSize': 10},
+                {'FunctionName': 'func1', 'Version': '4', 'CodeSize': 10},
+                {'FunctionName': 'func1', 'Version': '5', 'CodeSize': 10},
+            ]}],
+            'list_aliases': [{'Aliases': [{'FunctionVersion': '2', 'RoutingConfig': {'AdditionalVersionWeights': {'1': 0.1}}}]}],
+            'list_layers': [{'Layers': [{'LayerName': 'deps'}]}],
+            'list_layer_versions': [{'LayerVersions': [
+                {'Version': 1, 'LayerVersionArn': layer_v1},
+                {'Version': 2, 'LayerVersionArn': 'arn:aws:lambda:us-east-1:1:layer:deps:2'},
+                {'Version': 3, 'LayerVersionArn': 'arn:aws:lambda:us-east-1:1:layer:deps:3'},
+            ]}],
+        }
+        self.boto3_client.get_paginator.side_effect = lambda operation: MagicMock(
+            paginate=MagicMock(return_value=pages[operation]))
+
+        targets = lambda_wizard.plan_version_pruning(keep=1)
+
+        self.assertEqual(sorted((target.Kind, target.Version) for target in targets),
+                         [('Function Version', '3'), ('Function Version', '4'), ('Layer Version', 2)])
+
+    def test_prune_versions_reports_reclaimed_storage(self):
+        self.boto3_client.get_layer_version.return_value = {'Content': {'CodeSize': 500}}
+        targets = [
+            lambda_wizard.PruneTarget('Function Version', 'func1', '3', 1000),
+            lambda_wizard.PruneTarget('Layer Version', 'deps', 2, None),
+        ]
+
+        with patch.object(config, 'delete_for_real', True), \
+             patch('wizards.lambda_wizard.log_action') as mock_log_action, \
+             patch('builtins.print'):
+            reclaimed = lambda_wizard.prune_versions(targets)
+
+        self.assertEqual(reclaimed, 1500)
+        self.boto3_client.delete_function.assert_called_once_with(FunctionName='func1', Qualifier='3')
+        self.boto3_client.delete_layer_version.assert_called_once_with(LayerName='deps', VersionNumber=2)
+        mock_log_action.assert_any_call("Lambda Function Version", 'func1:3', True, mode="deletion")
+
 """
     def test_delete_lambda_function_success(self):
         self.boto3_client.list_aliases.return_value = {'Aliases': [{'AliasName': 'alias1'}]}
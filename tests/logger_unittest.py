@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import logger
+import config
+
+class TestLogger(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.log_file = os.path.join(directory.name, 'excalisweep.logs')
+        log_file = patch.object(logger, 'LOG_FILE', self.log_file)
+        log_file.start()
+        self.addCleanup(log_file.stop)
+
+    def read_entries(self):
+        logger.flush()
+        with open(self.log_file, encoding='utf-8') as file:
+            return file.read().splitlines()
+
+    def test_keeps_the_line_format(self):
+        with patch.object(config, 'delete_for_real', True):
+            logger.log_action("S3", "bucket1", True)
+            logger.log_action("CloudFormation", "stack1", False, mode="request")
+        with patch.object(config, 'delete_for_real', False):
+            logger.log_action("EC2", "i-123", False)
+        logger.log_action("Other", "sns", True, mode="execution", function_name="list_topics",
+                          json_input={}, response_json={'Topics': []})
+
+        entries = self.read_entries()
+
+        self.assertEqual([entry.split(" | ", 1)[1] for entry in entries], [
+            "S3 | bucket1 | SUCCESFULLY DELETED",
+            "CloudFormation | stack1 | FAILED REQUESTED DELETION",
+            "EC2 | i-123 | TESTING",
+            "Other | sns | list_topics | {} | {'Topics': []}",
+        ])
+        self.assertRegex(entries[0], r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} \(UTC \+0\) \| ")
+
+    def test_entries_from_many_threads_are_written_whole_in_batches(self):
+        written = []
+        real_open = open
+        def tracking_open(*args, **kwargs):
+            file = real_open(*args, **kwargs)
+            real_write = file.write
+            file.write = lambda data: written.append(data) or real_write(data)
+            return file
+
+        def log_many(thread):
+            for i in range(200):
+                logger.log_action("S3", f"bucket-{thread}-{i}", True)
+
+        with patch('logger.open', tracking_open, create=True), \
+             patch.object(config, 'delete_for_real', False), \
+             patch.object(config, 'log_batch_size', 100), \
+             patch.object(config, 'log_flush_interval', 5):
+            threads = [threading.Thread(target=log_many, args=(thread,)) for thread in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            entries = self.read_entries()
+
+        self.assertEqual(len(entries), 1000)
+        for entry in entries:
+            self.assertRegex(entry, r" \| S3 \| bucket-\d-\d+ \| TESTING$")
+        self.assertEqual(len({entry.split(" | ")[2] for entry in entries}), 1000)
+        # One write per batch, not one per entry
+        self.assertLessEqual(len(written), 20)
+
+    def test_flush_without_entries_returns_immediately(self):
+        logger.flush()
+        self.assertFalse(os.path.exists(self.log_file))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import main
+import config
+
+class TestMainDispatch(unittest.TestCase):
+
+    def setUp(self):
+        self.original_mode = config.run_wizards_in_process
+        self.original_delete = config.delete_for_real
+
+    def tearDown(self):
+        config.run_wizards_in_process = self.original_mode
+        config.delete_for_real = self.original_delete
+
+    @patch('main.subprocess.run')
+    @patch('main.import_module')
+    def test_invoke_script_in_process(self, mock_import, mock_run):
+        config.run_wizards_in_process = True
+        wizard = MagicMock()
+        mock_import.return_value = wizard
+
+        main.invoke_script('s3_wizard')
+
+        mock_import.assert_called_once_with('wizards.s3_wizard')
+        wizard.interactive_menu.assert_called_once_with()
+        mock_run.assert_not_called()
+
+    @patch('main.subprocess.run')
+    @patch('main.import_module')
+    def test_invoke_script_falls_back_to_subprocess(self, mock_import, mock_run):
+        config.run_wizards_in_process = True
+        config.delete_for_real = False
+        mock_import.side_effect = ImportError("broken wizard")
+
+        main.invoke_script('s3_wizard')
+
+        args, kwargs = mock_run.call_args
+        self.assertEqual(args[0], ['python', '-m', 'wizards.s3_wizard'])
+        self.assertEqual(kwargs['env']['DELETE_FOR_REAL'], 'False')
+
+    @patch('builtins.input', return_value='t')
+    def test_set_status_updates_live_config(self, mock_input):
+        config.delete_for_real = True
+        main.set_status()
+        self.assertFalse(config.delete_for_real)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,11 +5,19 @@ import json
 import boto3
 import sys, os
 import inspect
+import io
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import wizards.other_services_wizard as explorer
+import clients
+import service_index
+import time
 
 class TestAWSServiceExplorer(unittest.TestCase):
+
+    def setUp(self):
+        clients.clear_client_cache()
+        self.addCleanup(clients.clear_client_cache)
     
     # Test for list_services
     @patch('boto3.Session')
@@ -35,31 +43,28 @@ class TestAWSServiceExplorer(unittest.TestCase):
         self.assertEqual(result, [])
 
     # Test for list_all_methods
-    @patch('boto3.client')
-    def test_list_all_methods_success(self, mock_client):
-        client_mock = MagicMock()
-        setattr(client_mock, 'delete_bucket', MagicMock())
-        setattr(client_mock, 'list_objects', MagicMock())
-        setattr(client_mock, 'create_bucket', MagicMock())
-        setattr(client_mock, 'terminate_instance', MagicMock())
-
-        mock_client.return_value = client_mock
+    @patch('wizards.other_services_wizard.service_index.get_operations')
+    def test_list_all_methods_success(self, mock_operations):
+        mock_operations.return_value = {
+            'delete_bucket': {}, 'list_objects': {}, 'create_bucket': {}, 'terminate_instance': {}
+        }
         result = explorer.list_all_methods('s3')
         self.assertIn('delete_bucket', result)
         self.assertIn('list_objects', result)
         self.assertIn('terminate_instance', result)
         self.assertNotIn('create_bucket', result) 
+        mock_operations.assert_called_once_with('s3')
 
-    @patch('boto3.client')
-    def test_list_all_methods_boto_error(self, mock_client):
-        mock_client.side_effect = botocore.exceptions.BotoCoreError()
+    @patch('wizards.other_services_wizard.service_index.get_operations')
+    def test_list_all_methods_boto_error(self, mock_operations):
+        mock_operations.side_effect = botocore.exceptions.BotoCoreError()
 
         result = explorer.list_all_methods('s3')
         self.assertEqual(result, [])
 
-    @patch('boto3.client')
-    def test_list_all_methods_generic_error(self, mock_client):
-        mock_client.side_effect = Exception("Unexpected")
+    @patch('wizards.other_services_wizard.service_index.get_operations')
+    def test_list_all_methods_generic_error(self, mock_operations):
+        mock_operations.side_effect = Exception("Unexpected")
 
         result = explorer.list_all_methods('s3')
         self.assertEqual(result, [])
@@ -102,11 +107,20 @@ class TestAWSServiceExplorer(unittest.TestCase):
 
 
     # Test for execute_method
+    def operation(self, required=('Bucket',), optional=()):
+        entry = {'operation': 'Op', 'description': 'Does things.', 'input_shape': 'OpRequest',
+                 'members': {name: 'string' for name in required + optional},
+                 'required': list(required), 'optional': list(optional), 'output_members': [], 'paginator': None}
+        patcher = patch('wizards.other_services_wizard.service_index.get_operation', return_value=entry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return entry
+
     @patch('builtins.input', side_effect=['"my-bucket"'])
     @patch('boto3.client')
     def test_execute_method_with_required_params(self, mock_boto_client, mock_input):
         mock_method = MagicMock(return_value={"ResponseMetadata": {"HTTPStatusCode": 200}})
-        mock_method.__doc__ = ":param Bucket: **[REQUIRED]**"
+        self.operation()
 
         client_mock = MagicMock()
         client_mock.list_objects = mock_method
@@ -122,7 +136,7 @@ class TestAWSServiceExplorer(unittest.TestCase):
     @patch('boto3.client')
     def test_execute_method_missing_required_param(self, mock_boto_client, mock_input):
         mock_method = MagicMock()
-        mock_method.__doc__ = ":param Bucket: **[REQUIRED]**"
+        self.operation()
         client_mock = MagicMock()
         client_mock.some_method = mock_method
         mock_boto_client.return_value = client_mock
@@ -135,7 +149,7 @@ class TestAWSServiceExplorer(unittest.TestCase):
     @patch('boto3.client')
     def test_execute_method_raises_exception(self, mock_boto_client, mock_input):
         mock_method = MagicMock()
-        mock_method.__doc__ = ":param Bucket: **[REQUIRED]**"
+        self.operation()
         mock_method.side_effect = Exception("Boom!")
         client_mock = MagicMock()
         client_mock.some_method = mock_method
@@ -144,6 +158,131 @@ class TestAWSServiceExplorer(unittest.TestCase):
         with patch('wizards.other_services_wizard.getattr', return_value=mock_method):
             explorer.execute_method('s3', 'some_method')
             mock_method.assert_called_once()
+
+    def test_ask_stream_options_asks_again_for_an_invalid_cap(self):
+        with patch('builtins.input', side_effect=['10O', '-5', '100', 'Key', '']), \
+             patch('builtins.print') as mock_print:
+            options = explorer.ask_stream_options('list_objects_v2')
+
+        self.assertEqual(options, (100, 'Key', None))
+        mock_print.assert_any_call("❌ Enter a positive whole number, or leave it blank for no limit.")
+
+    def test_stream_pages_writes_ndjson_with_cap_and_projection(self):
+        client = MagicMock()
+        client.get_paginator.return_value.paginate.return_value = [
+            {'Contents': [{'Key': 'a', 'Size': 1}, {'Key': 'b', 'Size': 2}], 'ResponseMetadata': {}},
+            {'Contents': [{'Key': 'c', 'Size': 3}], 'ResponseMetadata': {}},
+        ]
+        output = io.StringIO()
+
+        count = explorer.stream_pages(client, 'list_objects_v2', {'Bucket': 'b1'},
+                                      {'result_key': ['Contents', 'CommonPrefixes']}, max_items=2,
+                                      projection='Key', output=output)
+
+        self.assertEqual(count, 2)
+        self.assertEqual(output.getvalue().splitlines(), ['"a"', '"b"'])
+        client.get_paginator.assert_called_once_with('list_objects_v2')
+        client.get_paginator.return_value.paginate.assert_called_once_with(Bucket='b1', PaginationConfig={'MaxItems': 2})
+
+    @patch('builtins.print')
+    @patch('builtins.input', side_effect=['"my-bucket"', '', 'Key', ''])
+    @patch('boto3.client')
+    def test_execute_method_paginates_list_methods(self, mock_boto_client, mock_input, mock_print):
+        self.operation()['paginator'] = {'result_key': 'Contents'}
+        client_mock = MagicMock()
+        client_mock.get_paginator.return_value.paginate.return_value = [
+            {'Contents': [{'Key': 'a'}]}, {'Contents': [{'Key': 'b'}]}]
+        mock_boto_client.return_value = client_mock
+
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            explorer.execute_method('s3', 'list_objects_v2')
+
+        self.assertEqual(stdout.getvalue().splitlines(), ['"a"', '"b"'])
+        client_mock.list_objects_v2.assert_not_called()
+        mock_print.assert_any_call("\n✅ 2 item(s)")
+
+    def test_validate_record_against_input_shape(self):
+        with patch.object(service_index, '_index', service_index.build_index(['sns'])):
+            self.assertIsNone(explorer.validate_record(
+                {'service': 'sns', 'method': 'delete_topic', 'params': {'TopicArn': 'arn:aws:sns:us-east-1:1:t'}}))
+            self.assertIn('TopicArn', explorer.validate_record({'service': 'sns', 'method': 'delete_topic', 'params': {}}))
+            self.assertIn('Unknown method', explorer.validate_record({'service': 'sns', 'method': 'drop_everything'}))
+            self.assertIn('Unknown keys', explorer.validate_record({'service': 'sns', 'method': 'list_topics', 'extra': 1}))
+
+    @patch('wizards.other_services_wizard.log_action')
+    @patch('wizards.other_services_wizard.get_client')
+    def test_run_batch_writes_one_result_per_record(self, mock_get_client, mock_log_action):
+        client_mock = MagicMock()
+        client_mock.list_topics.return_value = {'Topics': [], 'ResponseMetadata': {}}
+        client_mock.delete_topic.side_effect = Exception("NotFound")
+        mock_get_client.return_value = client_mock
+        records = [
+            (1, {'service': 'sns', 'method': 'list_topics'}),
+            (2, {'service': 'sns', 'method': 'delete_topic', 'params': {'TopicArn': 'arn1'}}),
+        ]
+        output = io.StringIO()
+
+        with patch.object(explorer.config, 'delete_for_real', True), \
+             patch.object(explorer.config, 'batch_requests_per_second', 0):
+            summary = explorer.run_batch(records, output)
+
+        results = sorted((json.loads(line) for line in output.getvalue().splitlines()), key=lambda result: result['line'])
+        self.assertEqual([result['status'] for result in results], ['ok', 'error'])
+        self.assertEqual(results[0]['response'], {'Topics': []})
+        self.assertEqual(summary, {'ok': 1, 'error': 1})
+        mock_log_action.assert_called_once_with('Sns', 'arn1', False, mode="deletion")
+
+    @patch('wizards.other_services_wizard.log_action')
+    @patch('wizards.other_services_wizard.get_client')
+    def test_execute_record_only_logs_deletes_in_testing_mode(self, mock_get_client, mock_log_action):
+        with patch.object(explorer.config, 'delete_for_real', False):
+            result = explorer.execute_record({'service': 'sns', 'method': 'delete_topic', 'params': {'TopicArn': 'arn1'}})
+
+        self.assertEqual(result, {'status': 'testing'})
+        mock_get_client.assert_not_called()
+        mock_log_action.assert_called_once_with('Sns', 'arn1', True, mode="deletion")
+
+    def run_sweep_service(self, inputs, **sweeper_patches):
+        pair = explorer.sweeper.DeletePair('sns', 'list_topics', 'delete_topic', 'Topics', {'TopicArn': 'TopicArn'})
+        with patch('builtins.input', side_effect=inputs), \
+             patch('builtins.print') as mock_print, \
+             patch('wizards.other_services_wizard.service_index.get_operations', return_value={'list_topics': {}}), \
+             patch('wizards.other_services_wizard.sweeper.find_delete_pairs', return_value=[pair]), \
+             patch('wizards.other_services_wizard.select_from_list', return_value=[pair]), \
+             patch('wizards.other_services_wizard.print_list_enumerate'), \
+             patch('wizards.other_services_wizard.log_action') as mock_log_action, \
+             patch.multiple('wizards.other_services_wizard.sweeper', **sweeper_patches):
+            explorer.sweep_service()
+        return mock_print, mock_log_action
+
+    def test_sweep_service_reports_a_failing_list_call(self):
+        denied = botocore.exceptions.ClientError({'Error': {'Code': 'AccessDenied', 'Message': 'no'}}, 'ListTopics')
+
+        mock_print, mock_log_action = self.run_sweep_service(['sns', ''], iter_identifiers=MagicMock(side_effect=denied))
+
+        mock_print.assert_any_call(f"\n❌ Could not list with list_topics: {denied}")
+        mock_log_action.assert_called_once_with('Sns', 'list_topics', False, mode="listing", function_name='list_topics',
+                                                json_input='{}', response_json=str(denied))
+
+    def test_sweep_service_keeps_the_partial_summary_when_listing_stops(self):
+        def sweep(pair, max_items=None, on_result=None, list_params=None):
+            on_result({'TopicArn': 'arn1'}, 'deleted', None)
+            on_result({'TopicArn': 'arn2'}, 'failed', 'in use')
+            raise botocore.exceptions.ReadTimeoutError(endpoint_url='https://sns')
+
+        mock_print, mock_log_action = self.run_sweep_service(
+            ['sns', '', '', 'yes'], iter_identifiers=MagicMock(return_value=iter([{'TopicArn': 'arn1'}])), sweep=sweep)
+
+        mock_print.assert_any_call("\n⚠️ Sweep stopped: 1 deleted, 1 failed.")
+        self.assertEqual(mock_log_action.call_args.kwargs['mode'], "listing")
+
+    def test_rate_limiter_spaces_calls(self):
+        limiter = explorer.RateLimiter(20)
+        start = time.monotonic()
+        for _ in range(4):
+            limiter.wait()
+        self.assertGreaterEqual(time.monotonic() - start, 0.14)
+
 """
     @patch('builtins.input', side_effect=['"my-bucket"'])
     @patch('wizards.other_services_wizard.config')
@@ -153,7 +292,7 @@ class TestAWSServiceExplorer(unittest.TestCase):
         mock_config.delete_for_real = False
         
         mock_method = MagicMock()
-        mock_method.__doc__ = ":param Bucket: **[REQUIRED]**"
+        self.operation()
         
         client_mock = MagicMock()
         client_mock.delete_bucket = mock_method
@@ -175,7 +314,7 @@ class TestAWSServiceExplorer(unittest.TestCase):
         mock_config.delete_for_real = True
 
         mock_method = MagicMock(return_value={"ResponseMetadata": {"HTTPStatusCode": 200}})
-        mock_method.__doc__ = ":param Bucket: **[REQUIRED]**"
+        self.operation()
 
         client_mock = MagicMock()
         client_mock.delete_bucket = mock_method
@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from tests.test_fixtures import BaseTestCase
+import regions
+import config
+from wizards import ec2_wizard
+
+class TestRegionFanOut(BaseTestCase):
+    patch_path = 'regions.get_client'
+
+    def setUp(self):
+        super().setUp()
+        regions._enabled_regions = None
+        self.addCleanup(setattr, regions, '_enabled_regions', None)
+
+    def test_sweep_regions_uses_enabled_regions(self):
+        self.boto3_client.describe_regions.return_value = {
+            'Regions': [{'RegionName': 'us-east-1'}, {'RegionName': 'eu-west-1'}]
+        }
+
+        with patch.object(config, 'sweep_all_regions', True):
+            self.assertEqual(regions.sweep_regions(), ['eu-west-1', 'us-east-1'])
+            regions.sweep_regions()
+
+        self.boto3_client.describe_regions.assert_called_once()  # Cached for the session
+        with patch.object(config, 'sweep_all_regions', False):
+            self.assertEqual(regions.sweep_regions(), [None])
+
+    def test_fan_out_merges_region_tagged_results(self):
+        def list_function(region_name=None):
+            if region_name == 'ap-south-1':
+                raise Exception("region disabled")
+            return {'stack1': {'Region': region_name}}
+
+        with patch('builtins.print'):
+            results = regions.fan_out(list_function, ['us-east-1', 'eu-west-1', 'ap-south-1'])
+
+        self.assertEqual(sorted(results), ['eu-west-1', 'us-east-1'])
+        flat = regions.flatten(results)
+        self.assertEqual(len(flat), 2)
+        self.assertEqual(regions.label('eu-west-1', 'stack1'), 'stack1 [eu-west-1]')
+        self.assertEqual(regions.group_by_region([('us-east-1', 'a'), ('eu-west-1', 'b'), ('us-east-1', 'c')]),
+                         {'us-east-1': ['a', 'c'], 'eu-west-1': ['b']})
+
+    def test_fan_out_caps_concurrent_regions(self):
+        lock = threading.Lock()
+        running, peak = [0], [0]
+        def list_function(region_name=None):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return {}
+
+        with patch.object(config, 'region_workers', 2):
+            results = regions.fan_out(list_function, ['us-east-1', 'eu-west-1', 'ap-south-1', 'sa-east-1'])
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual(peak[0], 2)
+
+    def test_ec2_termination_targets_each_instance_region(self):
+        inventory = {
+            'us-east-1': {'i-1': MagicMock(Status='running', Description='a')},
+            'eu-west-1': {'i-2': MagicMock(Status='running', Description='b')}
+        }
+        with patch('wizards.ec2_wizard.regions.fan_out', return_value=inventory), \
+             patch('wizards.ec2_wizard.terminate_instances', return_value={}) as mock_terminate, \
+             patch('wizards.ec2_wizard.release_instance_owners') as mock_release, \
+             patch('wizards.ec2_wizard.input', side_effect=['all', 'yes']), \
+             patch.object(config, 'delete_for_real', True), \
+             patch('builtins.print'):
+            ec2_wizard.terminate_selected_instances()
+
+        mock_terminate.assert_any_call(['i-1'], region_name='us-east-1')
+        mock_terminate.assert_any_call(['i-2'], region_name='eu-west-1')
+        mock_release.assert_any_call(['i-2'], inventory['eu-west-1'], 'eu-west-1')
+
+if __name__ == '__main__':
+    unittest.main()
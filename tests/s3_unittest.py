@@ -1,14 +1,31 @@
 # tests/s3_unittest.py
 from tests.test_fixtures import BaseTestCase
 from unittest.mock import MagicMock, patch
+from botocore.exceptions import ClientError
 import os
 import sys
+import tempfile
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from wizards import s3_wizard
+import config
+import clients
 
 class TestS3Wizard(BaseTestCase):
     patch_path = 'wizards.s3_wizard.boto3.client'
 
+    def setUp(self):
+        super().setUp()
+        # Keep the bucket-region and pending-deletion files out of the working tree
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for name, value in [('s3_region_cache_file', os.path.join(tmp.name, 'regions.json')),
+                            ('s3_pending_deletions_file', os.path.join(tmp.name, 'pending.json'))]:
+            patcher = patch.object(config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        s3_wizard._region_cache = None
+        self.boto3_client.get_bucket_location.return_value = {'LocationConstraint': 'eu-west-1'}
+
     def test_list_s3_buckets_single(self):
         # Test with only test-bucket to match observed output
         active_bucket = self.create_resource(
@@ -42,30 +59,149 @@ class TestS3Wizard(BaseTestCase):
         self.assertEqual(len(result), 1)  # Only one bucket returned
 
     def test_empty_bucket_success(self):
-        # Mock boto3 client responses for a bucket with objects and versions
-        self.boto3_client.list_objects_v2.return_value = {
-            'Contents': [{'Key': 'file1.txt'}]
-        }
-        self.boto3_client.list_object_versions.return_value = {
-            'Versions': [{'Key': 'file1.txt', 'VersionId': 'v1'}]
-        }
+        # Mock a paginated bucket with current versions, old versions and delete markers
+        self.boto3_client.get_paginator.return_value.paginate.return_value = [
+            {'Versions': [{'Key': f'file{i}.txt', 'VersionId': 'null'} for i in range(1000)]},
+            {'Versions': [{'Key': 'file1.txt', 'VersionId': 'v1'}],
+             'DeleteMarkers': [{'Key': 'file2.txt', 'VersionId': 'dm1'}]}
+        ]
         self.boto3_client.delete_objects.return_value = {}
 
-        result = s3_wizard.empty_bucket('test-bucket')
+        with patch('builtins.print'):
+            result = s3_wizard.empty_bucket('test-bucket')
 
         self.assertTrue(result)
-        self.boto3_client.delete_objects.assert_called()
-        self.assertEqual(self.boto3_client.delete_objects.call_count, 2)  # Once for objects, once for versions
+        self.boto3_client.get_paginator.assert_called_once_with('list_object_versions')
+        self.assertEqual(self.boto3_client.delete_objects.call_count, 2)  # One full batch, one partial
+        last_batch = self.boto3_client.delete_objects.call_args_list[-1].kwargs['Delete']
+        self.assertTrue(last_batch['Quiet'])
+        self.assertIn({'Key': 'file2.txt', 'VersionId': 'dm1'}, last_batch['Objects'])
+
+    def test_empty_bucket_reports_partial_failures(self):
+        self.boto3_client.get_paginator.return_value.paginate.return_value = [
+            {'Versions': [{'Key': 'locked.txt', 'VersionId': 'v1'}]}
+        ]
+        self.boto3_client.delete_objects.return_value = {
+            'Errors': [{'Key': 'locked.txt', 'Code': 'AccessDenied', 'Message': 'Access Denied'}]
+        }
+
+        with patch('wizards.s3_wizard.log_action') as mock_log_action, patch('builtins.print') as mock_print:
+            result = s3_wizard.empty_bucket('test-bucket')
+
+        self.assertFalse(result)
+        mock_log_action.assert_called_once_with('S3', 'test-bucket', False, mode='deletion')
+        mock_print.assert_any_call("Error emptying bucket test-bucket: 1 object(s) could not be deleted, e.g. locked.txt: AccessDenied Access Denied")
 
     def test_empty_bucket_failure(self):
         # Mock boto3 client to raise an exception
-        self.boto3_client.list_objects_v2.side_effect = Exception('AccessDenied')
+        self.boto3_client.get_paginator.return_value.paginate.side_effect = Exception('AccessDenied')
 
         with patch('wizards.s3_wizard.log_action') as mock_log_action:
             result = s3_wizard.empty_bucket('test-bucket')
 
             self.assertFalse(result)
             mock_log_action.assert_called_once_with('S3', 'test-bucket', False, mode='deletion')
+
+    def test_list_s3_buckets_probes_fail_independently(self):
+        self.boto3_client.list_buckets.return_value = {
+            'Buckets': [
+                {'Name': 'untagged-bucket', 'CreationDate': '2022-01-01T00:00:00Z'},
+                {'Name': 'versioned-bucket', 'CreationDate': '2022-01-02T00:00:00Z'}
+            ]
+        }
+        self.boto3_client.get_bucket_tagging.side_effect = ClientError(
+            {'Error': {'Code': 'NoSuchTagSet', 'Message': 'The TagSet does not exist'}}, 'GetBucketTagging')
+        self.boto3_client.list_objects_v2.return_value = {'KeyCount': 0}
+        self.boto3_client.list_object_versions.side_effect = lambda Bucket, MaxKeys: (
+            {'DeleteMarkers': [{'Key': 'gone.txt'}]} if Bucket == 'versioned-bucket' else {})
+
+        result = s3_wizard.list_s3_buckets()
+
+        self.assertEqual(list(result), ['untagged-bucket', 'versioned-bucket'])
+        self.assertEqual(result['untagged-bucket']['Description'], 'No description available')
+        self.assertEqual(result['untagged-bucket']['Status'], 'Inactive ❌')
+        self.assertEqual(result['versioned-bucket']['Status'], 'Active')
+        self.boto3_client.list_objects_v2.assert_any_call(Bucket='untagged-bucket', MaxKeys=1)
+
+    def test_delete_buckets_smallest_first_and_logged(self):
+        self.boto3_client.get_metric_data.return_value = {
+            'MetricDataResults': [
+                {'Id': 'b0', 'Values': [5000000.0]},
+                {'Id': 'b1', 'Values': [12.0]},
+                {'Id': 'b2', 'Values': []}
+            ]
+        }
+        inventory = {'empty-bucket': {'Status': 'Inactive ❌'}}
+        started = []
+
+        def fake_delete(name, progress_callback):
+            started.append(name)
+            progress_callback(1, 1.0)
+            return True, f"✅ Successfully deleted: {name}"
+
+        with patch('wizards.s3_wizard.delete_bucket', side_effect=fake_delete), \
+             patch.object(config, 's3_bucket_workers', 1), \
+             patch('builtins.print'):
+            names = ['huge-bucket', 'small-bucket', 'no-metrics', 'empty-bucket']
+            s3_wizard.delete_buckets(names, s3_wizard.estimate_object_counts(names, inventory))
+
+        self.assertEqual(started, ['empty-bucket', 'small-bucket', 'huge-bucket', 'no-metrics'])
+        queries = self.boto3_client.get_metric_data.call_args.kwargs['MetricDataQueries']
+        self.assertEqual(len(queries), 3)  # The empty bucket needs no metric lookup
+
+    def test_delete_bucket_logs_result(self):
+        self.boto3_client.delete_bucket.return_value = {}
+
+        with patch('wizards.s3_wizard.empty_bucket', return_value=True), \
+             patch('wizards.s3_wizard.log_action') as mock_log_action, \
+             patch('builtins.print'):
+            success, _ = s3_wizard.delete_bucket('test-bucket')
+
+        self.assertTrue(success)
+        self.boto3_client.delete_bucket.assert_called_once_with(Bucket='test-bucket')
+        mock_log_action.assert_called_once_with('S3', 'test-bucket', True, mode='deletion')
+
+    def test_expire_bucket_then_delete_when_empty(self):
+        with patch('wizards.s3_wizard.log_action') as mock_log_action, \
+             patch('builtins.print'):
+            self.assertTrue(s3_wizard.expire_bucket('huge-bucket'))
+            rules = self.boto3_client.put_bucket_lifecycle_configuration.call_args.kwargs['LifecycleConfiguration']['Rules']
+            self.assertTrue(any(rule['Expiration'].get('ExpiredObjectDeleteMarker') for rule in rules))
+            self.assertIn('huge-bucket', s3_wizard.load_pending_deletions())
+            mock_log_action.assert_called_with('S3', 'huge-bucket', True, mode='request')
+
+            # Still emptying: stays pending
+            self.boto3_client.list_objects_v2.return_value = {'Contents': [{'Key': 'file1.txt'}]}
+            s3_wizard.check_pending_deletions()
+            self.boto3_client.delete_bucket.assert_not_called()
+            self.assertIn('huge-bucket', s3_wizard.load_pending_deletions())
+
+            # Emptied by S3: deleted and dropped from the pending list
+            self.boto3_client.list_objects_v2.return_value = {'KeyCount': 0}
+            self.boto3_client.list_object_versions.return_value = {}
+            s3_wizard.check_pending_deletions()
+            self.boto3_client.delete_bucket.assert_called_once_with(Bucket='huge-bucket')
+            self.assertEqual(s3_wizard.load_pending_deletions(), {})
+            mock_log_action.assert_called_with('S3', 'huge-bucket', True, mode='deletion')
+
+    def test_bucket_regions_resolved_once_and_cached_on_disk(self):
+        self.boto3_client.list_buckets.return_value = {
+            'Buckets': [
+                {'Name': 'eu-bucket', 'CreationDate': '2022-01-01T00:00:00Z'},
+                {'Name': 'listed-bucket', 'CreationDate': '2022-01-01T00:00:00Z', 'BucketRegion': 'ap-south-1'}
+            ]
+        }
+        self.boto3_client.list_objects_v2.return_value = {'Contents': [{'Key': 'file1.txt'}]}
+
+        s3_wizard.list_s3_buckets()
+        s3_wizard._region_cache = None  # Simulate a new run reading the disk cache
+        s3_wizard.empty_bucket('eu-bucket', progress_callback=lambda deleted, elapsed: None)
+
+        self.boto3_client.get_bucket_location.assert_called_once_with(Bucket='eu-bucket')
+        self.mock_boto_client.assert_any_call('s3', region_name='eu-west-1', config=clients.client_config)
+        self.mock_boto_client.assert_any_call('s3', region_name='ap-south-1', config=clients.client_config)
+        self.assertEqual(s3_wizard.get_bucket_region('listed-bucket'), 'ap-south-1')
+
 """
     def test_delete_selected_buckets_real(self):
         with patch('wizards.s3_wizard.input') as mock_input, \
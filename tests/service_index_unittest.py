@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import service_index
+import config
+
+class TestServiceIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        index_file = patch.object(config, 'service_index_file', os.path.join(self.tempdir.name, 'service_index.json'))
+        index_file.start()
+        self.addCleanup(index_file.stop)
+        service_index._index = None
+        self.addCleanup(setattr, service_index, '_index', None)
+
+    def test_build_index_reads_service_models(self):
+        index = service_index.build_index(['s3'])
+
+        delete_bucket = index['services']['s3']['delete_bucket']
+        self.assertEqual(delete_bucket['operation'], 'DeleteBucket')
+        self.assertIn('Bucket', delete_bucket['required'])
+        self.assertIn('ExpectedBucketOwner', delete_bucket['optional'])
+        self.assertIsNone(delete_bucket['paginator'])
+        list_objects = index['services']['s3']['list_objects_v2']
+        self.assertEqual(list_objects['paginator']['input_token'], 'ContinuationToken')
+        self.assertEqual(list_objects['members']['MaxKeys'], 'integer')
+
+    def test_index_is_saved_and_invalidated_by_botocore_version(self):
+        index = service_index.build_index(['sqs'])
+        service_index.save_index(index)
+        self.assertEqual(service_index.load_index(), index)
+
+        with patch('service_index.botocore.__version__', '0.0.0'):
+            self.assertIsNone(service_index.load_index())
+
+    def test_get_index_builds_once_then_loads(self):
+        with patch('service_index.build_index', return_value=service_index.build_index(['sqs'])) as mock_build, \
+             patch('builtins.print'):
+            service_index.get_index()
+            service_index._index = None
+            service_index.get_index()
+
+        mock_build.assert_called_once()
+        self.assertTrue(service_index.can_paginate('sqs', 'list_queues'))
+
+    def test_search_operations_across_services(self):
+        service_index._index = service_index.build_index(['dynamodb', 's3', 'sqs'])
+
+        matches = service_index.search_operations('delete table')
+        self.assertEqual(matches[0][:2], ('dynamodb', 'delete_table'))
+
+        # Typos still find the closest method names
+        matches = service_index.search_operations('delte_queue')
+        self.assertIn(('sqs', 'delete_queue'), [match[:2] for match in matches])
+
+if __name__ == '__main__':
+    unittest.main()
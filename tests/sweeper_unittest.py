@@ -0,0 +1,96 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from tests.test_fixtures import BaseTestCase
+import service_index
+import sweeper
+import config
+
+class TestSweeper(BaseTestCase):
+    patch_path = 'sweeper.get_client'
+
+    def setUp(self):
+        super().setUp()
+        index = patch.object(service_index, '_index', service_index.build_index(['dynamodb', 'sns', 'sqs', 'ec2', 'redshift', 'kms']))
+        index.start()
+        self.addCleanup(index.stop)
+
+    def test_find_delete_pairs_from_service_models(self):
+        pairs = {pair.DeleteMethod: pair for pair in sweeper.find_delete_pairs('sns')}
+        self.assertEqual(pairs['delete_topic'].ListMethod, 'list_topics')
+        self.assertEqual(pairs['delete_topic'].ResultKey, 'Topics')
+        self.assertEqual(pairs['delete_topic'].Identifiers, {'TopicArn': 'TopicArn'})
+
+        queues = sweeper.find_delete_pairs('sqs')
+        self.assertIn(('list_queues', 'delete_queue', 'QueueUrls', {'QueueUrl': None}),
+                      [tuple(pair)[1:] for pair in queues])
+        tables = {pair.DeleteMethod: pair for pair in sweeper.find_delete_pairs('dynamodb')}
+        self.assertEqual(tables['delete_table'].Identifiers, {'TableName': None})
+
+    def test_list_calls_are_scoped_to_the_callers_resources(self):
+        snapshots = {pair.DeleteMethod: pair for pair in sweeper.find_delete_pairs('ec2')}['delete_snapshot']
+        self.assertEqual(sweeper.default_list_params(snapshots), {'OwnerIds': ['self']})
+        self.boto3_client.get_paginator.return_value.paginate.return_value = [{'Snapshots': [{'SnapshotId': 'snap-1'}, {}]}]
+
+        identifiers = list(sweeper.iter_identifiers(snapshots))
+
+        self.boto3_client.get_paginator.return_value.paginate.assert_called_once_with(OwnerIds=['self'])
+        self.assertEqual(identifiers, [{'SnapshotId': 'snap-1'}])
+        # Only an account ID could scope these, so they are left out
+        self.assertNotIn('delete_cluster_snapshot', [pair.DeleteMethod for pair in sweeper.find_delete_pairs('redshift')])
+
+    def test_aws_managed_items_are_skipped(self):
+        self.boto3_client.get_paginator.return_value.paginate.return_value = [
+            {'Aliases': [{'AliasName': 'alias/aws/s3'}, {'AliasName': 'alias/mine'}]}]
+        pair = sweeper.DeletePair('kms', 'list_aliases', 'delete_alias', 'Aliases', {'AliasName': 'AliasName'})
+
+        self.assertEqual(list(sweeper.iter_identifiers(pair, list_params={'KeyId': 'key-1'})), [{'AliasName': 'alias/mine'}])
+        self.boto3_client.get_paginator.return_value.paginate.assert_called_once_with(KeyId='key-1')
+
+    def test_sweep_streams_listed_identifiers_into_deletes(self):
+        self.boto3_client.get_paginator.return_value.paginate.return_value = [
+            {'TableNames': ['t1', 't2']}, {'TableNames': ['t3']}]
+        def delete_table(TableName):
+            if TableName == 't2':
+                raise Exception("in use")
+        self.boto3_client.delete_table.side_effect = delete_table
+        pair = sweeper.DeletePair('dynamodb', 'list_tables', 'delete_table', 'TableNames', {'TableName': None})
+        results = []
+
+        with patch.object(config, 'delete_for_real', True), \
+             patch('sweeper.log_action') as mock_log_action:
+            summary = sweeper.sweep(pair, on_result=lambda params, status, error: results.append((params['TableName'], status)))
+
+        self.assertEqual(summary, {'deleted': 2, 'failed': 1})
+        self.assertEqual(sorted(results), [('t1', 'deleted'), ('t2', 'failed'), ('t3', 'deleted')])
+        self.boto3_client.get_paginator.assert_called_once_with('list_tables')
+        mock_log_action.assert_any_call('Dynamodb', 't2', False, mode="deletion")
+
+    def test_sweep_counts_errors_raised_while_recording_results(self):
+        self.boto3_client.get_paginator.return_value.paginate.return_value = [{'TableNames': ['t1', 't2']}]
+        pair = sweeper.DeletePair('dynamodb', 'list_tables', 'delete_table', 'TableNames', {'TableName': None})
+
+        with patch.object(config, 'delete_for_real', False), \
+             patch('sweeper.log_action', side_effect=[None, IOError("disk full")]), \
+             patch('builtins.print'):
+            summary = sweeper.sweep(pair)
+
+        self.assertEqual(summary, {'logged': 1, 'errors': 1})
+
+    def test_sweep_only_logs_in_testing_mode(self):
+        self.boto3_client.list_topics.return_value = {'Topics': [{'TopicArn': 'arn1'}, {'TopicArn': 'arn2'}]}
+        pair = sweeper.DeletePair('sns', 'list_topics', 'delete_topic', 'Topics', {'TopicArn': 'TopicArn'})
+
+        with patch.object(config, 'delete_for_real', False), \
+             patch('sweeper.service_index.can_paginate', return_value=False), \
+             patch('sweeper.log_action') as mock_log_action:
+            summary = sweeper.sweep(pair, max_items=1)
+
+        self.assertEqual(summary, {'logged': 1})
+        self.boto3_client.delete_topic.assert_not_called()
+        mock_log_action.assert_called_once_with('Sns', 'arn1', True, mode="deletion")
+
+if __name__ == '__main__':
+    unittest.main()
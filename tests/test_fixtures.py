@@ -2,6 +2,10 @@
 import unittest
 from unittest.mock import MagicMock, patch
 from datetime import datetime
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import clients
 
 def create_mock_client():
     return MagicMock()
@@ -41,8 +45,12 @@ def create_mock_resource(
 class BaseTestCase(unittest.TestCase):
     patch_path='boto3.client'
     def setUp(self):
+        # Wizards share cached clients; start every test from an empty cache
+        clients.clear_client_cache()
+        self.addCleanup(clients.clear_client_cache)
         patcher= patch(self.patch_path)
         self.mock_boto_client = patcher.start()
+        self.addCleanup(patcher.stop)
 
         self.boto3_client = create_mock_client()
         self.mock_boto_client.return_value = self.boto3_client
@@ -1,15 +1,18 @@
 import boto3, botocore
 import datetime
+import time
+from collections import deque
+from functools import partial
 from utility import *
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from logger import log_action
+from clients import get_client
+import regions
 import config
-# Get delete_for_real from environment variable
-delete_for_real = os.getenv('DELETE_FOR_REAL', 'False') == 'True'
 
-def list_cloudformation_stacks(): #retrieve and display all cloudformation stacks
+def list_cloudformation_stacks(region_name=None, show=True): #retrieve and display all cloudformation stacks
     StackStatusFilter=[
                 'CREATE_IN_PROGRESS', 'CREATE_FAILED', 'CREATE_COMPLETE',
                 'ROLLBACK_IN_PROGRESS', 'ROLLBACK_FAILED', 'ROLLBACK_COMPLETE',
@@ -22,41 +25,27 @@ def list_cloudformation_stacks(): #retrieve and display all cloudformation stack
                 'IMPORT_ROLLBACK_IN_PROGRESS', 'IMPORT_ROLLBACK_FAILED', 'IMPORT_ROLLBACK_COMPLETE'
             ]
     try:
-        client = boto3.client('cloudformation')
+        client = get_client('cloudformation', region_name=region_name)
         stacks = {}
-        response = client.list_stacks(StackStatusFilter=StackStatusFilter)
-
-        for stack in response.get('StackSummaries', []):
-            stack_name = stack['StackName']
-            stack_status = stack['StackStatus']
-            
-            stacks[stack_name] = {
-                'StackStatus': stack_status,
-                'StackId': stack['StackId'],
-                'Description': None
-            }
-        
-        while 'NextToken' in response: 
-            response = client.list_stacks(StackStatusFilter=StackStatusFilter,NextToken=response['NextToken'])
-            
-            for stack in response.get('StackSummaries', []):
-                stack_name = stack['StackName']
-                stacks[stack_name] = {
+
+        # One paginated describe_stacks sweep returns every live stack with its description
+        # (it only leaves out DELETE_COMPLETE, which the filter excludes anyway)
+        for page in client.get_paginator('describe_stacks').paginate():
+            for stack in page.get('Stacks', []):
+                if stack['StackStatus'] not in StackStatusFilter:
+                    continue
+                stacks[stack['StackName']] = {
                     'StackStatus': stack['StackStatus'],
                     'StackId': stack['StackId'],
-                    'Description': None  
+                    'Description': stack.get('Description', 'No description provided')
                 }
-                
-        for stack_name in stacks.keys():
-            try:
-                stack_details = client.describe_stacks(StackName=stack_name)['Stacks'][0]
-                stacks[stack_name]['Description'] = stack_details.get('Description', 'No description provided')
-            except botocore.exceptions.ClientError as e:
-                print(f"⚠️ Failed to get the description of {stack_name}: {e}")
-                stacks[stack_name]['Description'] = 'Error retrieving description'
-        
-        
-        print_list_enumerate(stacks, "CloudFormation Stacks")
+                # Nested stacks carry their parent and root, used to order deletions
+                if 'ParentId' in stack:
+                    stacks[stack['StackName']]['ParentId'] = stack['ParentId']
+                    stacks[stack['StackName']]['RootId'] = stack.get('RootId', stack['ParentId'])
+
+        if show:
+            print_list_enumerate(stacks, "CloudFormation Stacks")
         
         return stacks if stacks else {}
     
@@ -76,14 +65,21 @@ def list_cloudformation_stacks(): #retrieve and display all cloudformation stack
         
 
 
+def show_cloudformation_stacks(): #list stacks from every swept region as one region-tagged inventory
+    inventory = regions.fan_out(partial(list_cloudformation_stacks, show=False))
+    stacks = regions.flatten(inventory)
+    print_list_enumerate({regions.label(region, stack): info for region, stack, info in stacks}, "CloudFormation Stacks")
+    return inventory, stacks
+
+
 def delete_selected_stacks(): #delete selected cloudformation stacks
     print("Retrieving CloudFormation stacks......")
-    stacks = list_cloudformation_stacks()  
+    inventory, stacks = show_cloudformation_stacks()
     
     if not stacks:
         return
         
-    selected_stacks = select_from_list(list(stacks.keys()),
+    selected_stacks = select_from_list([(region, stack) for region, stack, _ in stacks],
                                        "Enter the numbers of the stacks you want to delete (comma-separated), type 'all' to delete all or 'exit' to cancel: ",)
 
     if not selected_stacks:
@@ -96,48 +92,252 @@ def delete_selected_stacks(): #delete selected cloudformation stacks
         print("🚫 Deletion canceled.")
         return
     
+    process_stack_deletions(selected_stacks, inventory)
+
+
+def process_stack_deletions(selected_stacks, inventory): #delete confirmed (region, stack) pairs, or only log them in testing mode
+    if not config.delete_for_real:
+        for region, stack in selected_stacks:
+            log_action("Cloud Formation", stack, True, mode="deletion")
+            print(f" Logged delete attempt for: {regions.label(region, stack)}")
+        return
+
     try:
-        cloudformation_client = boto3.client('cloudformation')
-        for stack in selected_stacks:
-            
-            try:
-                if delete_for_real:
-                    cloudformation_client.delete_stack(StackName=stack)
-                    print(f"⏳ Deletion initiated for: {stack}, waiting for confirmation...")
-                    waiter = cloudformation_client.get_waiter('stack_delete_complete')
-                    try:
-                        waiter.wait(StackName=stack)
-                        print(f"✅ Successfully deleted: {stack}")
-                        log_action("Cloud Formation",stack, True, mode="deletion")
-                    except botocore.exceptions.WaiterError as e:
-                        print(f"⚠️ Failed to delete {stack}. It may have dependencies.")
-                        log_action("Cloud Formation",stack, False, mode="deletion")
-                else:
-                    log_action("Cloud Formation", stack, True, mode="deletion")
-                    print(f" Logged delete attempt for: {stack}")
-            
-            except (botocore.exceptions.EndpointConnectionError, 
-                    botocore.exceptions.BotoCoreError, 
-                    boto3.exceptions.Boto3Error, 
-                    Exception) as e:
-                print(f"❌ Error while deleting {stack}: {e}")
-                log_action("Cloud Formation", stack, False, mode="deletion")
-    
+        # Each region's stacks are scheduled against that region's own dependency graph
+        for region, stack_names in regions.group_by_region(selected_stacks).items():
+            delete_stacks(stack_names, inventory[region], region_name=region)
     except botocore.exceptions.BotoCoreError as e:
         print(f"❌ General AWS BotoCore error: {e}")
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
-            
 
 
-if __name__ == "__main__":
+def delete_stacks(stack_names, stacks, region_name=None): #delete stacks concurrently, each one as soon as its importers are gone
+    cloudformation_client = get_client('cloudformation', region_name=region_name)
+
+    # Nested stacks are removed by their root stack; deleting them directly corrupts the parent
+    names_by_id = {info['StackId']: name for name, info in stacks.items()}
+    targets = []
+    for stack in stack_names:
+        if not stacks[stack].get('ParentId'):
+            targets.append(stack)
+            continue
+        root = names_by_id.get(stacks[stack].get('RootId'), stacks[stack].get('RootId'))
+        if root in stack_names:
+            print(f"⏭️ Skipping nested stack {stack}: it is deleted together with its root stack {root}.")
+        else:
+            print(f"⚠️ Skipping nested stack {stack}: select its root stack {root} to delete it.")
+            log_action("Cloud Formation", stack, False, mode="deletion")
+
+    blockers, external = build_dependency_graph(cloudformation_client, targets, stacks)
+    dependents = {stack: set() for stack in targets}
+    for stack, consumers in blockers.items():
+        for consumer in consumers:
+            dependents[consumer].add(stack)
+
+    skipped = set()
+
+    def skip(stack, reason):
+        # A stack that cannot be deleted keeps every stack it imports from alive as well
+        if stack in skipped:
+            return
+        skipped.add(stack)
+        print(f"⚠️ Skipping {stack}: {reason}")
+        log_action("Cloud Formation", stack, False, mode="deletion")
+        for exporter in dependents[stack]:
+            skip(exporter, f"its exports are still imported by {stack}")
+
+    for stack, importers in external.items():
+        skip(stack, f"its exports are imported by stacks that were not selected ({', '.join(sorted(importers))})")
+
+    def finish(stack, success):
+        if not success:
+            for exporter in dependents[stack]:
+                skip(exporter, f"{stack}, which imports its exports, could not be deleted")
+            return
+        # Queue every exporter whose last importer just went away
+        for exporter in dependents[stack]:
+            blockers[exporter].discard(stack)
+            if not blockers[exporter] and exporter not in skipped:
+                queue.append(exporter)
+
+    queue = deque(stack for stack in targets if not blockers[stack] and stack not in skipped)
+    poller = StackDeletionPoller(cloudformation_client)
+    while queue or poller.pending:
+        # Keep at most cloudformation_delete_workers deletions in flight
+        while queue and len(poller.pending) < config.cloudformation_delete_workers:
+            stack = queue.popleft()
+            if stack in skipped:
+                continue
+            if _start_stack_deletion(cloudformation_client, stack):
+                poller.add(stacks[stack]['StackId'], stack)
+            else:
+                finish(stack, False)
+        if poller.pending:
+            for stack, success in poller.wait_for_changes():
+                finish(stack, success)
+
+    # Whatever is still blocked depends on itself through a cycle of exports
+    for stack in targets:
+        if blockers[stack] and stack not in skipped:
+            skip(stack, "it is part of a circular export/import dependency")
+
+
+def build_dependency_graph(client, targets, stacks): #map each stack to the selected stacks importing its exports
+    """Return (blockers, external).
+
+    blockers[stack] is the set of selected stacks that import one of its exports and must be deleted first.
+    external[stack] lists importers outside the selection, which make the stack undeletable.
+    Imports made by nested stacks are attributed to their root stack, which is the one being deleted.
+    """
+    names_by_id = {info['StackId']: name for name, info in stacks.items()}
+
+    def owner(stack_name):
+        root_id = stacks.get(stack_name, {}).get('RootId')
+        return names_by_id.get(root_id, stack_name)
+
+    blockers = {stack: set() for stack in targets}
+    external = {}
+    for page in client.get_paginator('list_exports').paginate():
+        for export in page.get('Exports', []):
+            exporter = owner(names_by_id.get(export['ExportingStackId'], ''))
+            if exporter not in blockers:
+                continue
+            for importer in _list_importers(client, export['Name']):
+                importer = owner(importer)
+                if importer == exporter:
+                    continue
+                if importer in blockers:
+                    blockers[exporter].add(importer)
+                else:
+                    external.setdefault(exporter, set()).add(importer)
+    return blockers, external
+
+
+def _list_importers(client, export_name):
+    try:
+        return [stack for page in client.get_paginator('list_imports').paginate(ExportName=export_name)
+                for stack in page.get('Imports', [])]
+    except botocore.exceptions.ClientError:
+        # list_imports fails with a ValidationError when nothing imports the export
+        return []
+
+
+def _start_stack_deletion(cloudformation_client, stack):
+    try:
+        cloudformation_client.delete_stack(StackName=stack)
+        print(f"⏳ Deletion initiated for: {stack}, waiting for confirmation...")
+        return True
+    except (botocore.exceptions.EndpointConnectionError, 
+            botocore.exceptions.BotoCoreError, 
+            boto3.exceptions.Boto3Error, 
+            Exception) as e:
+        print(f"❌ Error while deleting {stack}: {e}")
+        log_action("Cloud Formation", stack, False, mode="deletion")
+        return False
+
+
+class StackDeletionPoller: #track every in-flight deletion with one describe_stacks sweep per poll
+    """Shared replacement for one stack_delete_complete waiter per stack.
+
+    Each poll is a single paginated describe_stacks sweep; stacks missing from it have finished
+    deleting (describe_stacks omits DELETE_COMPLETE). The interval starts at
+    cloudformation_poll_min_interval, backs off towards cloudformation_poll_max_interval while
+    nothing changes (or describe_stacks fails) and resets as soon as a stack finishes.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.pending = {}  # StackId -> stack name
+        self.deadlines = {}  # StackId -> time.monotonic() after which it counts as failed
+        self.interval = config.cloudformation_poll_min_interval
+
+    def add(self, stack_id, stack_name):
+        self.pending[stack_id] = stack_name
+        self.deadlines[stack_id] = time.monotonic() + config.cloudformation_max_wait
+
+    def wait_for_changes(self):
+        """Sleep and poll until at least one pending stack finishes or times out; return [(name, success)].
+
+        Each stack gets cloudformation_max_wait seconds from its own delete_stack call, like the
+        stack_delete_complete waiter it replaces; a stack still deleting after that counts as failed.
+        """
+        while True:
+            until_first_deadline = min(self.deadlines.values()) - time.monotonic()
+            time.sleep(max(0, min(self.interval, until_first_deadline)))
+            finished = self.poll() + self.expire()
+            if finished:
+                self.interval = config.cloudformation_poll_min_interval
+                return finished
+            self.interval = min(self.interval * 1.5, config.cloudformation_poll_max_interval)
+
+    def expire(self):
+        expired = []
+        now = time.monotonic()
+        for stack_id, stack_name in list(self.pending.items()):
+            if self.deadlines[stack_id] <= now:
+                print(f"⚠️ Gave up waiting for {stack_name} after {config.cloudformation_max_wait}s.")
+                log_action("Cloud Formation", stack_name, False, mode="deletion")
+                expired.append((stack_name, False))
+                self.remove(stack_id)
+        return expired
+
+    def remove(self, stack_id):
+        del self.pending[stack_id]
+        del self.deadlines[stack_id]
+
+    def poll(self):
+        statuses = {}
+        try:
+            for page in self.client.get_paginator('describe_stacks').paginate():
+                for stack in page.get('Stacks', []):
+                    if stack['StackId'] in self.pending:
+                        statuses[stack['StackId']] = stack['StackStatus']
+        except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+            # An incomplete sweep would make stacks look deleted: poll again after a longer sleep
+            print(f"⚠️ Could not poll stack deletions: {e}")
+            return []
+
+        finished = []
+        for stack_id, stack_name in list(self.pending.items()):
+            status = statuses.get(stack_id, 'DELETE_COMPLETE')
+            if status == 'DELETE_COMPLETE':
+                print(f"✅ Successfully deleted: {stack_name}")
+                log_action("Cloud Formation",stack_name, True, mode="deletion")
+                finished.append((stack_name, True))
+            elif status == 'DELETE_FAILED':
+                print(f"⚠️ Failed to delete {stack_name}: {self.failure_reason(stack_id)}")
+                log_action("Cloud Formation",stack_name, False, mode="deletion")
+                finished.append((stack_name, False))
+            else:
+                continue
+            self.remove(stack_id)
+        return finished
+
+    def failure_reason(self, stack_id):
+        """Pull the resource that blocked the deletion from the most recent stack events."""
+        try:
+            events = self.client.describe_stack_events(StackName=stack_id).get('StackEvents', [])
+        except botocore.exceptions.ClientError as e:
+            return f"could not read stack events ({e})"
+        for event in events:
+            if event.get('ResourceStatus') == 'DELETE_FAILED' and event.get('PhysicalResourceId') != stack_id:
+                return f"{event['LogicalResourceId']} ({event.get('ResourceType')}): {event.get('ResourceStatusReason', 'no reason given')}"
+        return "It may have dependencies."
+
+
+def interactive_menu():
     run_interactive_menu(
     "*   Welcome to ExcaliSweep Cloud Formation Wizard!  *\n*   Your Cloud Formation Stacks Cleanup Assistant   *",
     [
-        ("List CloudFormation Stacks and Status", list_cloudformation_stacks, False),
+        ("List CloudFormation Stacks and Status", show_cloudformation_stacks, False),
         ("Delete Stacks", delete_selected_stacks, False),
         ("Exit", None, True)
     ]
 )
 
-            
+
+if __name__ == "__main__":
+    # Launched as a separate process: main.py hands the mode over through the environment
+    config.delete_for_real = os.getenv('DELETE_FOR_REAL', 'False') == 'True'
+    interactive_menu()
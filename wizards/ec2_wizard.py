@@ -1,54 +1,99 @@
 import boto3
 import datetime
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from logger import log_action
+from clients import get_client
+import regions
 import config 
 import os
-# Get delete_for_real from environment variable
-delete_for_real = os.getenv('DELETE_FOR_REAL', 'False') == 'True'
-
-def list_ec2_instances():
-    ec2_client = boto3.client('ec2')
-    response = ec2_client.describe_instances()
-    
-    instances = {}
-    for reservation in response.get('Reservations', []):
-        for instance in reservation.get('Instances', []):
-            state = instance['State']['Name']
-            if state == "terminated":  # Filter out terminated instances
-                continue
-            
-            instance_id = instance['InstanceId']
-            launch_time = instance['LaunchTime']
-            instance_type = instance['InstanceType']
-            description = instance.get('Tags', [{'Key': 'Name', 'Value': 'No Description'}])[0]['Value']
-            
-            instances[instance_id] = {
-                'LaunchTime': launch_time,
-                'Status': state,
-                'InstanceType': instance_type,
-                'Description': description
-            }
-    
-    return instances
+
+# States worth sweeping; terminated instances are filtered out server-side
+LIVE_STATES = ['pending', 'running', 'shutting-down', 'stopping', 'stopped']
+
+# Compact per-instance record (field names double as the labels shown to the user)
+Instance = namedtuple('Instance', ['InstanceId', 'InstanceType', 'Status', 'LaunchTime', 'Description', 'Region', 'SpotRequestId'])
+
+# terminate_instances errors caused by one of the IDs rather than the call (InvalidInstanceID.* is matched by prefix)
+INSTANCE_ID_ERRORS = ('InvalidInstanceID', 'OperationNotPermitted', 'IncorrectInstanceState')
+
+# describe_auto_scaling_instances accepts at most 50 instance IDs per call
+ASG_LOOKUP_BATCH_SIZE = 50
+
+def iter_ec2_instance_pages(region_name=None):
+    """Yield one list of Instance records per describe_instances page, as pages arrive."""
+    ec2_client = get_client('ec2', region_name=region_name)
+    paginator = ec2_client.get_paginator('describe_instances')
+    pages = paginator.paginate(
+        Filters=[{'Name': 'instance-state-name', 'Values': LIVE_STATES}],
+        PaginationConfig={'PageSize': config.ec2_page_size}
+    )
+    for page in pages:
+        records = []
+        for reservation in page.get('Reservations', []):
+            for instance in reservation.get('Instances', []):
+                state = instance['State']['Name']
+                if state not in LIVE_STATES:  # The filter already does this; guard against stale pages
+                    continue
+                records.append(Instance(
+                    InstanceId=instance['InstanceId'],
+                    InstanceType=instance['InstanceType'],
+                    Status=state,
+                    LaunchTime=instance['LaunchTime'],
+                    Description=_name_tag(instance),
+                    Region=region_name,
+                    SpotRequestId=instance.get('SpotInstanceRequestId')
+                ))
+        yield records
+
+def _name_tag(instance):
+    for tag in instance.get('Tags', []):
+        if tag['Key'] == 'Name':
+            return tag['Value']
+    return 'No Description'
+
+def list_ec2_instances(region_name=None):
+    return {record.InstanceId: record for page in iter_ec2_instance_pages(region_name) for record in page}
+
+def show_ec2_instances():
+    print("Waiting for instances...")
+    sweep = regions.sweep_regions()
+    if len(sweep) > 1:
+        pages = [list(inventory.values()) for inventory in regions.fan_out(list_ec2_instances, sweep).values()]
+    else:
+        # Print every page as soon as it arrives instead of waiting for the full inventory
+        pages = iter_ec2_instance_pages(sweep[0])
+
+    found = 0
+    for page in pages:
+        if page and not found:
+            print("\n🖥️ EC2 Instances:")
+        for instance in page:
+            print(f"\n{instance.InstanceId}:")
+            for key, value in instance._asdict().items():
+                if key != 'InstanceId' and value is not None:
+                    print(f"  {key}: {value}")
+        found += len(page)
+    if not found:
+        print("\nNo EC2 instances found.")
 
 def terminate_selected_instances():
     print("Waiting for instances...")
-    ec2_client = boto3.client('ec2')
-    instances = list_ec2_instances()
+    records = regions.fan_out(list_ec2_instances)
+    inventory = regions.flatten(records)
 
-    if not instances:
+    if not inventory:
         print("\n⚠️ No EC2 instances found.")
         return
 
     print("\n🖥️ All EC2 Instances:")
-    instance_list = list(instances.keys())
-    for idx, instance in enumerate(instance_list, start=1):
-        status = instances[instance]['Status']
-        description = instances[instance]['Description']
-        print(f"{idx}. {instance} ({status}) - {description}")
+    instance_list = [(region, instance) for region, instance, _ in inventory]
+    for idx, (region, instance, record) in enumerate(inventory, start=1):
+        print(f"{idx}. {regions.label(region, instance)} ({record.Status}) - {record.Description}")
 
     print("\nEnter the numbers of the instances you want to terminate (comma-separated), type 'all' to terminate all, or 'exit' to cancel:")
     choice = input("Your choice: ").strip().lower()
@@ -79,18 +124,438 @@ def terminate_selected_instances():
         print("Termination canceled.")
         return
 
-    for instance in selected_instances:
-        if delete_for_real:
-            try:
-                ec2_client.terminate_instances(InstanceIds=[instance])
-                print(f"✅ Successfully terminated: {instance}")
-                log_action("EC2", instance, True, mode="deletion")
-            except Exception as e:
-                print(f"❌ Failed to terminate {instance}: {str(e)}")
-                log_action("EC2", instance, False, mode="deletion")
+    process_instance_terminations(selected_instances, records)
+
+def process_instance_terminations(selected_instances, inventory=None):
+    """Terminate already confirmed (region, instance_id) pairs, or dry-run them in testing mode.
+
+    inventory is the {region: {instance_id: Instance}} listing they were picked from; its
+    Spot request IDs let owning requests be cancelled before the instances go.
+    """
+    inventory = inventory or {}
+    # Every instance is terminated through a client for its own region
+    for region, instance_ids in regions.group_by_region(selected_instances).items():
+        terminate_in_region(instance_ids, region, inventory.get(region))
+
+def terminate_in_region(instance_ids, region_name=None, records=None):
+    # Stop Auto Scaling groups and Spot requests from launching replacements first
+    held = release_instance_owners(instance_ids, records or {}, region_name)
+    for instance in [instance for instance in instance_ids if instance in held]:
+        print(f"⚠️ Skipping {regions.label(region_name, instance)}: its Auto Scaling group could not be released and would replace it.")
+        log_action("EC2", instance, False, mode="deletion")
+    instance_ids = [instance for instance in instance_ids if instance not in held]
+    if not instance_ids:
+        return
+    if config.delete_for_real:
+        results = terminate_instances(instance_ids, region_name=region_name)
+        for instance, (success, detail) in results.items():
+            if success:
+                print(f"✅ Successfully terminated: {regions.label(region_name, instance)} ({detail})")
+            else:
+                print(f"❌ Failed to terminate {regions.label(region_name, instance)}: {detail}")
+            log_action("EC2", instance, success, mode="deletion")
+        if config.ec2_wait_for_termination:
+            wait_for_termination([instance for instance, (success, _) in results.items() if success], region_name)
+    else:
+        # DryRun batches surface permission and termination-protection problems without terminating
+        results = terminate_instances(instance_ids, dry_run=True, region_name=region_name)
+        for instance, (success, detail) in results.items():
+            log_action("EC2", instance, success, mode="deletion")
+            print(f"📝 Logged terminate attempt for: {regions.label(region_name, instance)}")
+            if not success:
+                print(f"   ⚠️ Termination would fail: {detail}")
+
+def find_auto_scaling_owners(instance_ids, region_name=None):
+    """Bulk ownership check: {instance_id: Auto Scaling group name} for instances that belong to one."""
+    paginator = get_client('autoscaling', region_name=region_name).get_paginator('describe_auto_scaling_instances')
+    owners = {}
+    for offset in range(0, len(instance_ids), ASG_LOOKUP_BATCH_SIZE):
+        for page in paginator.paginate(InstanceIds=instance_ids[offset:offset + ASG_LOOKUP_BATCH_SIZE]):
+            for instance in page.get('AutoScalingInstances', []):
+                owners[instance['InstanceId']] = instance['AutoScalingGroupName']
+    return owners
+
+def release_instance_owners(instance_ids, records, region_name=None):
+    """Drain what would relaunch the selected instances, so they stay gone after one pass.
+
+    A group whose every instance is selected is scaled to zero; a group that only loses some of
+    its instances has them detached with a matching decrement of its desired capacity (lowering
+    MinSize first where the decrement would go below it). Spot requests behind the instances are
+    cancelled. Testing mode only reports (and dry-runs) this.
+
+    Returns the set of instances that must not be terminated: members of groups that could not be
+    released, which would launch replacements.
+    """
+    try:
+        owners = find_auto_scaling_owners(instance_ids, region_name)
+    except Exception as e:
+        print(f"⚠️ Could not check Auto Scaling ownership: {str(e)}")
+        owners = {}
+    spot_requests = [records[instance].SpotRequestId for instance in instance_ids
+                     if instance in records and records[instance].SpotRequestId]
+
+    groups = {}
+    for instance, group in owners.items():
+        groups.setdefault(group, []).append(instance)
+    held = set()
+    for group, members in groups.items():
+        if not _release_auto_scaling_group(group, members, region_name):
+            held.update(members)
+    if spot_requests:
+        _cancel_spot_requests(spot_requests, region_name)
+    return held
+
+def _release_auto_scaling_group(group, members, region_name):
+    autoscaling_client = get_client('autoscaling', region_name=region_name)
+    try:
+        description = autoscaling_client.describe_auto_scaling_groups(AutoScalingGroupNames=[group])
+        found = (description.get('AutoScalingGroups') or [{}])[0]
+        group_instances = {instance['InstanceId'] for instance in found.get('Instances', [])}
+        scale_to_zero = group_instances.issubset(members)
+        if not config.delete_for_real:
+            action = "scale to 0" if scale_to_zero else f"detach {len(members)} instance(s)"
+            log_action("Auto Scaling", group, True, mode="deletion")
+            print(f"📝 Logged Auto Scaling change for {regions.label(region_name, group)}: would {action}")
+            return True
+        if scale_to_zero:
+            autoscaling_client.update_auto_scaling_group(
+                AutoScalingGroupName=group, MinSize=0, MaxSize=0, DesiredCapacity=0)
+            print(f"✅ Scaled Auto Scaling group {regions.label(region_name, group)} to 0")
+        else:
+            # detach_instances refuses to decrement the desired capacity below MinSize
+            remaining = found.get('DesiredCapacity', len(group_instances)) - len(members)
+            if remaining < found.get('MinSize', 0):
+                autoscaling_client.update_auto_scaling_group(AutoScalingGroupName=group, MinSize=max(remaining, 0))
+                print(f"✅ Lowered the minimum size of {regions.label(region_name, group)} to {max(remaining, 0)}")
+            for offset in range(0, len(members), 20):  # detach_instances takes up to 20 IDs
+                autoscaling_client.detach_instances(
+                    AutoScalingGroupName=group, InstanceIds=members[offset:offset + 20],
+                    ShouldDecrementDesiredCapacity=True)
+            print(f"✅ Detached {len(members)} instance(s) from Auto Scaling group {regions.label(region_name, group)}")
+        log_action("Auto Scaling", group, True, mode="deletion")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to release Auto Scaling group {regions.label(region_name, group)}: {str(e)}")
+        log_action("Auto Scaling", group, False, mode="deletion")
+        return False
+
+def _cancel_spot_requests(spot_requests, region_name):
+    ec2_client = get_client('ec2', region_name=region_name)
+    dry_run = not config.delete_for_real
+    batch_size = config.ec2_terminate_batch_size
+    for offset in range(0, len(spot_requests), batch_size):
+        batch = spot_requests[offset:offset + batch_size]
+        try:
+            response = ec2_client.cancel_spot_instance_requests(SpotInstanceRequestIds=batch, DryRun=dry_run)
+            cancelled = {item['SpotInstanceRequestId'] for item in response.get('CancelledSpotInstanceRequests', [])}
+            results = {request: request in cancelled for request in batch}
+        except ClientError as e:
+            error = e.response.get('Error', {})
+            success = dry_run and error.get('Code') == 'DryRunOperation'
+            if not success:
+                print(f"❌ Failed to cancel Spot requests: {error.get('Code')}: {error.get('Message')}")
+            results = {request: success for request in batch}
+        for request, success in results.items():
+            log_action("EC2 Spot Request", request, success, mode="deletion")
+            if dry_run:
+                print(f"📝 Logged cancel attempt for Spot request: {regions.label(region_name, request)}")
+            elif success:
+                print(f"✅ Cancelled Spot request: {regions.label(region_name, request)}")
+
+def terminate_instances(instance_ids, dry_run=False, region_name=None):
+    """Terminate instances in multi-ID batches. Returns {instance_id: (success, detail)}."""
+    ec2_client = get_client('ec2', region_name=region_name)
+    results = {}
+    batch_size = config.ec2_terminate_batch_size
+    for offset in range(0, len(instance_ids), batch_size):
+        results.update(_terminate_batch(ec2_client, instance_ids[offset:offset + batch_size], dry_run))
+    return results
+
+def _terminate_batch(ec2_client, batch, dry_run):
+    try:
+        response = ec2_client.terminate_instances(InstanceIds=batch, DryRun=dry_run)
+    except ClientError as e:
+        error = e.response.get('Error', {})
+        if dry_run and error.get('Code') == 'DryRunOperation':
+            return {instance: (True, "dry run succeeded") for instance in batch}
+        if len(batch) == 1 or not (error.get('Code') or '').startswith(INSTANCE_ID_ERRORS):
+            # Permissions, throttling...: splitting would only repeat the same error
+            return {instance: (False, f"{error.get('Code')}: {error.get('Message')}") for instance in batch}
+        # A single bad ID (protection, wrong state, not found) fails the whole call: split to isolate it
+        middle = len(batch) // 2
+        return {**_terminate_batch(ec2_client, batch[:middle], dry_run),
+                **_terminate_batch(ec2_client, batch[middle:], dry_run)}
+    except Exception as e:
+        return {instance: (False, str(e)) for instance in batch}
+
+    terminating = {item['InstanceId']: item['CurrentState']['Name'] for item in response.get('TerminatingInstances', [])}
+    return {instance: (True, terminating[instance]) if instance in terminating
+            else (False, "not reported in TerminatingInstances") for instance in batch}
+
+def wait_for_termination(instance_ids, region_name=None):
+    """Bulk instance_terminated wait: one describe_instances call per poll covers a whole batch."""
+    if not instance_ids:
+        return
+    print(f"\n⏳ Waiting for {len(instance_ids)} instance(s) to reach 'terminated'...")
+    waiter = get_client('ec2', region_name=region_name).get_waiter('instance_terminated')
+    batch_size = config.ec2_terminate_batch_size
+    for offset in range(0, len(instance_ids), batch_size):
+        try:
+            waiter.wait(InstanceIds=instance_ids[offset:offset + batch_size])
+        except Exception as e:
+            print(f"⚠️ Stopped waiting for termination: {str(e)}")
+            return
+    print("✅ All terminated instances confirmed.")
+
+# A resource nothing uses any more. DependsOn lists orphans that must be deleted first
+# (an AMI before its snapshots, a leftover network interface before its security groups).
+Orphan = namedtuple('Orphan', ['Kind', 'Id', 'Detail', 'DependsOn', 'Region'])
+
+# Snapshots taken by AWS Backup or Data Lifecycle Manager (matched by tag key prefix) are managed by their policies
+MANAGED_SNAPSHOT_TAG_PREFIXES = ('aws:backup', 'dlm:', 'aws:dlm:')
+# Volume ID reported for snapshots created by copy_snapshot, which have no source volume
+COPIED_SNAPSHOT_VOLUME = 'vol-ffffffff'
+
+# Deletion order: every kind in a stage is deleted in parallel, stages run one after another
+ORPHAN_STAGES = [('AMI', 'Elastic IP', 'Network Interface', 'Volume'), ('Snapshot', 'Security Group')]
+
+def _paginate(ec2_client, operation, key, **kwargs):
+    for page in ec2_client.get_paginator(operation).paginate(**kwargs):
+        yield from page.get(key, [])
+
+def find_orphaned_resources(region_name=None):
+    """Collect orphaned EBS volumes, Elastic IPs, ENIs, snapshots, AMIs and security groups.
+
+    One describe_* sweep per resource type (server-side filtered where the API allows it) plus the
+    launch templates, launch configurations and Auto Scaling groups that can still launch AMIs and
+    security groups, joined in memory. Returns {orphan_id: Orphan}.
+    """
+    ec2_client = get_client('ec2', region_name=region_name)
+    instances = [instance
+                 for reservation in _paginate(ec2_client, 'describe_instances', 'Reservations',
+                                              Filters=[{'Name': 'instance-state-name', 'Values': LIVE_STATES}])
+                 for instance in reservation.get('Instances', [])]
+    volumes = list(_paginate(ec2_client, 'describe_volumes', 'Volumes',
+                             Filters=[{'Name': 'status', 'Values': ['available']}]))
+    images = list(_paginate(ec2_client, 'describe_images', 'Images', Owners=['self']))
+    snapshots = list(_paginate(ec2_client, 'describe_snapshots', 'Snapshots', OwnerIds=['self']))
+    interfaces = list(_paginate(ec2_client, 'describe_network_interfaces', 'NetworkInterfaces'))
+    groups = list(_paginate(ec2_client, 'describe_security_groups', 'SecurityGroups'))
+    addresses = ec2_client.describe_addresses().get('Addresses', [])
+    launch_images, launch_groups = find_launch_references(region_name)
+    group_ids = {group['GroupName']: group['GroupId'] for group in groups}
+    launch_groups = {group_ids.get(group, group) for group in launch_groups}
+
+    orphans = {}
+    def add(kind, resource_id, detail, depends_on=()):
+        orphans[resource_id] = Orphan(kind, resource_id, detail, tuple(depends_on), region_name)
+
+    for volume in volumes:
+        add('Volume', volume['VolumeId'], f"{volume.get('Size')} GiB {volume.get('VolumeType')}")
+
+    for address in addresses:
+        if not address.get('AssociationId') and not address.get('InstanceId'):
+            add('Elastic IP', address.get('AllocationId') or address['PublicIp'], address.get('PublicIp'))
+
+    orphan_interfaces = set()
+    for interface in interfaces:
+        if interface.get('Status') == 'available' and not interface.get('RequesterManaged'):
+            orphan_interfaces.add(interface['NetworkInterfaceId'])
+            add('Network Interface', interface['NetworkInterfaceId'], interface.get('Description') or 'No Description')
+
+    used_images = {instance.get('ImageId') for instance in instances} | launch_images
+    orphan_images = set()
+    image_snapshots = {}  # snapshot -> AMIs built on it
+    for image in images:
+        snapshot_ids = [mapping['Ebs']['SnapshotId'] for mapping in image.get('BlockDeviceMappings', [])
+                        if mapping.get('Ebs', {}).get('SnapshotId')]
+        for snapshot_id in snapshot_ids:
+            image_snapshots.setdefault(snapshot_id, []).append(image['ImageId'])
+        if image['ImageId'] not in used_images:
+            orphan_images.add(image['ImageId'])
+            add('AMI', image['ImageId'], image.get('Name') or 'No Name')
+
+    # A snapshot is orphaned once its source volume is gone and every AMI built on it is orphaned too.
+    # AWS Backup / Data Lifecycle Manager snapshots and copies never had a live volume to compare with.
+    existing_volumes = {volume['VolumeId'] for volume in volumes}
+    existing_volumes.update(mapping['Ebs']['VolumeId'] for instance in instances
+                            for mapping in instance.get('BlockDeviceMappings', []) if mapping.get('Ebs'))
+    for snapshot in snapshots:
+        backing = image_snapshots.get(snapshot['SnapshotId'], [])
+        if snapshot.get('VolumeId') in existing_volumes or not orphan_images.issuperset(backing) or _managed_snapshot(snapshot):
+            continue
+        add('Snapshot', snapshot['SnapshotId'], f"{snapshot.get('VolumeSize')} GiB from {snapshot.get('VolumeId')}", backing)
+
+    # A security group is unused when only leftover ENIs hold it, no other group's rules reference it
+    # and no launch template or launch configuration would attach it to new instances
+    holders = {}
+    for interface in interfaces:
+        for group in interface.get('Groups', []):
+            holders.setdefault(group['GroupId'], set()).add(interface['NetworkInterfaceId'])
+    referenced = {pair.get('GroupId') or group_ids.get(pair.get('GroupName')) for group in groups
+                  for permission in group.get('IpPermissions', []) + group.get('IpPermissionsEgress', [])
+                  for pair in permission.get('UserIdGroupPairs', []) if pair.get('GroupId') != group['GroupId']}
+    referenced |= launch_groups
+    for group in groups:
+        group_holders = holders.get(group['GroupId'], set())
+        if group['GroupName'] == 'default' or group['GroupId'] in referenced or not orphan_interfaces.issuperset(group_holders):
+            continue
+        add('Security Group', group['GroupId'], group['GroupName'], sorted(group_holders))
+
+    return orphans
+
+def _managed_snapshot(snapshot):
+    if snapshot.get('VolumeId') == COPIED_SNAPSHOT_VOLUME:
+        return True
+    return any(tag['Key'].startswith(MANAGED_SNAPSHOT_TAG_PREFIXES) for tag in snapshot.get('Tags', []))
+
+def find_launch_references(region_name=None):
+    """AMIs and security groups (IDs or names) that launch templates, launch configurations and
+    Auto Scaling groups would still launch instances with. Returns (images, groups).
+    """
+    ec2_client = get_client('ec2', region_name=region_name)
+    autoscaling_client = get_client('autoscaling', region_name=region_name)
+    images, groups = set(), set()
+
+    # Every template's $Latest and $Default, plus the numbered versions Auto Scaling groups pin
+    template_data = [version.get('LaunchTemplateData', {})
+                     for version in _paginate(ec2_client, 'describe_launch_template_versions', 'LaunchTemplateVersions',
+                                              Versions=['$Latest', '$Default'])]
+    pinned = {}
+    for group in _paginate(autoscaling_client, 'describe_auto_scaling_groups', 'AutoScalingGroups'):
+        policy = group.get('MixedInstancesPolicy', {}).get('LaunchTemplate', {})
+        specifications = [group.get('LaunchTemplate') or {}, policy.get('LaunchTemplateSpecification') or {}]
+        specifications += [override.get('LaunchTemplateSpecification') or {} for override in policy.get('Overrides', [])]
+        for specification in specifications:
+            version = specification.get('Version') or ''
+            template = specification.get('LaunchTemplateId') or specification.get('LaunchTemplateName')
+            if template and version.isdigit():
+                key = 'LaunchTemplateId' if specification.get('LaunchTemplateId') else 'LaunchTemplateName'
+                pinned.setdefault((key, template), set()).add(version)
+    for (key, template), versions in pinned.items():
+        response = ec2_client.describe_launch_template_versions(**{key: template}, Versions=sorted(versions))
+        template_data += [version.get('LaunchTemplateData', {}) for version in response.get('LaunchTemplateVersions', [])]
+
+    for data in template_data:
+        images.add(data.get('ImageId'))
+        groups.update(data.get('SecurityGroupIds', []) + data.get('SecurityGroups', []))
+        for interface in data.get('NetworkInterfaces', []):
+            groups.update(interface.get('Groups', []))
+    for configuration in _paginate(autoscaling_client, 'describe_launch_configurations', 'LaunchConfigurations'):
+        images.add(configuration.get('ImageId'))
+        groups.update(configuration.get('SecurityGroups', []))
+    images.discard(None)
+    return images, groups
+
+def show_orphaned_resources():
+    print("Looking for orphaned resources...")
+    orphans = [orphan for inventory in regions.fan_out(find_orphaned_resources).values() for orphan in inventory.values()]
+    if not orphans:
+        print("\nNo orphaned resources found.")
+    else:
+        print("\n🧹 Orphaned EC2 Resources:")
+        for idx, orphan in enumerate(orphans, start=1):
+            print(f"{idx}. {orphan.Kind}: {regions.label(orphan.Region, orphan.Id)} - {orphan.Detail}")
+    return orphans
+
+def sweep_orphaned_resources():
+    orphans = show_orphaned_resources()
+    if not orphans:
+        return
+
+    print("\nEnter the numbers of the resources you want to delete (comma-separated), type 'all' to delete all, or 'exit' to cancel:")
+    choice = input("Your choice: ").strip().lower()
+
+    if choice == "exit":
+        print("❌ Deletion canceled by user.")
+        return
+
+    if choice == "all":
+        selected = orphans
+    else:
+        try:
+            indices = [int(i.strip()) - 1 for i in choice.split(",")]
+            selected = [orphans[i] for i in indices if 0 <= i < len(orphans)]
+        except (ValueError, IndexError):
+            print("\nInvalid selection. No resources deleted.")
+            return
+
+    if not selected:
+        print("\nNo valid resources selected for deletion.")
+        return
+
+    confirm = input(f"\nAre you sure you want to delete these {len(selected)} resource(s)? (yes/no/exit): ").strip().lower()
+    if confirm == "exit":
+        print("❌ Deletion canceled by user.")
+        return
+    elif confirm != "yes":
+        print("Deletion canceled.")
+        return
+
+    for region, region_orphans in regions.group_by_region((orphan.Region, orphan) for orphan in selected).items():
+        delete_orphaned_resources(region_orphans, region)
+
+def delete_orphaned_resources(orphans, region_name=None):
+    """Delete orphans stage by stage, in parallel within a stage. Returns {orphan_id: (success, detail)}.
+
+    In testing mode every call is sent with DryRun=True, so permission problems still show up.
+    """
+    ec2_client = get_client('ec2', region_name=region_name)
+    dry_run = not config.delete_for_real
+    selected = {orphan.Id for orphan in orphans}
+    results = {}
+    for stage in ORPHAN_STAGES:
+        batch = []
+        for orphan in orphans:
+            if orphan.Kind not in stage:
+                continue
+            # Whatever it waits for must be selected and already gone
+            blocker = next((dependency for dependency in orphan.DependsOn
+                            if dependency not in selected or not results.get(dependency, (False,))[0]), None)
+            if blocker:
+                results[orphan.Id] = (False, f"kept: {blocker} was not deleted")
+            else:
+                batch.append(orphan)
+        if not batch:
+            continue
+        with ThreadPoolExecutor(max_workers=config.ec2_orphan_workers) as executor:
+            for orphan, result in zip(batch, executor.map(lambda orphan: _delete_orphan(ec2_client, orphan, dry_run), batch)):
+                results[orphan.Id] = result
+
+    for orphan in orphans:
+        success, detail = results[orphan.Id]
+        log_action(f"EC2 {orphan.Kind}", orphan.Id, success, mode="deletion")
+        name = regions.label(region_name, orphan.Id)
+        if dry_run:
+            print(f"📝 Logged delete attempt for: {orphan.Kind} {name}")
+            if not success:
+                print(f"   ⚠️ Deletion would fail: {detail}")
+        elif success:
+            print(f"✅ Successfully deleted {orphan.Kind}: {name}")
         else:
-            log_action("EC2", instance, True, mode="deletion")
-            print(f"📝 Logged terminate attempt for: {instance}")
+            print(f"❌ Failed to delete {orphan.Kind} {name}: {detail}")
+    return results
+
+def _delete_orphan(ec2_client, orphan, dry_run):
+    calls = {
+        'AMI': lambda: ec2_client.deregister_image(ImageId=orphan.Id, DryRun=dry_run),
+        'Snapshot': lambda: ec2_client.delete_snapshot(SnapshotId=orphan.Id, DryRun=dry_run),
+        'Volume': lambda: ec2_client.delete_volume(VolumeId=orphan.Id, DryRun=dry_run),
+        'Network Interface': lambda: ec2_client.delete_network_interface(NetworkInterfaceId=orphan.Id, DryRun=dry_run),
+        'Security Group': lambda: ec2_client.delete_security_group(GroupId=orphan.Id, DryRun=dry_run),
+        'Elastic IP': lambda: (ec2_client.release_address(AllocationId=orphan.Id, DryRun=dry_run) if orphan.Id.startswith('eipalloc-')
+                               else ec2_client.release_address(PublicIp=orphan.Id, DryRun=dry_run)),
+    }
+    try:
+        calls[orphan.Kind]()
+        return True, "deleted"
+    except ClientError as e:
+        error = e.response.get('Error', {})
+        if dry_run and error.get('Code') == 'DryRunOperation':
+            return True, "dry run succeeded"
+        return False, f"{error.get('Code')}: {error.get('Message')}"
+    except Exception as e:
+        return False, str(e)
 
 def interactive_menu():
     print("""
@@ -104,30 +569,27 @@ def interactive_menu():
         print("\nMain Menu:")
         print("1. List EC2 Instances and Status")
         print("2. Terminate Instances")
-        print("3. Exit")
+        print("3. Sweep Orphaned Volumes, IPs, ENIs, Snapshots, AMIs and Security Groups")
+        print("4. Exit")
         choice = input("Enter your choice: ").strip()
 
         if choice == "1":
-            print("Waiting for instances...")
-            instances = list_ec2_instances()
-            if instances:
-                print("\n🖥️ EC2 Instances:")
-                for instance_id, instance_info in instances.items():
-                    print(f"\n{instance_id}:")
-                    for key, value in instance_info.items():
-                        print(f"  {key}: {value}")
-            else:
-                print("\nNo EC2 instances found.")
+            show_ec2_instances()
         
         elif choice == "2":
             terminate_selected_instances()
 
         elif choice == "3":
+            sweep_orphaned_resources()
+
+        elif choice == "4":
             print("\n🔚 Exiting Excalisweep EC2 Wizard. Have a great day!")
             break
         
         else:
-            print("\nInvalid choice. Please enter 1, 2, or 3.")
+            print("\nInvalid choice. Please enter 1, 2, 3, or 4.")
 
 if __name__ == "__main__":
+    # Launched as a separate process: main.py hands the mode over through the environment
+    config.delete_for_real = os.getenv('DELETE_FOR_REAL', 'False') == 'True'
     interactive_menu()
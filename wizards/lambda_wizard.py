@@ -1,75 +1,156 @@
 import boto3
 import datetime
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from botocore.exceptions import ClientError
+from collections import namedtuple
+from functools import partial
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from logger import log_action
+from clients import get_client
+import regions
 import config 
-# Get delete_for_real from environment variable
-delete_for_real = os.getenv('DELETE_FOR_REAL', 'False') == 'True'
-def list_lambda_functions():
-    lambda_client = boto3.client('lambda')
-    response = lambda_client.list_functions()
-    
+
+def list_lambda_functions(region_name=None):
+    """Inventory every function with its published versions from one FunctionVersion='ALL' sweep.
+
+    Aliases are left as None here; fetch_function_aliases() loads them for a details view.
+    """
+    lambda_client = get_client('lambda', region_name=region_name)
+    paginator = lambda_client.get_paginator('list_functions')
+
     functions = {}
-    for function in response.get('Functions', []):
-        function_name = function['FunctionName']
-        try:
-            # Get function details including its aliases and versions
-            aliases = lambda_client.list_aliases(FunctionName=function_name)
-            versions = lambda_client.list_versions_by_function(FunctionName=function_name)
-            
-            aliases_list = [alias['AliasName'] for alias in aliases.get('Aliases', [])]
-            versions_list = [version['Version'] for version in versions.get('Versions', [])]
-            
-            functions[function_name] = {
-                'Created': function['LastModified'],
-                'Aliases': aliases_list,
-                'Versions': versions_list
-            }
-        except Exception as e:
-            print(f"Error fetching details for Lambda function {function_name}: {str(e)}")
-            log_action("Lambda", function_name, False, mode="deletion")
-    
+    for page in paginator.paginate(FunctionVersion='ALL'):
+        for version in page.get('Functions', []):
+            function = functions.setdefault(version['FunctionName'], {'Created': None, 'Aliases': None, 'Versions': []})
+            function['Versions'].append(version['Version'])
+            if version['Version'] == '$LATEST':
+                function['Created'] = version['LastModified']
+
+    for function in functions.values():
+        function['Versions'].sort(key=_version_order)
+    return functions
+
+def _version_order(version):
+    # Published versions oldest first, $LATEST last
+    return (1, 0) if version == '$LATEST' else (0, int(version))
+
+def fetch_function_aliases(functions, region_name=None):
+    """Fill in 'Aliases' for the given {name: info} functions, one concurrent list_aliases sweep each."""
+    lambda_client = get_client('lambda', region_name=region_name)
+
+    def aliases_of(function_name):
+        paginator = lambda_client.get_paginator('list_aliases')
+        return [alias['AliasName'] for page in paginator.paginate(FunctionName=function_name)
+                for alias in page.get('Aliases', [])]
+
+    with ThreadPoolExecutor(max_workers=config.lambda_detail_workers) as executor:
+        futures = {executor.submit(aliases_of, name): name for name in functions}
+        for future, function_name in futures.items():
+            try:
+                functions[function_name]['Aliases'] = future.result()
+            except Exception as e:
+                print(f"Error fetching details for Lambda function {function_name}: {str(e)}")
+                log_action("Lambda", function_name, False, mode="deletion")
     return functions
 
+def show_function_details():
+    print("Waiting for Lambda functions...")
+    inventory = regions.fan_out(list_lambda_functions)
+    functions = regions.flatten(inventory)
+    if not functions:
+        print("\nNo Lambda functions found.")
+        return
+
+    print("\n💻 Lambda Functions:")
+    for idx, (region, function_name, function_info) in enumerate(functions, start=1):
+        print(f"{idx}. {regions.label(region, function_name)} ({len(function_info['Versions'])} version(s))")
+
+    print("\nEnter the numbers of the functions to show in detail (comma-separated), or type 'all':")
+    choice = input("Your choice: ").strip().lower()
+    if choice == "all":
+        selected = functions
+    else:
+        try:
+            indices = [int(i.strip()) - 1 for i in choice.split(",")]
+            selected = [functions[i] for i in indices if 0 <= i < len(functions)]
+        except (ValueError, IndexError):
+            print("\nInvalid selection.")
+            return
+
+    # Aliases only for the functions being viewed, each region's batch fetched concurrently
+    for region, names in regions.group_by_region((region, name) for region, name, _ in selected).items():
+        fetch_function_aliases({name: inventory[region][name] for name in names}, region)
+
+    for region, function_name, function_info in selected:
+        print_function(region, function_name, function_info)
+
+def print_function(region, function_name, function_info):
+    print(f"\n{regions.label(region, function_name)}:")
+    print(f"  Created: {function_info['Created']}")
+    if function_info['Aliases'] is not None:
+        print(f"  Aliases: {', '.join(function_info['Aliases'] or ['No aliases'])}")
+    print(f"  Versions: {', '.join(function_info['Versions'] or ['No versions'])}")
+
+# Lambda error codes worth retrying: throttling, and functions still busy with an update
+RETRYABLE_ERRORS = {'TooManyRequestsException', 'ThrottlingException', 'ResourceConflictException'}
+
+def call_with_retries(operation, **kwargs):
+    """Call a Lambda API, backing off (exponentially, with jitter) while it is throttled."""
+    for attempt in range(config.lambda_max_retries + 1):
+        try:
+            return operation(**kwargs)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in RETRYABLE_ERRORS or attempt == config.lambda_max_retries:
+                raise
+            time.sleep(min(2 ** attempt, 20) * random.uniform(0.5, 1.0))
+
 def delete_lambda_function(function_name, lambda_client):
+    """Fast path: one unqualified delete_function removes the function with all its versions and aliases."""
     try:
-        # Delete aliases
-        aliases = lambda_client.list_aliases(FunctionName=function_name).get('Aliases', [])
-        for alias in aliases:
-            lambda_client.delete_alias(FunctionName=function_name, Name=alias['AliasName'])
-            print(f"Successfully deleted alias: {alias['AliasName']} for function: {function_name}")
-
-        # Delete all versions of the Lambda function (except $LATEST)
-        versions = lambda_client.list_versions_by_function(FunctionName=function_name).get('Versions', [])
-        for version in versions:
-            if version['Version'] != '$LATEST':
-                lambda_client.delete_function(FunctionName=function_name, Qualifier=version['Version'])
-                print(f"Successfully deleted version: {version['Version']} of function: {function_name}")
-        
-        # Delete the Lambda function itself
-        lambda_client.delete_function(FunctionName=function_name)
-        print(f"Successfully deleted function: {function_name}")
+        call_with_retries(lambda_client.delete_function, FunctionName=function_name)
         return True
     except Exception as e:
         print(f"Error deleting Lambda function {function_name}: {str(e)}")
-        log_action("Lambda", function_name, False, mode="deletion")
         return False
 
+def delete_function_versions(function_name, versions, lambda_client, aliases=()):
+    """Partial cleanup: delete only the given aliases and published versions, keeping the function.
+
+    Returns {version or alias name: (success, detail)}; alias names are never all digits.
+    """
+    results = {}
+    for alias in aliases:
+        try:
+            call_with_retries(lambda_client.delete_alias, FunctionName=function_name, Name=alias)
+            results[alias] = (True, "deleted")
+        except Exception as e:
+            results[alias] = (False, str(e))
+    for version in versions:
+        if version == '$LATEST':
+            continue
+        try:
+            call_with_retries(lambda_client.delete_function, FunctionName=function_name, Qualifier=version)
+            results[version] = (True, "deleted")
+        except Exception as e:
+            results[version] = (False, str(e))
+    return results
+
 def delete_selected_lambda_functions():
     print("Waiting for Lambda functions...")
-    lambda_client = boto3.client('lambda')
-    functions = list_lambda_functions()
+    functions = regions.flatten(regions.fan_out(list_lambda_functions))
 
     if not functions:
         print("\n⚠️ No Lambda functions found.")
         return
 
     print("\n🗑️ All Lambda Functions:")
-    function_list = list(functions.keys())
-    for idx, function in enumerate(function_list, start=1):
-        print(f"{idx}. {function} (Created: {functions[function]['Created']})")
+    function_list = [(region, function) for region, function, _ in functions]
+    for idx, (region, function, function_info) in enumerate(functions, start=1):
+        print(f"{idx}. {regions.label(region, function)} (Created: {function_info['Created']})")
 
     print("\nEnter the numbers of the Lambda functions you want to delete (comma-separated), type 'all' to delete all, or 'exit' to cancel:")
     choice = input("Your choice: ").strip().lower()
@@ -100,17 +181,238 @@ def delete_selected_lambda_functions():
         print("Deletion canceled.")
         return
 
-    for function in selected_functions:
-        if delete_for_real:
-            if delete_lambda_function(function, lambda_client):
-                print(f"✅ Successfully deleted Lambda function and resources: {function}")
+    process_function_deletions(selected_functions)
+
+def process_function_deletions(selected_functions):
+    """Delete already confirmed (region, function) pairs, or only log them in testing mode."""
+    if not config.delete_for_real:
+        for region, function in selected_functions:
+            print(f"📝 Logged delete attempt for: {function}")
+            log_action("Lambda", function, True, mode="deletion")
+        return
+
+    # One call per function on a bounded pool, each through a client for the function's own region
+    with ThreadPoolExecutor(max_workers=config.lambda_delete_workers) as executor:
+        futures = {executor.submit(delete_lambda_function, function, get_client('lambda', region_name=region)): (region, function)
+                   for region, function in selected_functions}
+        for future in as_completed(futures):
+            region, function = futures[future]
+            if future.result():
+                print(f"✅ Successfully deleted Lambda function and resources: {regions.label(region, function)}")
                 log_action("Lambda", function, True, mode="deletion")
             else:
-                print(f"❌ Failed to delete Lambda function: {function}. Skipping.")
+                print(f"❌ Failed to delete Lambda function: {regions.label(region, function)}. Skipping.")
                 log_action("Lambda", function, False, mode="deletion")
+
+def delete_selected_versions():
+    print("Waiting for Lambda functions...")
+    inventory = regions.fan_out(list_lambda_functions)
+    functions = regions.flatten(inventory)
+    if not functions:
+        print("\n⚠️ No Lambda functions found.")
+        return
+
+    print("\n💻 Lambda Functions:")
+    for idx, (region, function_name, function_info) in enumerate(functions, start=1):
+        print(f"{idx}. {regions.label(region, function_name)} ({len(function_info['Versions'])} version(s))")
+    try:
+        region, function_name, function_info = functions[int(input("\nEnter the number of the function to clean up: ").strip()) - 1]
+    except (ValueError, IndexError):
+        print("\nInvalid selection. Nothing deleted.")
+        return
+
+    fetch_function_aliases({function_name: function_info}, region)
+    # The function itself ($LATEST) stays: only aliases and published versions are offered
+    items = [('Alias', alias) for alias in function_info['Aliases'] or []]
+    items += [('Version', version) for version in function_info['Versions'] if version != '$LATEST']
+    if not items:
+        print(f"\n{function_name} has no aliases or published versions.")
+        return
+
+    print(f"\n🗂️ Aliases and versions of {regions.label(region, function_name)}:")
+    for idx, (kind, item) in enumerate(items, start=1):
+        print(f"{idx}. {kind}: {item}")
+    print("\nEnter the numbers to delete (comma-separated), type 'all' to delete all, or 'exit' to cancel:")
+    choice = input("Your choice: ").strip().lower()
+    if choice == "exit":
+        print("❌ Deletion canceled by user.")
+        return
+    if choice == "all":
+        selected = items
+    else:
+        try:
+            indices = [int(i.strip()) - 1 for i in choice.split(",")]
+            selected = [items[i] for i in indices if 0 <= i < len(items)]
+        except (ValueError, IndexError):
+            print("\nInvalid selection. Nothing deleted.")
+            return
+    if not selected:
+        print("\nNo valid aliases or versions selected for deletion.")
+        return
+
+    confirm = input(f"\nAre you sure you want to delete these {len(selected)} alias(es) and version(s)? (yes/no): ").strip().lower()
+    if confirm != "yes":
+        print("Deletion canceled.")
+        return
+
+    if config.delete_for_real:
+        # Aliases go first, so the versions they pointed to can be deleted
+        results = delete_function_versions(function_name, [item for kind, item in selected if kind == 'Version'],
+                                           get_client('lambda', region_name=region),
+                                           aliases=[item for kind, item in selected if kind == 'Alias'])
+    else:
+        results = {item: (True, "testing") for _, item in selected}
+    for kind, item in selected:
+        success, detail = results[item]
+        name = regions.label(region, f"{function_name}:{item}")
+        log_action(f"Lambda {kind}", f"{function_name}:{item}", success, mode="deletion")
+        if not config.delete_for_real:
+            print(f"📝 Logged delete attempt for {kind}: {name}")
+        elif success:
+            print(f"✅ Successfully deleted {kind}: {name}")
         else:
-            print(f"📝 Logged delete attempt for: {function}")
-            log_action("Lambda", function, True, mode="deletion")
+            print(f"❌ Failed to delete {kind} {name}: {detail}")
+
+# A published function version or layer version picked for pruning
+PruneTarget = namedtuple('PruneTarget', ['Kind', 'Name', 'Version', 'CodeSize'])
+
+def plan_version_pruning(keep, region_name=None):
+    """Pick the function and layer versions to prune: all but the `keep` newest of each.
+
+    Versions an alias points to (including weighted routing) and layer versions still used by
+    a kept function version are never picked. Returns a list of PruneTarget.
+    """
+    lambda_client = get_client('lambda', region_name=region_name)
+
+    versions = {}
+    for page in lambda_client.get_paginator('list_functions').paginate(FunctionVersion='ALL'):
+        for version in page.get('Functions', []):
+            versions.setdefault(version['FunctionName'], []).append(version)
+
+    with ThreadPoolExecutor(max_workers=config.lambda_detail_workers) as executor:
+        futures = {name: executor.submit(_alias_targets, lambda_client, name) for name in versions}
+
+    targets = []
+    used_layers = set()
+    for function_name, function_versions in versions.items():
+        try:
+            protected = futures[function_name].result()
+        except Exception as e:
+            # Without its aliases we cannot tell what is live: keep every version of this function
+            print(f"⚠️ Skipping {function_name}, could not read its aliases: {str(e)}")
+            protected = {version['Version'] for version in function_versions}
+        published = sorted((version['Version'] for version in function_versions if version['Version'] != '$LATEST'),
+                           key=int, reverse=True)
+        protected.update(published[:keep])
+        for version in function_versions:
+            if version['Version'] == '$LATEST' or version['Version'] in protected:
+                used_layers.update(layer['Arn'] for layer in version.get('Layers', []))
+            else:
+                targets.append(PruneTarget('Function Version', function_name, version['Version'], version.get('CodeSize', 0)))
+
+    layer_names = [layer['LayerName'] for page in lambda_client.get_paginator('list_layers').paginate()
+                   for layer in page.get('Layers', [])]
+    with ThreadPoolExecutor(max_workers=config.lambda_detail_workers) as executor:
+        layer_versions = dict(zip(layer_names, executor.map(lambda name: _layer_versions(lambda_client, name), layer_names)))
+    for layer_name, layer_version_list in layer_versions.items():
+        ordered = sorted(layer_version_list, key=lambda layer_version: layer_version['Version'], reverse=True)
+        for layer_version in ordered[keep:]:
+            if layer_version['LayerVersionArn'] not in used_layers:
+                targets.append(PruneTarget('Layer Version', layer_name, layer_version['Version'], None))
+    return targets
+
+def _alias_targets(lambda_client, function_name):
+    """Every version an alias of the function routes traffic to."""
+    targets = set()
+    for page in lambda_client.get_paginator('list_aliases').paginate(FunctionName=function_name):
+        for alias in page.get('Aliases', []):
+            targets.add(alias['FunctionVersion'])
+            targets.update(alias.get('RoutingConfig', {}).get('AdditionalVersionWeights', {}))
+    return targets
+
+def _layer_versions(lambda_client, layer_name):
+    return [layer_version for page in lambda_client.get_paginator('list_layer_versions').paginate(LayerName=layer_name)
+            for layer_version in page.get('LayerVersions', [])]
+
+def prune_versions(targets, region_name=None):
+    """Delete the planned versions in parallel (or only log them in testing mode).
+
+    Returns the code storage reclaimed, in bytes.
+    """
+    lambda_client = get_client('lambda', region_name=region_name)
+    reclaimed = 0
+    with ThreadPoolExecutor(max_workers=config.lambda_delete_workers) as executor:
+        futures = {executor.submit(_prune_target, lambda_client, target): target for target in targets}
+        for future in as_completed(futures):
+            target = futures[future]
+            name = regions.label(region_name, f"{target.Name}:{target.Version}")
+            success, code_size, detail = future.result()
+            log_action(f"Lambda {target.Kind}", f"{target.Name}:{target.Version}", success, mode="deletion")
+            if not config.delete_for_real:
+                print(f"📝 Logged delete attempt for {target.Kind}: {name}")
+            elif success:
+                print(f"✅ Successfully deleted {target.Kind}: {name}")
+            else:
+                print(f"❌ Failed to delete {target.Kind} {name}: {detail}")
+            if success:
+                reclaimed += code_size or 0
+    return reclaimed
+
+def _prune_target(lambda_client, target):
+    try:
+        code_size = target.CodeSize
+        if target.Kind == 'Layer Version':
+            # list_layer_versions has no sizes: read this one before it goes
+            layer = call_with_retries(lambda_client.get_layer_version, LayerName=target.Name, VersionNumber=target.Version)
+            code_size = layer.get('Content', {}).get('CodeSize', 0)
+        if config.delete_for_real:
+            if target.Kind == 'Layer Version':
+                call_with_retries(lambda_client.delete_layer_version, LayerName=target.Name, VersionNumber=target.Version)
+            else:
+                call_with_retries(lambda_client.delete_function, FunctionName=target.Name, Qualifier=target.Version)
+        return True, code_size, None
+    except Exception as e:
+        return False, 0, str(e)
+
+def prune_old_versions():
+    answer = input(f"\nHow many of the newest versions should be kept per function and layer? [{config.lambda_keep_versions}]: ").strip()
+    try:
+        keep = int(answer) if answer else config.lambda_keep_versions
+    except ValueError:
+        print("\nInvalid number. No versions pruned.")
+        return
+    if keep < 0:
+        print("\nInvalid number. No versions pruned.")
+        return
+
+    print("Looking for stale versions...")
+    plans = {region: targets for region, targets in regions.fan_out(partial(plan_version_pruning, keep)).items() if targets}
+    if not plans:
+        print("\nNothing to prune.")
+        return
+
+    print("\n✂️ Versions to prune:")
+    for region, targets in plans.items():
+        counts = {}
+        for target in targets:
+            counts[(target.Kind, target.Name)] = counts.get((target.Kind, target.Name), 0) + 1
+        for (kind, name), count in sorted(counts.items()):
+            print(f"  {regions.label(region, name)}: {count} {kind.lower()}(s)")
+    total = sum(len(targets) for targets in plans.values())
+    known_size = sum(target.CodeSize or 0 for targets in plans.values() for target in targets)
+    print(f"\n{total} version(s), {_megabytes(known_size)} of function code plus any layer code.")
+
+    confirm = input(f"\nAre you sure you want to delete these {total} version(s)? (yes/no/exit): ").strip().lower()
+    if confirm != "yes":
+        print("Pruning canceled.")
+        return
+
+    reclaimed = sum(prune_versions(targets, region) for region, targets in plans.items())
+    verb = "Reclaimed" if config.delete_for_real else "Would reclaim"
+    print(f"\n💾 {verb} {_megabytes(reclaimed)} of code storage.")
+
+def _megabytes(size):
+    return f"{size / (1024 * 1024):.1f} MB"
 
 def interactive_menu():
     print("""
@@ -123,33 +425,44 @@ def interactive_menu():
     while True:
         print("\nMain Menu:")
         print("1. List Lambda Functions")
-        print("2. Delete Lambda Functions")
-        print("3. Exit")
+        print("2. View Lambda Function Details")
+        print("3. Delete Lambda Functions")
+        print("4. Prune Old Versions and Layers")
+        print("5. Delete Versions and Aliases of a Function")
+        print("6. Exit")
 
         choice = input("Enter your choice: ").strip()
 
         if choice == "1":
             print("Waiting for Lambda functions...")
-            functions = list_lambda_functions()
+            functions = regions.flatten(regions.fan_out(list_lambda_functions))
             if functions:
                 print("\n💻 Lambda Functions:")
-                for function_name, function_info in functions.items():
-                    print(f"\n{function_name}:")
-                    print(f"  Created: {function_info['Created']}")
-                    print(f"  Aliases: {', '.join(function_info['Aliases'] or ['No aliases'])}")
-                    print(f"  Versions: {', '.join(function_info['Versions'] or ['No versions'])}")
+                for region, function_name, function_info in functions:
+                    print_function(region, function_name, function_info)
             else:
                 print("\nNo Lambda functions found.")
         
         elif choice == "2":
-            delete_selected_lambda_functions()
+            show_function_details()
 
         elif choice == "3":
+            delete_selected_lambda_functions()
+
+        elif choice == "4":
+            prune_old_versions()
+
+        elif choice == "5":
+            delete_selected_versions()
+
+        elif choice == "6":
             print("\n🔚 Exiting Excalisweep Lambda Wizard. Have a great day!")
             break
         
         else:
-            print("\nInvalid choice. Please enter 1, 2, or 3.")
+            print("\nInvalid choice. Please enter 1, 2, 3, 4, 5, or 6.")
 
 if __name__ == "__main__":
+    # Launched as a separate process: main.py hands the mode over through the environment
+    config.delete_for_real = os.getenv('DELETE_FOR_REAL', 'False') == 'True'
     interactive_menu()
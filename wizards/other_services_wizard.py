@@ -1,15 +1,26 @@
 import boto3, botocore
-import re
-import inspect
 import json
+import jmespath
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import BotoCoreError, ClientError
+from itertools import islice
 from utility import *
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from logger import log_action
+from clients import get_client
+import service_index
+import sweeper
+import cloud_control
 import config
-# Get delete_for_real from environment variable
-delete_for_real = os.getenv('DELETE_FOR_REAL', 'False') == 'True'
+
+# Method name words that mark a call as a deletion (logged only in testing mode)
+DELETE_KEYWORDS = ["delete", "terminate", "remove", "drop", "destroy", "purge"]
+# Resources shown before a service sweep asks for confirmation
+SWEEP_PREVIEW_SIZE = 20
 
 def list_services():  #list all available AWS services
     try:
@@ -29,8 +40,8 @@ def list_services():  #list all available AWS services
 
 def list_all_methods(service_name): #list all methods of a specific AWS service
     try:
-        client = boto3.client(service_name)
-        methods = [method for method in dir(client) if callable(getattr(client, method))]
+        # Straight from the prebuilt operation index: no client, no dir() scan
+        methods = sorted(service_index.get_operations(service_name))
         
         # Filter methods related to deletion and listing
         keywords = {"delete", "terminate", "remove", "drop", "destroy", "purge", "list"}
@@ -66,23 +77,20 @@ def choose_method():  #choose a service and a method to execute
 
 def execute_method(service_name, method_name): #execute the method u choose (and asks u for the parameters)
     try:
-        client = boto3.client(service_name)
+        operation = service_index.get_operation(service_name, method_name)
+        if operation is None:
+            print(f"\n❌ {service_name} has no method '{method_name}'.")
+            return
+        client = get_client(service_name)
         method = getattr(client, method_name)
-        docstring = inspect.getdoc(method)
-        lines= docstring.split('\n')
-        
-        #regex
-        pattern_response = r'(\bresponse\s*=\s*client\.[\w_]+\([^)]*\))'
-        response_syntax = re.findall(pattern_response, docstring)
-        pattern_required  = r':param (\w+):\s+\*\*\[REQUIRED\]\*\*'
-        required_params = re.findall(pattern_required , docstring)
-        pattern_all_params = r':param (\w+):'
-        all_params = re.findall(pattern_all_params, docstring)
-        optional_params = [p for p in all_params if p not in required_params]
+        required_params = operation['required']
+        optional_params = operation['optional']
         
         print(f"\n🛠️ Method: {method_name}")
-        print(f"\n📄 Description:{lines[0]}" if docstring else "No description available.\n")
-        print(f"\n📦 Response Syntax:\n\n {response_syntax[0]}\n" if response_syntax else "\nNo response syntax available.\n")
+        print(f"\n📄 Description: {operation['description']}" if operation['description'] else "No description available.\n")
+        print(f"\n📦 Response Members: {', '.join(operation['output_members'])}\n" if operation['output_members'] else "\nNo response members.\n")
+        if operation['paginator']:
+            print("🔁 This method can be paginated.")
         print(f"{'⚠️ Required Parameters: ' + ', '.join(required_params) if required_params else '✅ This method does not require any parameters.'}")
         print(f"{'📌 Optional Parameters: ' + ', '.join(optional_params) if optional_params else 'This method does not have any parameters'}")
         
@@ -113,9 +121,9 @@ def execute_method(service_name, method_name): #execute the method u choose (and
         print(f"\nExecuting {service_name}.{method_name}()...\n")
         print(f"\nParameters:  {json.dumps(params_dict, indent=2)}")
         
-        delete=any(word in method_name.lower() for word in ["delete", "terminate", "remove", "drop", "destroy", "purge"])
+        delete=is_delete_method(method_name)
         if delete:
-            if delete_for_real:
+            if config.delete_for_real:
                 try:
                     response = method(**params_dict)
                     log_action( service_name.title(),', '.join(map(str, params_dict.values())),True,mode="deletion")
@@ -126,6 +134,20 @@ def execute_method(service_name, method_name): #execute the method u choose (and
                 log_action(service_name.title(),', '.join(map(str, params_dict.values())),True,mode="deletion")
                 print(f" Logged delete attempt for: {', '.join(map(str, params_dict.values()))}")
                 return
+        elif operation['paginator']:
+            # Every page, streamed as it arrives instead of only the first one
+            max_items, projection, output_file = ask_stream_options(method_name)
+            try:
+                if output_file:
+                    with open(output_file, 'w', encoding='utf-8') as output:
+                        count = stream_pages(client, method_name, params_dict, operation['paginator'], max_items, projection, output)
+                    print(f"\n✅ Wrote {count} item(s) to {output_file}")
+                else:
+                    count = stream_pages(client, method_name, params_dict, operation['paginator'], max_items, projection)
+                    print(f"\n✅ {count} item(s)")
+            except Exception as e:
+                print(f"Error executing method: {e}")
+            return
         else:
             try:
                 response = method(**params_dict)
@@ -148,12 +170,327 @@ def execute_method(service_name, method_name): #execute the method u choose (and
         print(f"{e}")
 
 
-if __name__ == "__main__":
+def ask_stream_options(method_name):  #item cap, projection and output file for a paginated call
+    print(f"\n🔁 {method_name} will be paginated automatically and streamed as NDJSON (one JSON item per line).")
+    max_items = ask_max_items("  🔹 Maximum number of items (blank for all): ")
+    projection = input("  🔹 JMESPath projection for each item, e.g. Name or {Name: Name, Id: Id} (blank for whole items): ").strip()
+    output_file = input("  🔹 Write to file (blank to print): ").strip()
+    return max_items, (projection or None), (output_file or None)
+
+
+def ask_max_items(prompt):  #a positive item cap, or None when left blank; asks again on anything else
+    while True:
+        value = input(prompt).strip()
+        if not value:
+            return None
+        if value.isdigit() and int(value) > 0:
+            return int(value)
+        print("❌ Enter a positive whole number, or leave it blank for no limit.")
+
+
+def stream_pages(client, method_name, params, paginator_config, max_items=None, projection=None, output=None):  #write every item of every page as one NDJSON line, as pages arrive
+    output = output or sys.stdout
+    expression = jmespath.compile(projection) if projection else None
+    result_keys = paginator_config.get('result_key') or []
+    if isinstance(result_keys, str):
+        result_keys = [result_keys]
+
+    pagination = {'MaxItems': max_items} if max_items else {}
+    count = 0
+    for page in client.get_paginator(method_name).paginate(**params, PaginationConfig=pagination):
+        page.pop("ResponseMetadata", None)
+        # Items live under the result keys; pages without them are written whole
+        items = [item for key in result_keys for item in jmespath.search(key, page) or []] if result_keys else [page]
+        for item in items:
+            if max_items and count >= max_items:
+                return count
+            if expression:
+                item = expression.search(item)
+            output.write(json.dumps(item, default=str) + "\n")
+            count += 1
+        output.flush()
+    return count
+
+
+def is_delete_method(method_name):
+    return any(word in method_name.lower() for word in DELETE_KEYWORDS)
+
+
+def run_batch_file():  #run every {service, method, params} record of a JSONL file
+    batch_file = input("\nPath to the JSONL batch file: ").strip()
+    try:
+        records = load_batch(batch_file)
+    except IOError as e:
+        print(f"\n❌ Could not read {batch_file}: {e}")
+        return
+    if not records:
+        print("\nNo records found.")
+        return
+
+    # Every record is checked against its operation's input shape before anything is sent
+    errors = {line: validate_record(record) for line, record in records}
+    invalid = {line: error for line, error in errors.items() if error}
+    for line, error in invalid.items():
+        print(f"❌ Line {line}: {error}")
+    valid = [(line, record) for line, record in records if line not in invalid]
+    deletes = sum(1 for _, record in valid if is_delete_method(record['method']))
+    print(f"\n{len(valid)} valid record(s), {len(invalid)} invalid, {deletes} delete call(s).")
+    if not valid:
+        return
+
+    action = "executed" if config.delete_for_real else "logged only (testing mode)"
+    confirm = input(f"\nRun the {len(valid)} valid record(s)? Delete calls will be {action}. (yes/no): ").strip().lower()
+    if confirm != "yes":
+        print("🚫 Batch canceled.")
+        return
+
+    results_file = f"{os.path.splitext(batch_file)[0]}.results.jsonl"
+    with open(results_file, 'w', encoding='utf-8') as output:
+        for line, error in invalid.items():
+            output.write(json.dumps({'line': line, 'status': 'invalid', 'error': error}) + "\n")
+        summary = run_batch(valid, output)
+    print(f"\n✅ Batch done: {', '.join(f'{count} {status}' for status, count in summary.items())}. Results in {results_file}")
+
+
+def load_batch(path):  #[(line_number, record)]; lines that are not JSON objects become records that fail validation
+    records = []
+    with open(path, 'r', encoding='utf-8') as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append((line_number, json.loads(line)))
+            except json.JSONDecodeError as e:
+                records.append((line_number, {'error': f"Invalid JSON: {e}"}))
+    return records
+
+
+def validate_record(record):  #None if the record can be sent, otherwise why not
+    if not isinstance(record, dict):
+        return "Record must be a JSON object"
+    if 'error' in record and 'service' not in record:
+        return record['error']
+    unknown = set(record) - {'service', 'method', 'params', 'region'}
+    if unknown:
+        return f"Unknown keys: {', '.join(sorted(unknown))}"
+    if not record.get('service') or not record.get('method'):
+        return "Both 'service' and 'method' are required"
+    if not isinstance(record.get('params', {}), dict):
+        return "'params' must be a JSON object"
+    return service_index.validate_params(record['service'], record['method'], record.get('params', {}))
+
+
+def run_batch(records, output):  #run validated records on a rate-limited pool, one result line each
+    limiter = RateLimiter(config.batch_requests_per_second)
+    write_lock = threading.Lock()
+    summary = {}
+
+    def run(line, record):
+        limiter.wait()
+        result = {'line': line, 'service': record['service'], 'method': record['method'], **execute_record(record)}
+        with write_lock:
+            output.write(json.dumps(result, default=str) + "\n")
+            output.flush()
+            summary[result['status']] = summary.get(result['status'], 0) + 1
+
+    with ThreadPoolExecutor(max_workers=config.batch_workers) as executor:
+        for future in [executor.submit(run, line, record) for line, record in records]:
+            future.result()
+    return summary
+
+
+def execute_record(record):  #one batch record, with the same delete check and testing mode as execute_method
+    service_name, method_name, params = record['service'], record['method'], record.get('params', {})
+    resource = ', '.join(map(str, params.values()))
+    delete = is_delete_method(method_name)
+    if delete and not config.delete_for_real:
+        log_action(service_name.title(), resource, True, mode="deletion")
+        return {'status': 'testing'}
+    try:
+        response = getattr(get_client(service_name, region_name=record.get('region')), method_name)(**params)
+        response.pop("ResponseMetadata", None)
+        result = {'status': 'ok', 'response': response}
+    except Exception as e:
+        result = {'status': 'error', 'error': str(e)}
+    if delete:
+        log_action(service_name.title(), resource, result['status'] == 'ok', mode="deletion")
+    return result
+
+
+class RateLimiter:
+    """Spaces calls out to at most `rate` per second across every thread."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def sweep_service():  #delete everything a list call returns, through the delete call paired with it
+    service = input("\nEnter an AWS service name (e.g., sns, sqs, dynamodb): ").strip().lower()
+    if not service_index.get_operations(service):
+        print("\nInvalid service name")
+        return
+
+    pairs = sweeper.find_delete_pairs(service)
+    if not pairs:
+        print(f"\nNo list/delete pairs found for {service}.")
+        return
+    print_list_enumerate([f"{pair.ListMethod} → {pair.DeleteMethod} ({', '.join(pair.Identifiers)})" for pair in pairs],
+                         "List/delete pairs")
+    chosen = select_from_list(pairs, "Choose a pair to sweep by index or 'exit' to cancel: ", False)
+    if not chosen:
+        return
+    pair = chosen[0]
+    list_params = ask_list_params(pair)
+    if list_params is None:
+        return
+
+    # Preview what the list call returns before anything is deleted
+    try:
+        preview = list(islice(sweeper.iter_identifiers(pair, list_params=list_params), SWEEP_PREVIEW_SIZE + 1))
+    except (ClientError, BotoCoreError) as e:
+        report_list_error(pair, list_params, e)
+        return
+    if not preview:
+        print(f"\nNothing returned by {pair.ListMethod}.")
+        return
+    print(f"\n🔎 {pair.ListMethod} returns:")
+    for params in preview[:SWEEP_PREVIEW_SIZE]:
+        print(f"  - {', '.join(map(str, params.values()))}")
+    if len(preview) > SWEEP_PREVIEW_SIZE:
+        print("  ...and more")
+
+    max_items = ask_max_items("\nMaximum number of resources to delete (blank for all): ")
+    action = "deleted" if config.delete_for_real else "logged only (testing mode)"
+    confirm = input(f"\n⚠️ Every resource returned by {pair.ListMethod} will be {action} with {pair.DeleteMethod}. Continue? (yes/no): ").strip().lower()
+    if confirm != "yes":
+        print("🚫 Sweep canceled.")
+        return
+
+    # Counted here as well, so a list call failing halfway still leaves a summary of what was done
+    summary = {}
+    lock = threading.Lock()
+
+    def report(params, status, error):
+        resource = ', '.join(map(str, params.values()))
+        with lock:
+            summary[status] = summary.get(status, 0) + 1
+        if status == 'failed':
+            print(f"❌ Failed to delete {resource}: {error}")
+        elif status == 'deleted':
+            print(f"✅ Successfully deleted: {resource}")
+        else:
+            print(f" Logged delete attempt for: {resource}")
+
+    try:
+        summary = sweeper.sweep(pair, max_items=max_items, on_result=report, list_params=list_params)
+    except (ClientError, BotoCoreError) as e:
+        report_list_error(pair, list_params, e)
+        print(f"\n⚠️ Sweep stopped: {', '.join(f'{count} {status}' for status, count in summary.items()) or 'nothing deleted'}.")
+        return
+    print(f"\n✅ Sweep done: {', '.join(f'{count} {status}' for status, count in summary.items()) or 'nothing to delete'}.")
+
+
+def report_list_error(pair, list_params, error):  #print and log a list call that failed (AccessDenied, throttling, timeouts...)
+    print(f"\n❌ Could not list with {pair.ListMethod}: {error}")
+    log_action(pair.Service.title(), pair.ListMethod, False, mode="listing", function_name=pair.ListMethod,
+               json_input=json.dumps(list_params), response_json=str(error))
+
+
+def ask_list_params(pair):  #parameters for the pair's list call, checked against its input shape (None to cancel)
+    defaults = sweeper.default_list_params(pair)
+    while True:
+        value = input(f"\nParameters for {pair.ListMethod} as JSON (blank for {json.dumps(defaults) if defaults else 'none'}, 'exit' to cancel): ").strip()
+        if value.lower() == 'exit':
+            return None
+        if not value:
+            return defaults
+        try:
+            params = json.loads(value)
+        except ValueError as e:
+            print(f"❌ Invalid JSON: {e}")
+            continue
+        if not isinstance(params, dict):
+            print("❌ Parameters must be a JSON object.")
+            continue
+        error = service_index.validate_params(pair.Service, pair.ListMethod, params)
+        if error:
+            print(f"❌ {error}")
+            continue
+        return params
+
+
+def sweep_resource_type():  #delete every resource of a CloudFormation type name through Cloud Control
+    type_name = input("\nEnter a resource type name (e.g., AWS::Logs::LogGroup, AWS::SNS::Topic): ").strip()
+    if not type_name:
+        return
+    try:
+        identifiers = list(cloud_control.iter_identifiers(type_name))
+    except Exception as e:
+        print(f"\n❌ Could not list {type_name}: {e}")
+        return
+    if not identifiers:
+        print(f"\nNo {type_name} resources found.")
+        return
+
+    print_list_enumerate(identifiers, f"{type_name} resources")
+    selected = select_from_list(identifiers, "Enter the numbers of the resources you want to delete (comma-separated), type 'all' to delete all or 'exit' to cancel: ")
+    if not selected:
+        print("\n🚫 No valid resources were selected for deletion.")
+        return
+
+    confirm = input(f"\n⚠️ Are you sure you want to delete these {len(selected)} resource(s)? (yes/no): ").strip().lower()
+    if confirm != "yes":
+        print("🚫 Deletion canceled.")
+        return
+
+    def report(identifier, success, detail):
+        if not config.delete_for_real:
+            print(f" Logged delete attempt for: {identifier}")
+        elif success:
+            print(f"✅ Successfully deleted: {identifier}")
+        else:
+            print(f"❌ Failed to delete {identifier}: {detail}")
+
+    if config.delete_for_real:
+        print(f"\nSubmitting {len(selected)} deletion(s), up to {config.cloudcontrol_workers} at a time...")
+    cloud_control.delete_resources(type_name, selected, on_result=report)
+
+
+def search_methods():  #fuzzy search for a method across every AWS service at once
+    query = input("\nSearch for an operation (e.g., 'delete table', 'list_buckets'): ").strip()
+    matches = service_index.search_operations(query)
+    if not matches:
+        print("\nNo matching operations found.")
+        return
+
+    print_list_enumerate([f"{service}.{method} - {entry['description']}" for service, method, entry in matches],
+                         "Matching operations")
+    chosen = select_from_list(matches, "Choose an operation to use by index or 'exit' to cancel: ", False)
+    if chosen:
+        service, method, _ = chosen[0]
+        execute_method(service, method)
+
+
+def interactive_menu():
     run_interactive_menu(
     "* Welcome to AWS Service Explorer!      *\n* Your AWS Service and Method Assistant *",
     [
         ("List AWS Services", list_services, False),
         ("Choose a Service and Method", choose_method, False),
+        ("Search Methods Across All Services", search_methods, False),
+        ("Run a Batch Request File", run_batch_file, False),
+        ("Sweep a Service (List → Delete)", sweep_service, False),
+        ("Sweep a Resource Type (Cloud Control)", sweep_resource_type, False),
         ("How to Use the AWS Service Explorer", lambda: print("""
             🧙 HOW TO USE THE AWS Service Explorer
 
@@ -165,7 +502,7 @@ if __name__ == "__main__":
                 The wizard will provide:
                 ✅ A short description of the method
                 ✅ Required & optional parameters
-                ✅ An example of the response syntax
+                ✅ The members of the response (and whether it can be paginated)
                 
                 You'll be prompted to input parameters:
                 - Required: Must be entered
@@ -174,7 +511,31 @@ if __name__ == "__main__":
 
                 If the method is for deletion, it will log the action.
 
-            🔹 Option 4 - Exit:
+            🔹 Option 3 - Search Methods Across All Services:
+                Type a few words (e.g., "delete table") to find matching methods in
+                every service at once, then pick one to run it as in option 2.
+
+            🔹 Option 4 - Run a Batch Request File:
+                Runs every line of a JSONL file, each one a JSON object such as
+                {"service": "sns", "method": "delete_topic", "params": {"TopicArn": "arn:..."}}
+                (an optional "region" key sends that record to another region).
+                Every record is validated before anything is sent, then the records run
+                concurrently and one result line per record is written to
+                <file>.results.jsonl. Delete methods follow the current mode, as in option 2.
+
+            🔹 Option 5 - Sweep a Service (List → Delete):
+                Pairs each List*/Describe* method of a service with its Delete* method
+                from the service model (e.g., sns list_topics → delete_topic by TopicArn).
+                Pick a pair to preview what it lists, then everything listed is deleted
+                concurrently while the list is still being paged. Follows the current mode.
+
+            🔹 Option 6 - Sweep a Resource Type (Cloud Control):
+                Enter a resource type name (e.g., AWS::Logs::LogGroup) to list every resource of
+                that type through the Cloud Control API and delete the ones you select, without
+                learning the service's own delete API. Deletions are submitted concurrently
+                and tracked together until they finish. Follows the current mode.
+
+            🔹 Option 8 - Exit:
                 Exits the AWS Service Explorer.
 
             -------------------------------------------------------------
@@ -200,3 +561,9 @@ if __name__ == "__main__":
         ("Exit", None, True),
     ]
 )
+
+
+if __name__ == "__main__":
+    # Launched as a separate process: main.py hands the mode over through the environment
+    config.delete_for_real = os.getenv('DELETE_FOR_REAL', 'False') == 'True'
+    interactive_menu()
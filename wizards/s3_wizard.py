@@ -1,65 +1,174 @@
 import boto3
 import sys
 import os
+import json
+import time
+import shutil
+import threading
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from botocore.exceptions import ClientError
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from logger import log_action 
+from logger import log_action
+from clients import get_client
 import config 
-# Get delete_for_real from environment variable
-delete_for_real = os.getenv('DELETE_FOR_REAL', 'False') == 'True'
+
+# delete_objects accepts at most 1000 keys per request
+S3_DELETE_BATCH_SIZE = 1000
+
+# Expires current and noncurrent versions, delete markers and incomplete multipart uploads
+EXPIRE_ALL_LIFECYCLE = {
+    'Rules': [
+        {
+            'ID': 'excalisweep-expire-all',
+            'Filter': {'Prefix': ''},
+            'Status': 'Enabled',
+            'Expiration': {'Days': 1},
+            'NoncurrentVersionExpiration': {'NoncurrentDays': 1},
+            'AbortIncompleteMultipartUpload': {'DaysAfterInitiation': 1}
+        },
+        {
+            # ExpiredObjectDeleteMarker cannot share an Expiration block with Days
+            'ID': 'excalisweep-expire-delete-markers',
+            'Filter': {'Prefix': ''},
+            'Status': 'Enabled',
+            'Expiration': {'ExpiredObjectDeleteMarker': True}
+        }
+    ]
+}
+
+_pending_lock = threading.Lock()
+
+# Bucket name -> {'Region', 'ResolvedAt'}, loaded lazily from config.s3_region_cache_file
+_region_cache = None
+_region_lock = threading.RLock()
 
 def list_s3_buckets():
-    s3_client = boto3.client('s3')
+    s3_client = get_client('s3')
     response = s3_client.list_buckets()
-    
-    buckets = {}
-    for bucket in response.get('Buckets', []):
-        bucket_name = bucket['Name']
+    bucket_list = response.get('Buckets', [])
+
+    # Enrich every bucket concurrently; each probe is a single cheap call
+    with ThreadPoolExecutor(max_workers=config.s3_inventory_workers) as executor:
+        details = list(executor.map(_describe_bucket, bucket_list))
+    save_region_cache()
+
+    return {bucket['Name']: info for bucket, info in zip(bucket_list, details)}
+
+def _describe_bucket(bucket):
+    region = get_bucket_region(bucket['Name'], bucket.get('BucketRegion'), persist=False)
+    s3_client = get_client('s3', region_name=region)
+    description = _get_bucket_description(s3_client, bucket['Name'])
+    return {
+        'CreationDate': bucket['CreationDate'],
+        'Status': _get_bucket_status(s3_client, bucket['Name']),
+        'Description': description if description else "No description available"
+    }
+
+def bucket_client(bucket_name):
+    """Client for the bucket's own region, taken from the shared per-region client pool."""
+    return get_client('s3', region_name=get_bucket_region(bucket_name))
+
+def get_bucket_region(bucket_name, known_region=None, persist=True):
+    """Resolve a bucket's region once and remember it on disk for config.s3_region_cache_ttl seconds.
+
+    known_region is used when list_buckets already reported the region (BucketRegion).
+    If the region cannot be resolved, None is returned so the default-region client is used.
+    """
+    cache = _load_region_cache()
+    entry = cache.get(bucket_name)
+    if entry and time.time() - entry['ResolvedAt'] < config.s3_region_cache_ttl:
+        return entry['Region']
+
+    region = known_region
+    if not region:
         try:
-            # Retrieve the bucket's tags (including description if it exists)
-            tags_response = s3_client.get_bucket_tagging(Bucket=bucket_name)
-            description = None
-            for tag in tags_response.get('TagSet', []):
-                if tag['Key'].lower() == 'description':
-                    description = tag['Value']
-                    break
-            
-            # Check if the bucket contains objects to determine if it's active or inactive
-            objects = s3_client.list_objects_v2(Bucket=bucket_name)
-            is_active = "Active" if "Contents" in objects else "Inactive ❌"
-            
-        except Exception as e:
-            description = f"Error retrieving description: {str(e)}"
-            is_active = f"Error checking status: {str(e)}"
-        
-        buckets[bucket_name] = {
-            'CreationDate': bucket['CreationDate'],
-            'Status': is_active,
-            'Description': description if description else "No description available"
-        }
-    
-    return buckets
+            location = get_client('s3').get_bucket_location(Bucket=bucket_name).get('LocationConstraint')
+        except Exception:
+            return None
+        # Buckets in us-east-1 report no constraint, and the oldest eu-west-1 buckets report 'EU'
+        region = {None: 'us-east-1', '': 'us-east-1', 'EU': 'eu-west-1'}.get(location, location)
+
+    with _region_lock:
+        cache[bucket_name] = {'Region': region, 'ResolvedAt': time.time()}
+    if persist:
+        save_region_cache()
+    return region
 
-def empty_bucket(bucket_name):
-    s3_client = boto3.client('s3')
+def _load_region_cache():
+    global _region_cache
+    with _region_lock:
+        if _region_cache is None:
+            try:
+                with open(config.s3_region_cache_file, 'r', encoding='utf-8') as file:
+                    _region_cache = json.load(file)
+            except FileNotFoundError:
+                _region_cache = {}
+            except (IOError, ValueError) as e:
+                print(f"⚠️ Could not read {config.s3_region_cache_file}: {e}")
+                _region_cache = {}
+        return _region_cache
+
+def save_region_cache():
+    with _region_lock:
+        if _region_cache is None:
+            return
+        try:
+            with open(config.s3_region_cache_file, 'w', encoding='utf-8') as file:
+                json.dump(_region_cache, file, indent=2)
+        except IOError as e:
+            print(f"⚠️ Could not write {config.s3_region_cache_file}: {e}")
+
+def _get_bucket_description(s3_client, bucket_name):
+    # Retrieve the bucket's tags (including description if it exists)
+    try:
+        tags_response = s3_client.get_bucket_tagging(Bucket=bucket_name)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'NoSuchTagSet':
+            return None
+        return f"Error retrieving description: {str(e)}"
+    except Exception as e:
+        return f"Error retrieving description: {str(e)}"
+
+    for tag in tags_response.get('TagSet', []):
+        if tag['Key'].lower() == 'description':
+            return tag['Value']
+    return None
+
+def _get_bucket_status(s3_client, bucket_name):
+    try:
+        return "Active" if _bucket_has_objects(s3_client, bucket_name) else "Inactive ❌"
+    except Exception as e:
+        return f"Error checking status: {str(e)}"
+
+def _bucket_has_objects(s3_client, bucket_name):
+    # Fetch at most one key; fall back to versions so versioned-only buckets count as active
+    objects = s3_client.list_objects_v2(Bucket=bucket_name, MaxKeys=1)
+    if "Contents" in objects:
+        return True
+    versions = s3_client.list_object_versions(Bucket=bucket_name, MaxKeys=1)
+    return "Versions" in versions or "DeleteMarkers" in versions
+
+def empty_bucket(bucket_name, progress_callback=None):
+    s3_client = bucket_client(bucket_name)
     
-    # Empty the bucket (delete objects)
+    # Empty the bucket (delete every object version and delete marker)
     try:
-        print(f"\nEmptying bucket: {bucket_name}...")
-        # List objects in the bucket
-        objects = s3_client.list_objects_v2(Bucket=bucket_name)
-        
-        if 'Contents' in objects:
-            # Delete all objects
-            delete_objects = {'Objects': [{'Key': obj['Key']} for obj in objects['Contents']]}
-            s3_client.delete_objects(Bucket=bucket_name, Delete=delete_objects)
-            print(f"Successfully deleted objects from bucket: {bucket_name}")
-        
-        # If versioning is enabled, delete all versions
-        versions = s3_client.list_object_versions(Bucket=bucket_name)
-        if 'Versions' in versions:
-            delete_versions = {'Objects': [{'Key': obj['Key'], 'VersionId': obj['VersionId']} for obj in versions['Versions']]}
-            s3_client.delete_objects(Bucket=bucket_name, Delete=delete_versions)
-            print(f"Successfully deleted versions from bucket: {bucket_name}")
+        if progress_callback is None:
+            print(f"\nEmptying bucket: {bucket_name}...")
+        start = time.monotonic()
+        deleted, error_count, first = _delete_all_versions(s3_client, bucket_name, progress_callback or _print_progress)
+        elapsed = time.monotonic() - start
+
+        # With a progress callback the caller (bulk mode) owns the terminal output
+        if progress_callback is None:
+            rate = deleted / elapsed if elapsed > 0 else deleted
+            print()  # Close the progress line
+            print(f"Successfully deleted {deleted} objects from bucket: {bucket_name} ({rate:.0f} objects/sec)")
+
+        if error_count:
+            raise Exception(f"{error_count} object(s) could not be deleted, e.g. {first.get('Key')}: {first.get('Code')} {first.get('Message')}")
 
     except Exception as e:
         print(f"Error emptying bucket {bucket_name}: {str(e)}")
@@ -69,9 +178,62 @@ def empty_bucket(bucket_name):
 
     return True
 
+def _delete_all_versions(s3_client, bucket_name, progress_callback):
+    """Stream list_object_versions pages into parallel 1000-key delete_objects batches.
+
+    Only a bounded number of batches is in flight at any time, so memory stays flat
+    no matter how many objects the bucket holds. Unversioned objects are listed with
+    VersionId 'null', so this also covers plain buckets. Failed keys are only counted (plus the
+    first error), so millions of locked objects do not pile up in memory either.
+    Returns (deleted, error_count, first_error).
+    """
+    paginator = s3_client.get_paginator('list_object_versions')
+    max_in_flight = config.s3_delete_workers * 2
+    deleted = 0
+    error_count = 0
+    first_error = None
+    in_flight = set()
+    start = time.monotonic()
+
+    def collect(done):
+        nonlocal deleted, error_count, first_error
+        for future in done:
+            batch_deleted, batch_errors = future.result()
+            deleted += batch_deleted
+            error_count += len(batch_errors)
+            if batch_errors and first_error is None:
+                first_error = batch_errors[0]
+        progress_callback(deleted, time.monotonic() - start)
+
+    with ThreadPoolExecutor(max_workers=config.s3_delete_workers) as executor:
+        batch = []
+        for page in paginator.paginate(Bucket=bucket_name, PaginationConfig={'PageSize': S3_DELETE_BATCH_SIZE}):
+            for entry in chain(page.get('Versions', []), page.get('DeleteMarkers', [])):
+                batch.append({'Key': entry['Key'], 'VersionId': entry['VersionId']})
+                if len(batch) == S3_DELETE_BATCH_SIZE:
+                    in_flight.add(executor.submit(_delete_batch, s3_client, bucket_name, batch))
+                    batch = []
+                    if len(in_flight) >= max_in_flight:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+        if batch:
+            in_flight.add(executor.submit(_delete_batch, s3_client, bucket_name, batch))
+        collect(wait(in_flight).done)
+
+    return deleted, error_count, first_error
+
+def _delete_batch(s3_client, bucket_name, batch):
+    response = s3_client.delete_objects(Bucket=bucket_name, Delete={'Objects': batch, 'Quiet': True})
+    # Quiet mode only reports the keys that failed
+    batch_errors = response.get('Errors', [])
+    return len(batch) - len(batch_errors), batch_errors
+
+def _print_progress(deleted, elapsed):
+    rate = deleted / elapsed if elapsed > 0 else deleted
+    print(f"\r  {deleted} objects deleted ({rate:.0f} objects/sec)", end="", flush=True)
+
 def delete_selected_buckets():
     print("Waiting for buckets...")
-    s3_client = boto3.client('s3')
     buckets = list_s3_buckets()
 
     if not buckets:
@@ -113,23 +275,219 @@ def delete_selected_buckets():
         print("Deletion canceled.")
         return
 
-    for bucket in selected_buckets:
-        if delete_for_real:
-            if empty_bucket(bucket):
-                try:
-                    s3_client.delete_bucket(Bucket=bucket)
-                    print(f"✅ Successfully deleted: {bucket}")
-                    log_action(bucket, "S3", True)
-                except Exception as e:
-                    print(f"❌ Failed to delete {bucket}: {str(e)}")
-                    log_action("S3", bucket, False, mode="deletion")
-            else:
-                print(f"⚠️ Failed to empty bucket {bucket}. Skipping deletion.")
-                log_action(bucket, "S3", False)
-        else:
+    process_bucket_deletions(selected_buckets, buckets)
+
+def process_bucket_deletions(selected_buckets, buckets=None):
+    """Delete already confirmed buckets, or only log them in testing mode."""
+    if not config.delete_for_real:
+        for bucket in selected_buckets:
             log_action("S3", bucket, True, mode="deletion")
             print(f"📝 Logged delete attempt for: {bucket}")
+        return
+
+    # Very large buckets are emptied by S3 itself through a lifecycle rule instead of per-key deletes
+    counts = estimate_object_counts(selected_buckets, buckets)
+    remaining = []
+    for bucket in selected_buckets:
+        if (counts.get(bucket) or 0) >= config.s3_lifecycle_threshold_objects:
+            print(f"\n{bucket} holds about {counts[bucket]} objects, using the lifecycle expiration strategy.")
+            expire_bucket(bucket)
+        else:
+            remaining.append(bucket)
+
+    if len(remaining) == 1:
+        delete_bucket(remaining[0])
+    elif remaining:
+        delete_buckets(remaining, counts)
+
+def delete_bucket(bucket_name, progress_callback=None):
+    """Empty and delete one bucket, logging the final result. Returns (success, message)."""
+    if not empty_bucket(bucket_name, progress_callback):
+        message = f"⚠️ Failed to empty bucket {bucket_name}. Skipping deletion."
+        if progress_callback is None:
+            print(message)
+        return False, message
+
+    try:
+        bucket_client(bucket_name).delete_bucket(Bucket=bucket_name)
+        success, message = True, f"✅ Successfully deleted: {bucket_name}"
+    except Exception as e:
+        success, message = False, f"❌ Failed to delete {bucket_name}: {str(e)}"
+    log_action("S3", bucket_name, success, mode="deletion")
+
+    if progress_callback is None:
+        print(message)
+    return success, message
+
+def delete_buckets(bucket_names, counts=None):
+    """Bulk mode: empty and delete several buckets concurrently, smallest first."""
+    if counts is None:
+        counts = estimate_object_counts(bucket_names)
+    # Known sizes first (smallest first), buckets without metrics last
+    ordered = sorted(bucket_names, key=lambda name: (counts.get(name) is None, counts.get(name) or 0))
+    progress = BucketProgress(ordered)
+
+    print(f"\nDeleting {len(ordered)} buckets, up to {config.s3_bucket_workers} at a time (smallest first)...")
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=config.s3_bucket_workers) as executor:
+        futures = {executor.submit(delete_bucket, name, progress.callback_for(name)): name for name in ordered}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                _, message = future.result()
+            except Exception as e:
+                message = f"❌ Failed to delete {name}: {str(e)}"
+                log_action("S3", name, False, mode="deletion")
+            progress.finish(name, message)
+
+    print(f"\nFinished {len(ordered)} buckets in {time.monotonic() - start:.1f}s")
+
+def estimate_object_counts(bucket_names, inventory=None):
+    """Best-effort object counts from the daily CloudWatch S3 metrics (one call per 500 buckets).
+
+    Buckets the inventory already saw as empty count as 0; buckets without a datapoint map to None.
+    """
+    counts = {}
+    for name in bucket_names:
+        if inventory and str(inventory.get(name, {}).get('Status', '')).startswith("Inactive"):
+            counts[name] = 0
+    # S3 publishes the metrics in each bucket's own region
+    by_region = {}
+    for name in bucket_names:
+        if name not in counts:
+            by_region.setdefault(get_bucket_region(name, persist=False), []).append(name)
+    save_region_cache()
+
+    end = datetime.now(timezone.utc)
+    for region, names in by_region.items():
+        _fetch_object_counts(get_client('cloudwatch', region_name=region), names, end, counts)
+
+    return counts
+
+def _fetch_object_counts(cloudwatch, bucket_names, end, counts):
+    for offset in range(0, len(bucket_names), 500):
+        chunk = bucket_names[offset:offset + 500]
+        queries = [{
+            'Id': f"b{index}",
+            'MetricStat': {
+                'Metric': {
+                    'Namespace': 'AWS/S3',
+                    'MetricName': 'NumberOfObjects',
+                    'Dimensions': [
+                        {'Name': 'BucketName', 'Value': name},
+                        {'Name': 'StorageType', 'Value': 'AllStorageTypes'}
+                    ]
+                },
+                'Period': 86400,
+                'Stat': 'Average'
+            }
+        } for index, name in enumerate(chunk)]
+        try:
+            response = cloudwatch.get_metric_data(MetricDataQueries=queries, StartTime=end - timedelta(days=3), EndTime=end)
+        except Exception as e:
+            print(f"⚠️ Could not read bucket sizes from CloudWatch: {str(e)}")
+            return
+        for result in response.get('MetricDataResults', []):
+            if result.get('Values'):
+                counts[chunk[int(result['Id'][1:])]] = int(result['Values'][0])
+
+def expire_bucket(bucket_name):
+    """Install an expire-everything lifecycle rule and queue the bucket for a later delete_bucket."""
+    try:
+        bucket_client(bucket_name).put_bucket_lifecycle_configuration(Bucket=bucket_name, LifecycleConfiguration=EXPIRE_ALL_LIFECYCLE)
+    except Exception as e:
+        print(f"❌ Failed to install the expiration lifecycle on {bucket_name}: {str(e)}")
+        log_action("S3", bucket_name, False, mode="request")
+        return False
+
+    with _pending_lock:
+        pending = load_pending_deletions()
+        pending[bucket_name] = {'RequestedAt': datetime.now(timezone.utc).isoformat()}
+        _save_pending_deletions(pending)
+    print(f"⏳ Lifecycle expiration installed on {bucket_name}. It will be deleted once S3 has emptied it.")
+    log_action("S3", bucket_name, True, mode="request")
+    return True
+
+def check_pending_deletions():
+    """Delete every pending lifecycle-expired bucket that S3 has finished emptying."""
+    pending = load_pending_deletions()
+    if not pending:
+        print("\nNo buckets are pending lifecycle deletion.")
+        return
+
+    print(f"\nChecking {len(pending)} bucket(s) pending lifecycle deletion...")
+
+    def check(bucket_name):
+        try:
+            s3_client = bucket_client(bucket_name)
+            if _bucket_has_objects(s3_client, bucket_name):
+                return bucket_name, None, f"⏳ {bucket_name} is still being emptied (requested {pending[bucket_name]['RequestedAt']})"
+            s3_client.delete_bucket(Bucket=bucket_name)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'NoSuchBucket':
+                return bucket_name, False, f"❌ Failed to check {bucket_name}: {str(e)}"
+            return bucket_name, True, f"✅ {bucket_name} no longer exists"
+        except Exception as e:
+            return bucket_name, False, f"❌ Failed to check {bucket_name}: {str(e)}"
+        return bucket_name, True, f"✅ Successfully deleted: {bucket_name}"
 
+    with ThreadPoolExecutor(max_workers=config.s3_inventory_workers) as executor:
+        results = list(executor.map(check, list(pending)))
+
+    with _pending_lock:
+        remaining = load_pending_deletions()
+        for bucket_name, success, message in results:
+            print(message)
+            if success is None:
+                continue
+            log_action("S3", bucket_name, success, mode="deletion")
+            if success:
+                remaining.pop(bucket_name, None)
+        _save_pending_deletions(remaining)
+
+def load_pending_deletions():
+    try:
+        with open(config.s3_pending_deletions_file, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except (IOError, ValueError) as e:
+        print(f"⚠️ Could not read {config.s3_pending_deletions_file}: {e}")
+        return {}
+
+def _save_pending_deletions(pending):
+    with open(config.s3_pending_deletions_file, 'w', encoding='utf-8') as file:
+        json.dump(pending, file, indent=2)
+
+class BucketProgress:
+    """Live single-line progress for concurrent bucket deletions."""
+
+    def __init__(self, bucket_names):
+        self.lock = threading.Lock()
+        self.active = {}
+        self.total = len(bucket_names)
+        self.finished = 0
+
+    def callback_for(self, bucket_name):
+        def update(deleted, elapsed):
+            rate = deleted / elapsed if elapsed > 0 else deleted
+            with self.lock:
+                self.active[bucket_name] = f"{bucket_name}: {deleted} ({rate:.0f}/s)"
+                self._render()
+        return update
+
+    def finish(self, bucket_name, message):
+        with self.lock:
+            self.active.pop(bucket_name, None)
+            self.finished += 1
+            width = shutil.get_terminal_size(fallback=(100, 20)).columns
+            print(f"\r{' ' * (width - 1)}\r{message}")
+            self._render()
+
+    def _render(self):
+        width = shutil.get_terminal_size(fallback=(100, 20)).columns
+        line = f"⏳ {self.finished}/{self.total} done | " + " | ".join(self.active.values())
+        print(f"\r{line[:width - 1]:<{width - 1}}", end="", flush=True)
 
 def interactive_menu():
     print("""
@@ -139,11 +497,16 @@ def interactive_menu():
     *****************************************
 """)
 
+    # Pick up buckets a previous run left to the lifecycle expiration strategy
+    if load_pending_deletions():
+        check_pending_deletions()
+
     while True:
         print("\nMain Menu:")
         print("1. List S3 Buckets and Status")
         print("2. Delete Buckets")
-        print("3. Exit")
+        print("3. Check Pending Lifecycle Deletions")
+        print("4. Exit")
 
         choice = input("Enter your choice: ").strip()
 
@@ -163,11 +526,16 @@ def interactive_menu():
             delete_selected_buckets()
 
         elif choice == "3":
+            check_pending_deletions()
+
+        elif choice == "4":
             print("\n🔚 Exiting Excalisweep S3 Wizard. Have a great day!")
             break
         
         else:
-            print("\nInvalid choice. Please enter 1, 2, or 3.")
+            print("\nInvalid choice. Please enter 1, 2, 3, or 4.")
 
 if __name__ == "__main__":
+    # Launched as a separate process: main.py hands the mode over through the environment
+    config.delete_for_real = os.getenv('DELETE_FOR_REAL', 'False') == 'True'
     interactive_menu()